@@ -0,0 +1,69 @@
+# ==========================================
+# BENCHMARK: ALT LANDMARK HEURISTIC
+# ==========================================
+"""Nodes expanded by A* with Manhattan distance versus landmark (ALT) bounds.
+
+Runs the same random queries on maze maps with both heuristics and reports
+average expansions and query time, plus the one-off landmark precompute cost
+and the memory the distance arrays take.
+
+    python -m benchmarks.alt_heuristic [--sizes 64 128] [--landmarks 4 8 16] [--queries 50]
+"""
+import argparse
+import random
+import time
+
+from benchmarks.maps import free_cells, maze_map
+from game.landmarks import LandmarkTable
+from game.pathfinding import ALTAlgorithm, AStarAlgorithm
+
+
+def measure(algorithm, queries) -> tuple:
+    """Average expansions and milliseconds per query"""
+    expanded = 0
+    start = time.perf_counter()
+    for origin, goal in queries:
+        algorithm.find_path(origin, goal)
+        expanded += algorithm.stats.nodes_expanded
+    elapsed = time.perf_counter() - start
+    return expanded / len(queries), elapsed * 1000 / len(queries)
+
+
+def run(size: int, landmark_counts, query_count: int, seed: int) -> None:
+    """Compare heuristics on one maze size"""
+    game_map = maze_map(size, seed=seed)
+    free = free_cells(game_map)
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(query_count):
+        a, b = rng.sample(free, 2)
+        queries.append(((a % size, a // size), (b % size, b // size)))
+    
+    expanded, ms = measure(AStarAlgorithm(game_map), queries)
+    print(f"{size}x{size} maze, {len(free)} open cells")
+    print(f"  manhattan      : {expanded:9.0f} expanded, {ms:8.2f} ms/query")
+    for count in landmark_counts:
+        start = time.perf_counter()
+        table = LandmarkTable(game_map, count)
+        precompute = time.perf_counter() - start
+        LandmarkTable._cache.clear()
+        algorithm = ALTAlgorithm(game_map, count)
+        algorithm.find_path(*queries[0])  # Build the cached table outside the timing
+        expanded, ms = measure(algorithm, queries)
+        print(f"  {count:2d} landmarks   : {expanded:9.0f} expanded, {ms:8.2f} ms/query, "
+              f"precompute {precompute * 1000:.1f} ms, {table.nbytes / 1024:.1f} KiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 128])
+    parser.add_argument("--landmarks", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.landmarks, args.queries, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# ==========================================
+# BENCHMARK: BIT-PARALLEL FLOOD FILL
+# ==========================================
+"""Flood fill and reachability with per-cell BFS versus big-int bitsets.
+
+Floods the component around a random open cell of open maps, once with a
+deque over flat indices and once with BitGrid, then answers a batch of
+reachability queries from one cell the way cherry validation does: a BFS
+per query against one cached component mask.
+
+    python -m benchmarks.bitset_flood [--sizes 256 512 1024] [--queries 10]
+"""
+import argparse
+import random
+import time
+from collections import deque
+
+from benchmarks.maps import free_cells, open_map
+from game.bitset import BitGrid
+from game.pathfinding import BFSAlgorithm
+
+
+def flood_cells(cells, cols: int, source: int) -> int:
+    """Size of the component around source, one cell at a time"""
+    size = len(cells)
+    seen = bytearray(size)
+    seen[source] = 1
+    queue = deque([source])
+    count = 0
+    while queue:
+        cell = queue.popleft()
+        count += 1
+        x = cell % cols
+        for neighbor in (cell - 1 if x > 0 else -1, cell + 1 if x < cols - 1 else -1, cell - cols, cell + cols):
+            if 0 <= neighbor < size and not seen[neighbor] and cells[neighbor] == 0:
+                seen[neighbor] = 1
+                queue.append(neighbor)
+    return count
+
+
+def run(size: int, density: float, query_count: int, seed: int) -> None:
+    """Compare both approaches on one map size"""
+    game_map = open_map(size, density, seed)
+    rng = random.Random(seed)
+    free = free_cells(game_map)
+    source = rng.choice(free)
+    
+    start = time.perf_counter()
+    count = flood_cells(game_map.cells, size, source)
+    per_cell = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    grid = BitGrid(game_map)
+    packing = time.perf_counter() - start
+    start = time.perf_counter()
+    mask = grid.flood(1 << source)
+    bitset = time.perf_counter() - start
+    assert bin(mask).count("1") == count
+    
+    origin = (source % size, source // size)
+    goals = [(cell % size, cell // size) for cell in rng.sample(free, query_count)]
+    algorithm = BFSAlgorithm(game_map)
+    start = time.perf_counter()
+    expected = [bool(algorithm.find_path(origin, goal)) for goal in goals]
+    searches = time.perf_counter() - start
+    start = time.perf_counter()
+    answers = [grid.is_reachable(origin, goal) for goal in goals]
+    masks = time.perf_counter() - start
+    assert answers == expected
+    
+    print(f"{size}x{size} open map, component of {count} cells, {query_count} reachability queries")
+    print(f"  flood, per-cell BFS  : {per_cell * 1000:9.1f} ms")
+    print(f"  flood, bitset        : {bitset * 1000:9.1f} ms ({per_cell / bitset:.1f}x), packing {packing * 1000:.1f} ms")
+    print(f"  queries, BFS each    : {searches * 1000:9.1f} ms")
+    print(f"  queries, bitset      : {masks * 1000:9.1f} ms ({searches / masks:.1f}x)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 512, 1024])
+    parser.add_argument("--density", type=float, default=0.3)
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.density, args.queries, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# ==========================================
+# BENCHMARK: ROW-MAJOR VERSUS MORTON CELL LAYOUT
+# ==========================================
+"""Grid searches on row-major versus Morton (Z-order) cell layouts.
+
+Runs the same BFS, A* and Dijkstra queries on large open and maze maps with
+each layout and reports the time per query, plus the one-off cost of
+packing the map into Z-order. Both layouts must return paths of the same
+length.
+
+    python -m benchmarks.cell_layout [--sizes 512 1024] [--queries 10]
+"""
+import argparse
+import random
+import time
+
+from benchmarks.maps import free_cells, maze_map, open_map
+from game.layout import CellLayout
+from game.pathfinding import AStarAlgorithm, BFSAlgorithm, DijkstraAlgorithm
+
+ALGORITHMS = (("BFS", BFSAlgorithm), ("AStar", AStarAlgorithm), ("Dijkstra", DijkstraAlgorithm))
+
+
+def measure(algorithm, queries) -> tuple:
+    """Path lengths and milliseconds per query"""
+    start = time.perf_counter()
+    lengths = [len(algorithm.find_path(a, b)) for a, b in queries]
+    return lengths, (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def run(kind: str, size: int, query_count: int, seed: int) -> None:
+    """Compare both layouts on one map"""
+    game_map = open_map(size, 0.3, seed) if kind == "open" else maze_map(size, seed=seed)
+    rng = random.Random(seed)
+    free = free_cells(game_map)
+    queries = [tuple((cell % size, cell // size) for cell in rng.sample(free, 2)) for _ in range(query_count)]
+    
+    start = time.perf_counter()
+    CellLayout.for_map(game_map, "morton")
+    packing = time.perf_counter() - start
+    
+    print(f"{size}x{size} {kind} map, {query_count} queries, Z-order packing {packing * 1000:.1f} ms")
+    for name, algorithm_class in ALGORITHMS:
+        row_lengths, row_ms = measure(algorithm_class(game_map, layout="row"), queries)
+        morton_lengths, morton_ms = measure(algorithm_class(game_map, layout="morton"), queries)
+        assert row_lengths == morton_lengths
+        print(f"  {name:<9} row {row_ms:8.1f} ms   morton {morton_ms:8.1f} ms   ({row_ms / morton_ms:.2f}x)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[512, 1024])
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    for size in args.sizes:
+        for kind in ("open", "maze"):
+            run(kind, size, args.queries, args.seed)
+
+
+if __name__ == "__main__":
+    main()
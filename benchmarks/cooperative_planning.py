@@ -0,0 +1,65 @@
+# ==========================================
+# BENCHMARK: COOPERATIVE PLANNING THROUGHPUT
+# ==========================================
+"""Replanning cost of WHCA* as the number of ghosts grows.
+
+Every agent starts on a random cell and heads for a random goal; the whole
+group replans every half window until all have arrived. Reports time per
+replan, expansions and any vertex collisions (there should be none).
+
+    python -m benchmarks.cooperative_planning [--size 64] [--agents 12 24 48] [--window 16]
+"""
+import argparse
+import random
+import time
+
+from benchmarks.maps import free_cells, open_map
+from game.cooperative import CooperativePlanner
+
+
+def run(size: int, agent_count: int, window: int, seed: int) -> None:
+    """Race agent_count agents to their goals and print replanning statistics"""
+    game_map = open_map(size, density=0.2, seed=seed)
+    free = free_cells(game_map)
+    rng = random.Random(seed)
+    picks = rng.sample(free, 2 * agent_count)
+    positions = {agent: (cell % size, cell // size) for agent, cell in enumerate(picks[:agent_count])}
+    goals = {agent: (cell % size, cell // size) for agent, cell in enumerate(picks[agent_count:])}
+    
+    planner = CooperativePlanner(game_map, window)
+    paths = {}
+    replans = collisions = tick = 0
+    planning = 0.0
+    while positions and tick < 20 * size:
+        if tick % max(1, window // 2) == 0 or any(not paths.get(agent) for agent in positions):
+            start = time.perf_counter()
+            paths = planner.plan([(agent, positions[agent], goals[agent]) for agent in positions], tick)
+            planning += time.perf_counter() - start
+            replans += 1
+        tick += 1
+        for agent in list(positions):
+            if paths[agent]:
+                positions[agent] = paths[agent].pop(0)
+            if positions[agent] == goals[agent]:
+                del positions[agent]
+        occupied = list(positions.values())
+        collisions += len(occupied) - len(set(occupied))
+    
+    print(f"{agent_count:>4} agents: {replans} replans, {planning * 1000 / max(1, replans):.2f} ms/replan, "
+          f"{planner.nodes_expanded} expansions, {tick} ticks, {len(positions)} unfinished, "
+          f"{collisions} collisions")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--agents", type=int, nargs="+", default=[12, 24, 48])
+    parser.add_argument("--window", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    for agent_count in args.agents:
+        run(args.size, agent_count, args.window, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# ==========================================
+# BENCHMARK: TEXT VERSUS BINARY MAP FILES
+# ==========================================
+"""Saving and loading maps as text versus the bit-packed binary format.
+
+Writes the same weighted map in both formats and reports file sizes, save
+and load times, and how long a memory-mapped binary file takes to open and
+answer point queries without unpacking. Every round trip, including binary
+to text and back, must reproduce the map exactly.
+
+    python -m benchmarks.map_format [--sizes 512 2048] [--queries 10000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.maps import open_map
+from game.map import GameMap
+from game.map_format import MapFile
+
+
+def timed(action) -> tuple:
+    """Result of action() and the milliseconds it took"""
+    start = time.perf_counter()
+    result = action()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def same_map(a: GameMap, b: GameMap) -> bool:
+    """True if both maps hold the same cells, costs and hash"""
+    return (a.rows, a.cols, a.cells, a.costs, a.zobrist) == (b.rows, b.cols, b.cells, b.costs, b.zobrist)
+
+
+def run(size: int, query_count: int, seed: int, directory: str) -> None:
+    """Compare both formats on one map"""
+    game_map = open_map(size, 0.3, seed)
+    rng = random.Random(seed)
+    for _ in range(size * size // 10):
+        x, y = rng.randrange(1, size - 1), rng.randrange(1, size - 1)
+        if game_map.is_valid_position(x, y):
+            game_map.set_cell(x, y, rng.randint(2, 9))
+    
+    text_name = os.path.join(directory, f"map_{size}.txt")
+    binary_name = os.path.join(directory, f"map_{size}.gcm")
+    _, text_save = timed(lambda: game_map.save_map(text_name))
+    _, binary_save = timed(lambda: game_map.save_map(binary_name))
+    from_text, text_load = timed(lambda: GameMap(text_name))
+    from_binary, binary_load = timed(lambda: GameMap(binary_name))
+    assert same_map(game_map, from_text) and same_map(game_map, from_binary)
+    
+    # Binary back to text must reproduce the original text file byte for byte
+    converted = os.path.join(directory, f"map_{size}_converted.txt")
+    from_binary.save_map(converted)
+    with open(text_name, "rb") as a, open(converted, "rb") as b:
+        assert a.read() == b.read()
+    
+    queries = [(rng.randrange(size), rng.randrange(size)) for _ in range(query_count)]
+    map_file, open_ms = timed(lambda: MapFile(binary_name))
+    _, query_ms = timed(lambda: [map_file.terrain_cost(x, y) for x, y in queries
+                                 if map_file.is_valid_position(x, y)])
+    assert all(map_file.is_valid_position(x, y) == game_map.is_valid_position(x, y) for x, y in queries)
+    map_file.close()
+    
+    text_kib = os.path.getsize(text_name) / 1024
+    binary_kib = os.path.getsize(binary_name) / 1024
+    print(f"{size}x{size} weighted map")
+    print(f"  text   {text_kib:9.1f} KiB   save {text_save:8.1f} ms   load {text_load:8.1f} ms")
+    print(f"  binary {binary_kib:9.1f} KiB   save {binary_save:8.1f} ms   load {binary_load:8.1f} ms"
+          f"   ({text_load / binary_load:.1f}x faster)")
+    print(f"  mmap open {open_ms:.2f} ms, {query_count} point queries {query_ms:.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[512, 2048])
+    parser.add_argument("--queries", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            run(size, args.queries, args.seed, directory)
+
+
+if __name__ == "__main__":
+    main()
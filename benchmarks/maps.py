@@ -0,0 +1,54 @@
+# ==========================================
+# BENCHMARK MAPS
+# ==========================================
+import random
+from typing import List
+
+from game.map import GameMap
+
+
+def open_map(size: int, density: float = 0.3, seed: int = 0) -> GameMap:
+    """Square map with a wall border and randomly scattered walls, like generate_random_map"""
+    rng = random.Random(seed)
+    grid = [[1 if rng.random() < density else 0 for _ in range(size)] for _ in range(size)]
+    _add_border(grid)
+    return GameMap(f"<open {size}x{size}>", grid)
+
+
+def maze_map(size: int, loops: float = 0.05, seed: int = 0) -> GameMap:
+    """Square maze of 1-wide corridors (recursive backtracker) with a few loops knocked through"""
+    rng = random.Random(seed)
+    grid = [[1] * size for _ in range(size)]
+    stack = [(1, 1)]
+    grid[1][1] = 0
+    while stack:
+        x, y = stack[-1]
+        options = [(dx, dy) for dx, dy in ((2, 0), (-2, 0), (0, 2), (0, -2))
+                   if 0 < x + dx < size - 1 and 0 < y + dy < size - 1 and grid[y + dy][x + dx] == 1]
+        if not options:
+            stack.pop()
+            continue
+        dx, dy = rng.choice(options)
+        grid[y + dy // 2][x + dx // 2] = 0
+        grid[y + dy][x + dx] = 0
+        stack.append((x + dx, y + dy))
+    
+    # Open a few extra walls so there is more than one route between most cells
+    for y in range(1, size - 1):
+        for x in range(1, size - 1):
+            if grid[y][x] == 1 and rng.random() < loops and (x % 2) != (y % 2):
+                grid[y][x] = 0
+    _add_border(grid)
+    return GameMap(f"<maze {size}x{size}>", grid)
+
+
+def free_cells(game_map: GameMap) -> List[int]:
+    """Flat indices of every open cell"""
+    return [i for i, value in enumerate(game_map.cells) if value == 0]
+
+
+def _add_border(grid: List[List[int]]) -> None:
+    """Wall off the outer ring of a grid"""
+    size = len(grid)
+    for i in range(size):
+        grid[0][i] = grid[size - 1][i] = grid[i][0] = grid[i][size - 1] = 1
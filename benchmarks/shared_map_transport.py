@@ -0,0 +1,95 @@
+# ==========================================
+# BENCHMARK: MAP TRANSPORT TO WORKER PROCESSES
+# ==========================================
+"""Per-task overhead of sending a map to a process pool.
+
+Compares pickling the nested-list grid, pickling the compact byte buffer and
+attaching to a SharedMapBuffer by name. Each task reads a single cell so the
+timing is dominated by transport.
+
+    python -m benchmarks.shared_map_transport [--sizes 1024 4096 16384] [--tasks 8]
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game.map import MapSnapshot
+from game.shared_map import SharedMapBuffer, attach_cached, prepare_worker_pool
+
+# Nested lists cost roughly 8 bytes per cell plus pickling time, so the
+# largest grids are skipped for that transport by default
+NESTED_LIST_CELL_LIMIT = 4096 * 4096
+
+
+def _touch_nested(grid, x, y):
+    """Task body for the nested-list transport"""
+    return grid[y][x]
+
+
+def _touch_bytes(rows, cols, cells, x, y):
+    """Task body for the pickled byte buffer transport"""
+    return MapSnapshot(rows, cols, cells, 0).is_valid_position(x, y)
+
+
+def _touch_shared(name, x, y):
+    """Task body for the shared memory transport"""
+    return attach_cached(name).snapshot().is_valid_position(x, y)
+
+
+def _time_tasks(executor, tasks: int, fn, *args) -> float:
+    """Average wall time per task in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(tasks):
+        executor.submit(fn, *args).result()
+    return (time.perf_counter() - start) * 1000 / tasks
+
+
+def make_cells(size: int) -> bytearray:
+    """A size x size map with a wall border and a regular pattern of pillars"""
+    cells = bytearray(size * size)
+    for x in range(size):
+        cells[x] = cells[(size - 1) * size + x] = 1
+    for y in range(0, size, 4):
+        cells[y*size:(y+1)*size:4] = b"\x01" * len(range(y*size, (y+1)*size, 4))
+    return cells
+
+
+def run(sizes, tasks: int) -> None:
+    """Print a table of per-task overhead for each grid size"""
+    prepare_worker_pool()
+    print(f"{'size':>7} {'nested list':>14} {'bytes pickle':>14} {'shared memory':>14}")
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        executor.submit(int).result()  # Warm up the worker
+        for size in sizes:
+            cells = make_cells(size)
+            snapshot = MapSnapshot(size, size, cells, 1, zobrist=0)  # Hashing is not what is measured
+            
+            if size * size <= NESTED_LIST_CELL_LIMIT:
+                grid = [list(cells[r*size:(r+1)*size]) for r in range(size)]
+                nested = f"{_time_tasks(executor, tasks, _touch_nested, grid, 1, 1):.2f} ms"
+                del grid
+            else:
+                nested = "skipped"
+            
+            as_bytes = _time_tasks(executor, tasks, _touch_bytes, size, size, bytes(cells), 1, 1)
+            
+            shared = SharedMapBuffer.create(snapshot)
+            try:
+                # The first task attaches; later ones reuse the worker's attachment
+                shared_ms = _time_tasks(executor, tasks, _touch_shared, shared.name, 1, 1)
+            finally:
+                shared.close()
+            
+            print(f"{size:>7} {nested:>14} {as_bytes:>11.2f} ms {shared_ms:>11.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 4096, 16384])
+    parser.add_argument("--tasks", type=int, default=8)
+    args = parser.parse_args()
+    run(args.sizes, args.tasks)
+
+
+if __name__ == "__main__":
+    main()
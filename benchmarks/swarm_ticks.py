@@ -0,0 +1,59 @@
+# ==========================================
+# BENCHMARK: GHOST SWARM TICK RATE
+# ==========================================
+"""Planning time and per-tick cost of a GhostSwarm.
+
+    python -m benchmarks.swarm_ticks [--size 512] [--ghosts 10000] [--no-numpy]
+"""
+import argparse
+import random
+import time
+
+import game.swarm as swarm_module
+from benchmarks.maps import free_cells, open_map
+from game.swarm import GhostSwarm
+
+
+def run(size: int, ghosts: int, seed: int) -> None:
+    """Spawn ghosts at random cells around one goal and race them to completion"""
+    game_map = open_map(size, density=0.25, seed=seed)
+    free = free_cells(game_map)
+    rng = random.Random(seed)
+    goal_cell = free[len(free) // 2]
+    goal = (goal_cell % size, goal_cell // size)
+    
+    swarm = GhostSwarm(game_map)
+    for _ in range(ghosts):
+        cell = rng.choice(free)
+        swarm.add((cell % size, cell // size), goal)
+    
+    start = time.perf_counter()
+    swarm.plan()
+    plan_ms = (time.perf_counter() - start) * 1000
+    
+    ticks = 0
+    start = time.perf_counter()
+    while swarm.remaining:
+        ticks += 1
+        swarm.step(ticks)
+    tick_ms = (time.perf_counter() - start) * 1000 / max(1, ticks)
+    
+    backend = "numpy" if swarm_module.np is not None else "array"
+    print(f"{size}x{size} map, {ghosts} ghosts ({backend}): plan {plan_ms:.0f} ms, "
+          f"{ticks} ticks at {tick_ms:.3f} ms/tick ({1000 / max(tick_ms, 1e-9):.0f} ticks/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=512)
+    parser.add_argument("--ghosts", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-numpy", action="store_true", help="use the pure array fallback")
+    args = parser.parse_args()
+    if args.no_numpy:
+        swarm_module.np = None
+    run(args.size, args.ghosts, args.seed)
+
+
+if __name__ == "__main__":
+    main()
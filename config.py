@@ -14,6 +14,7 @@ class Config:
     BLACK = (30, 30, 30)
     BLUE = (70, 105, 175)
     WALL_COLOR = (70, 80, 140)
+    TERRAIN_COLOR = (150, 120, 80)  # Tint of the costliest terrain
     CHERRY_RED = (220, 20, 60)
     BUTTON_IDLE = (220, 220, 240)
     BUTTON_HOVER = (200, 200, 230)
@@ -30,9 +31,67 @@ class Config:
         'ghost_orange': "assets/ghost-orange.png",
         'ghost_red': "assets/ghost-red.png",
         'cherry': "assets/cherry.png",
-        'map': "map.txt"
+        'map': "map.txt"  # weighted_map.txt adds terrain that costs extra ticks to cross
     }
     
+    # Cherries per race; with more than one, every ghost must collect them all
+    CHERRY_COUNT = 1
+    
     # Game settings
     SCROLL_SPEED = 20
-    FRAME_RATE = 10
\ No newline at end of file
+    FRAME_RATE = 60  # Rendered frames per second
+    TICK_RATE = 10  # Simulation ticks per second; each tick moves a ghost one tile
+    MAX_FRAME_TIME = 0.25  # Longest frame fed to the simulation, to avoid a catch-up spiral
+    
+    # Turbo speeds as simulation ticks per real tick; None runs as fast as the CPU allows
+    TURBO_SPEEDS = [1, 10, 100, None]
+    
+    # Swarm mode: extra ghosts spawned at random open cells, chasing the cherry in bulk
+    SWARM_SIZE = 0
+    SWARM_COLOR = (120, 90, 200)
+    SWARM_NAVIGATION = "flow"  # "flow" shares one flow field, "paths" packs a path per ghost
+    FLOW_FIELD_BUDGET = 20000  # Cells integrated per tick while a flow field is rebuilt
+    SHOW_FLOW_FIELD = False  # Toggle in game with F
+    
+    # Cooperative planning: ghosts share a space-time reservation table (WHCA*)
+    # instead of planning independently, so no two share a cell on the same tick;
+    # ticks spent stepping onto weighted terrain are planned and reserved as waits
+    COOPERATIVE_PLANNING = False
+    COOPERATIVE_WINDOW = 8  # Ticks searched ahead; ghosts replan every half window
+    
+    # Landmarks precomputed per map version for the ALT heuristic
+    ALT_LANDMARKS = 8
+    
+    # Memory-bounded searches: SMA* holds at most SMA_NODE_BUDGET nodes, and
+    # both IDA* and SMA* give up after BOUNDED_SEARCH_EXPANSIONS expansions
+    # (stats.gave_up). IDA* needs far more than this for long routes on grids
+    SMA_NODE_BUDGET = 4096
+    BOUNDED_SEARCH_EXPANSIONS = 250_000
+    
+    # Anytime repairing A*: the first path may cost up to ARA_INITIAL_EPSILON
+    # times the optimum; each frame spends ANYTIME_FRAME_BUDGET seconds of
+    # leftover time lowering the bound by ARA_EPSILON_STEP toward optimal
+    ARA_INITIAL_EPSILON = 3.0
+    ARA_EPSILON_STEP = 0.5
+    ANYTIME_FRAME_BUDGET = 0.002
+    
+    # Dijkstra uses Dial's bucket queue while the costliest terrain is at most
+    # this many steps, and a radix heap for heavier weights
+    DIJKSTRA_BUCKET_LIMIT = 16
+    
+    # Chance that a step of the Kruskal random walk heads toward the goal
+    # when it can; 0 is a pure random walk
+    RANDOM_WALK_GOAL_BIAS = 0.5
+    
+    # Cell order for BFS, DFS, A* and Dijkstra: "row" (row-major) or
+    # "morton" (Z-order, keeps vertical neighbours close on very wide maps)
+    MAP_LAYOUT = "row"
+    
+    # Memory for remembered find_path results, reused for identical queries
+    # on an unchanged map; 0 turns the cache off
+    PATH_CACHE_BYTES = 1 << 20
+    
+    # Background pathfinding: None runs searches in the game loop,
+    # "thread" or "process" hands them to a worker pool
+    PATHFINDING_EXECUTOR = None
+    PATHFINDING_WORKERS = None
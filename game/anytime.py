@@ -0,0 +1,137 @@
+# ==========================================
+# ANYTIME REPAIRING A* (ARA*)
+# ==========================================
+import heapq
+import time
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from game.map import GameMap, MapSnapshot
+
+INFINITY = float('inf')
+
+
+class AnytimeSearch:
+    """One ARA* search that can be paused at a deadline and resumed later.
+    
+    The search runs backward from the goal with an inflated heuristic toward
+    the start, so it finds an epsilon-suboptimal route quickly. Each later
+    pass lowers epsilon and repairs the previous search instead of starting
+    over: states whose cost dropped after they were expanded wait in INCONS
+    and rejoin OPEN when the next pass begins. Parents point toward the goal,
+    so a route can be read off from any reached cell, including one a ghost
+    has since moved to.
+    """
+    def __init__(self, game_map: Union[GameMap, MapSnapshot], start: int, goal: int,
+                 epsilon: float = 3.0, epsilon_step: float = 0.5):
+        self.game_map = game_map
+        self.version = game_map.version
+        self.cols = game_map.cols
+        self.start = start
+        self.goal = goal
+        self.epsilon = max(1.0, epsilon)
+        self.epsilon_step = epsilon_step
+        self.g: Dict[int, int] = {goal: 0}
+        self.parent: Dict[int, Optional[int]] = {goal: None}
+        self.closed: Set[int] = set()
+        self.incons: Set[int] = set()
+        self.open: List[Tuple[float, int]] = [(self._key(goal), goal)]
+        self.bound = INFINITY      # Proven suboptimality bound of the latest published route
+        self.expansions = 0
+        self.improvements: List[Tuple[float, int]] = []  # (bound, expansions so far) per published route
+        self.route: List[int] = []  # Latest published route from the start
+        self.solved = False        # A route for the current epsilon has been published
+        self.finished = False
+    
+    def _heuristic(self, cell: int) -> int:
+        cols = self.cols
+        return abs(cell % cols - self.start % cols) + abs(cell // cols - self.start // cols)
+    
+    def _key(self, cell: int) -> float:
+        return self.g[cell] + self.epsilon * self._heuristic(cell)
+    
+    def _neighbors(self, cell: int) -> List[int]:
+        cols, cells = self.cols, self.game_map.cells
+        size = len(cells)
+        x = cell % cols
+        return [n for n in (cell - 1 if x > 0 else -1, cell + 1 if x < cols - 1 else -1, cell - cols, cell + cols)
+                if 0 <= n < size and cells[n] == 0]
+    
+    def improve(self, deadline: Optional[float] = None) -> bool:
+        """Search toward the next, tighter route until deadline (perf_counter time).
+        
+        True once a pass publishes a different route or a tighter proven bound;
+        a pass that changes neither completes silently.
+        """
+        if self.finished:
+            return False
+        if self.solved:
+            # Next pass: tighter inflation, with the inconsistent states back in OPEN
+            self.epsilon = max(1.0, self.epsilon - self.epsilon_step)
+            pending = self._frontier()
+            self.open = [(self._key(cell), cell) for cell in pending]
+            heapq.heapify(self.open)
+            self.incons = set()
+            self.closed = set()
+            self.solved = False
+        
+        done = self._improve_path(deadline)
+        if done is None:
+            return False  # Out of time; the next call resumes here
+        if not done:
+            self.finished = True  # The start cannot be reached
+            return False
+        self.solved = True
+        if self.epsilon <= 1.0:
+            self.finished = True
+        bound = min(self.bound, self._proven_bound())
+        route = self.route_from(self.start)
+        if bound == self.bound and route == self.route:
+            return False
+        self.bound, self.route = bound, route
+        self.improvements.append((self.bound, self.expansions))
+        return True
+    
+    def _improve_path(self, deadline: Optional[float]) -> Optional[bool]:
+        """Expand until the start's key is minimal: True when done, False if unreachable, None at the deadline"""
+        start = self.start
+        while self.open:
+            if self.g.get(start, INFINITY) <= self.open[0][0]:
+                return True  # No OPEN state can still improve the route through the start
+            key, cell = heapq.heappop(self.open)
+            if cell in self.closed or key != self._key(cell):
+                continue  # Stale entry
+            self.closed.add(cell)
+            self.expansions += 1
+            d = self.g[cell] + 1
+            for neighbor in self._neighbors(cell):
+                if d < self.g.get(neighbor, INFINITY):
+                    self.g[neighbor] = d
+                    self.parent[neighbor] = cell
+                    if neighbor in self.closed:
+                        self.incons.add(neighbor)
+                    else:
+                        heapq.heappush(self.open, (self._key(neighbor), neighbor))
+            if deadline is not None and (self.expansions & 63) == 0 and time.perf_counter() >= deadline:
+                return None
+        return start in self.g
+    
+    def _frontier(self) -> Set[int]:
+        """States still waiting for expansion: live OPEN entries and INCONS"""
+        return {cell for _, cell in self.open if cell not in self.closed} | self.incons
+    
+    def _proven_bound(self) -> float:
+        """g(start) over the smallest unexpanded g + h, never more than epsilon"""
+        lowest = min((self.g[cell] + self._heuristic(cell) for cell in self._frontier()), default=self.g[self.start])
+        if lowest <= 0:
+            return self.epsilon
+        return max(1.0, min(self.epsilon, self.g[self.start] / lowest))
+    
+    def route_from(self, cell: int) -> List[int]:
+        """Cells from cell to the goal along the latest parents, or [] if the search never reached cell"""
+        if cell not in self.parent:
+            return []
+        route = []
+        while cell is not None:
+            route.append(cell)
+            cell = self.parent[cell]
+        return route
@@ -0,0 +1,68 @@
+# ==========================================
+# BACKGROUND PATHFINDING
+# ==========================================
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from game.map import MapSnapshot
+from game.pathfinding import PathfindingAlgorithm, SearchStats
+from game.shared_map import SharedMapBuffer, attach_cached, cleanup_stale_blocks, prepare_worker_pool
+from game.workspace import WorkspacePool
+
+# Scratch arrays for every search a worker runs, one set per worker thread, so a
+# warm worker allocates nothing even though each query builds a fresh algorithm
+_workspaces = WorkspacePool()
+
+
+def _run_search(algorithm_cls: Type[PathfindingAlgorithm], settings: Dict[str, Any], snapshot: MapSnapshot,
+                start: Tuple[int, int], goal: Tuple[int, int]) -> Tuple[List[Tuple[int, int]], SearchStats]:
+    """Run one search against a read-only map snapshot, returning its path and stats"""
+    algorithm = algorithm_cls(snapshot, **settings)
+    algorithm.workspaces = _workspaces
+    return algorithm.find_path(start, goal), algorithm.stats
+
+
+def _run_shared_search(algorithm_cls: Type[PathfindingAlgorithm], settings: Dict[str, Any], block_name: str,
+                       start: Tuple[int, int], goal: Tuple[int, int]) -> Tuple[List[Tuple[int, int]], SearchStats]:
+    """Run one search in a worker process against a map held in shared memory"""
+    return _run_search(algorithm_cls, settings, attach_cached(block_name).snapshot(), start, goal)
+
+
+class BackgroundPlanner:
+    """Runs pathfinding searches on a thread or process pool"""
+    def __init__(self, mode: str = "thread", max_workers: Optional[int] = None):
+        self.mode = mode
+        if mode == "process":
+            # Remove blocks leaked by earlier runs that crashed before unlinking
+            cleanup_stale_blocks()
+            prepare_worker_pool()
+            self.executor = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pathfinding")
+        self.shared_map: Optional[SharedMapBuffer] = None
+    
+    def submit(self, algorithm: PathfindingAlgorithm, snapshot: MapSnapshot,
+               start: Tuple[int, int], goal: Tuple[int, int]) -> Future:
+        """Queue a search and return a future resolving to its path and SearchStats"""
+        if self.mode != "process":
+            return self.executor.submit(_run_search, type(algorithm), algorithm.settings(), snapshot, start, goal)
+        
+        self._publish(snapshot)
+        return self.executor.submit(_run_shared_search, type(algorithm), algorithm.settings(),
+                                    self.shared_map.name, start, goal)
+    
+    def _publish(self, snapshot: MapSnapshot) -> None:
+        """Copy the snapshot into shared memory once per map version"""
+        if self.shared_map is not None and self.shared_map.version == snapshot.version:
+            return
+        # Searches still queued against the old block fail to attach and are discarded as stale
+        if self.shared_map is not None:
+            self.shared_map.close()
+        self.shared_map = SharedMapBuffer.create(snapshot)
+    
+    def shutdown(self) -> None:
+        """Stop the pool, dropping queued searches, and free shared memory"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.shared_map is not None:
+            self.shared_map.close()
+            self.shared_map = None
@@ -0,0 +1,195 @@
+# ==========================================
+# DYNAMIC CONNECTIVITY UNDER CELL EDITS
+# ==========================================
+import weakref
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from game.bitset import BitGrid
+from game.map import GameMap
+
+
+class DynamicConnectivity:
+    """Component label per open cell of a GameMap, kept current as cells open and close.
+    
+    Queries are O(1) label comparisons. Opening a cell joins the components
+    around it by relabelling all but the largest (small into large).
+    Closing a cell can split its component into at most four pieces, one
+    per open neighbour; searches from those neighbours run in lockstep,
+    merging when they meet, and a search that runs out of cells has found a
+    separated piece. Only such pieces are relabelled, and lockstep
+    exploration means each costs about as much as the smallest piece, so an
+    edit in the middle of a big open area is close to O(1).
+    """
+    # One index per live map; the index only holds its map weakly
+    _instances: "weakref.WeakKeyDictionary[GameMap, DynamicConnectivity]" = weakref.WeakKeyDictionary()
+    
+    def __init__(self, game_map: GameMap):
+        self._map = weakref.ref(game_map)
+        self._rebuild(game_map)
+        game_map.subscribe(self._on_change)
+    
+    @classmethod
+    def for_map(cls, game_map: GameMap) -> "DynamicConnectivity":
+        """The index kept in step with game_map, built on first use"""
+        index = cls._instances.get(game_map)
+        if index is None:
+            index = cls._instances[game_map] = cls(game_map)
+        return index
+    
+    def _rebuild(self, game_map: GameMap) -> None:
+        """Label every component from scratch with bit-parallel flood fills over the cached grid"""
+        self.rows, self.cols = game_map.rows, game_map.cols
+        self.labels = array('i', BitGrid.for_map(game_map).labels())  # -1 for walls
+        self.sizes: Dict[int, int] = {}
+        for label in self.labels:
+            if label != -1:
+                self.sizes[label] = self.sizes.get(label, 0) + 1
+        self.next_label = len(self.sizes)
+    
+    def _on_change(self, cells: Optional[List[Tuple[int, int]]]) -> None:
+        """Map listener: apply edited cells, or rebuild after the whole map was replaced"""
+        game_map = self._map()
+        if cells is None or game_map.rows != self.rows or game_map.cols != self.cols:
+            self._rebuild(game_map)
+            return
+        for x, y in cells:
+            cell = y * self.cols + x
+            if game_map.cells[cell] == 0:
+                self.open(cell)
+            else:
+                self.close(cell)
+    
+    def _neighbors(self, cell: int) -> Iterable[int]:
+        """Open neighbours of a cell"""
+        cols, labels = self.cols, self.labels
+        x = cell % cols
+        for neighbor in (cell - 1 if x > 0 else -1, cell + 1 if x < cols - 1 else -1, cell - cols, cell + cols):
+            if 0 <= neighbor < len(labels) and labels[neighbor] != -1:
+                yield neighbor
+    
+    def _relabel(self, start: int, label: int) -> int:
+        """Give start's whole component a new label by BFS, return its size"""
+        labels = self.labels
+        old = labels[start]
+        labels[start] = label
+        queue = deque([start])
+        count = 0
+        while queue:
+            cell = queue.popleft()
+            count += 1
+            for neighbor in self._neighbors(cell):
+                if labels[neighbor] == old:
+                    labels[neighbor] = label
+                    queue.append(neighbor)
+        return count
+    
+    def open(self, cell: int) -> None:
+        """A wall at flat index cell became open"""
+        if self.labels[cell] != -1:
+            return
+        around = {}
+        for neighbor in self._neighbors(cell):
+            around.setdefault(self.labels[neighbor], neighbor)
+        if not around:
+            self.labels[cell] = self.next_label
+            self.sizes[self.next_label] = 1
+            self.next_label += 1
+            return
+        keep = max(around, key=self.sizes.__getitem__)
+        self.labels[cell] = keep
+        self.sizes[keep] += 1
+        for label, neighbor in around.items():
+            if label != keep:
+                self._relabel(neighbor, keep)
+                self.sizes[keep] += self.sizes.pop(label)
+    
+    def close(self, cell: int) -> None:
+        """An open cell at flat index cell became a wall"""
+        label = self.labels[cell]
+        if label == -1:
+            return
+        self.labels[cell] = -1
+        self.sizes[label] -= 1
+        if not self.sizes[label]:
+            del self.sizes[label]
+        starts = list(self._neighbors(cell))
+        if len(starts) > 1:
+            self._split(label, starts)
+    
+    def _split(self, label: int, starts: List[int]) -> None:
+        """Search from each neighbour of a closed cell in lockstep, relabelling every piece that got cut off"""
+        count = len(starts)
+        group = list(range(count))  # Union-find over the searches, joined when they meet
+        
+        def find(search: int) -> int:
+            while group[search] != search:
+                search = group[search]
+            return search
+        
+        owner = {start: search for search, start in enumerate(starts)}
+        regions = [[start] for start in starts]
+        queues = [deque([start]) for start in starts]
+        alive = list(range(count))
+        labels = self.labels
+        while True:
+            for search in alive:
+                if not queues[search]:
+                    continue
+                cell = queues[search].popleft()
+                for neighbor in self._neighbors(cell):
+                    if labels[neighbor] != label:
+                        continue
+                    other = owner.get(neighbor)
+                    if other is None:
+                        owner[neighbor] = search
+                        regions[search].append(neighbor)
+                        queues[search].append(neighbor)
+                    else:
+                        group[find(other)] = find(search)
+            
+            pieces: Dict[int, List[int]] = {}
+            for search in alive:
+                pieces.setdefault(find(search), []).append(search)
+            if len(pieces) == 1:
+                return  # Every search met up: nothing was cut off
+            
+            # A piece whose searches all ran dry is a whole component of its own
+            finished = [members for members in pieces.values() if not any(queues[s] for s in members)]
+            if len(finished) == len(pieces):
+                finished.remove(max(finished, key=lambda members: sum(len(regions[s]) for s in members)))
+            for members in finished:
+                size = 0
+                for search in members:
+                    for cell in regions[search]:
+                        labels[cell] = self.next_label
+                    size += len(regions[search])
+                self.sizes[self.next_label] = size
+                self.sizes[label] -= size
+                self.next_label += 1
+                alive = [search for search in alive if search not in members]
+            if len(alive) == 1 or len({find(search) for search in alive}) == 1:
+                return
+    
+    def label(self, position: Tuple[int, int]) -> int:
+        """Component label of an (x, y) cell, -1 for walls and cells off the map"""
+        x, y = position
+        if not (0 <= x < self.cols and 0 <= y < self.rows):
+            return -1
+        return self.labels[y * self.cols + x]
+    
+    def is_reachable(self, start: Tuple[int, int], goal: Tuple[int, int]) -> bool:
+        """True if both cells are open and connected"""
+        label = self.label(start)
+        return label != -1 and label == self.label(goal)
+    
+    def reachable_from_all(self, position: Tuple[int, int], sources: Iterable[Tuple[int, int]]) -> bool:
+        """True if position is open and connected to every one of the sources"""
+        label = self.label(position)
+        return label != -1 and all(self.label(source) == label for source in sources)
+    
+    def component_size(self, position: Tuple[int, int]) -> int:
+        """Open cells connected to position, 0 for a wall"""
+        label = self.label(position)
+        return self.sizes[label] if label != -1 else 0
@@ -0,0 +1,37 @@
+# ==========================================
+# PER-MAP PRECOMPUTATION CACHE
+# ==========================================
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, TypeVar, Union
+
+from game.map import GameMap, MapSnapshot, content_key
+
+T = TypeVar("T")
+
+
+class ContentCache(Generic[T]):
+    """Small LRU of data precomputed for a map, keyed by the map's contents.
+    
+    Snapshots of one map version, and identical maps, share an entry, so each
+    map version is preprocessed once. Lookups and builds run under a lock,
+    because background searches on the thread executor reach the same cache
+    from several workers at once.
+    """
+    def __init__(self, size: int = 4):
+        self.size = size
+        self._entries: "OrderedDict[Hashable, T]" = OrderedDict()
+        self._lock = threading.RLock()
+    
+    def get(self, game_map: Union[GameMap, MapSnapshot], build: Callable[[], T], *params: Any) -> T:
+        """Entry for the map's current contents and params, calling build() on a miss"""
+        key = (content_key(game_map),) + params
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                value = self._entries[key] = build()
+                if len(self._entries) > self.size:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(key)
+            return value
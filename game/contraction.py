@@ -0,0 +1,303 @@
+# ==========================================
+# CONTRACTION HIERARCHIES
+# ==========================================
+"""Contraction hierarchy over the open cells of a map, for many queries on one map.
+
+Cells are contracted one at a time, least important first. Whenever removing a
+cell would lengthen a shortest path between two of its neighbours, a shortcut
+edge joins them. A query is then a bidirectional Dijkstra that only climbs to
+higher-ranked cells, and the shortcuts on the route are unpacked back into
+cells at the end.
+
+Build and save the hierarchy next to a map file with:
+
+    python -m game.contraction map.txt
+"""
+import argparse
+import heapq
+import os
+import struct
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple, Union
+
+from game.first_moves import map_checksum
+from game.content_cache import ContentCache
+from game.map import GameMap, MapSnapshot
+
+INFINITY = float('inf')
+
+# magic, format version, rows, cols, CRC-32 of the cells, upward edge count
+HEADER = struct.Struct("<4sHIIII")
+MAGIC = b"GCCH"
+FORMAT_VERSION = 1
+
+# Witness searches give up after settling this many cells and add the shortcut anyway
+WITNESS_LIMIT = 64
+
+
+def hierarchy_path(map_filename: str) -> str:
+    """Where the hierarchy for a map file lives"""
+    return os.path.splitext(map_filename)[0] + ".ch"
+
+
+class ContractionHierarchy:
+    """Node ranks and upward edges (original and shortcut) in compressed sparse rows.
+    
+    Edge i of cell u runs to targets[i] with weights[i]; middles[i] is the cell a
+    shortcut bypasses, or -1 for an original grid edge.
+    """
+    _cache: "ContentCache[ContractionHierarchy]" = ContentCache()
+    
+    def __init__(self, rows: int, cols: int, checksum: int, rank: array,
+                 offsets: array, targets: array, weights: array, middles: array):
+        self.rows = rows
+        self.cols = cols
+        self.checksum = checksum
+        self.rank = rank
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.middles = middles
+    
+    @classmethod
+    def for_map(cls, game_map: Union[GameMap, MapSnapshot], filename: Optional[str] = None) -> "ContractionHierarchy":
+        """Cached hierarchy for the map's current contents, read from filename or built on a miss"""
+        return cls._cache.get(game_map, lambda: (filename and cls.load(filename, game_map)) or cls.build(game_map))
+    
+    @classmethod
+    def build(cls, game_map: Union[GameMap, MapSnapshot]) -> "ContractionHierarchy":
+        """Contract every open cell in edge-difference order"""
+        cols, cells = game_map.cols, game_map.cells
+        size = len(cells)
+        # adjacency[u][v] = (weight, middle) for the graph of cells not yet contracted
+        adjacency: Dict[int, Dict[int, Tuple[int, int]]] = {}
+        for cell in range(size):
+            if cells[cell] != 0:
+                continue
+            x = cell % cols
+            adjacency[cell] = {neighbor: (1, -1) for neighbor in
+                               (cell - 1 if x > 0 else -1, cell + 1 if x < cols - 1 else -1, cell - cols, cell + cols)
+                               if 0 <= neighbor < size and cells[neighbor] == 0}
+        
+        rank = array('i', [-1]) * size
+        upward: Dict[int, Dict[int, Tuple[int, int]]] = {}
+        contracted_neighbors = dict.fromkeys(adjacency, 0)
+        queue = [(cls._priority(adjacency, cell, contracted_neighbors), cell) for cell in adjacency]
+        heapq.heapify(queue)
+        order = 0
+        while queue:
+            _, cell = heapq.heappop(queue)
+            if rank[cell] != -1:
+                continue
+            # Lazy update: re-rate the cell and put it back if it is no longer the cheapest
+            priority = cls._priority(adjacency, cell, contracted_neighbors)
+            if queue and priority > queue[0][0]:
+                heapq.heappush(queue, (priority, cell))
+                continue
+            
+            rank[cell] = order
+            order += 1
+            neighbors = adjacency.pop(cell)
+            upward[cell] = neighbors
+            for neighbor in neighbors:
+                del adjacency[neighbor][cell]
+                contracted_neighbors[neighbor] += 1
+            for u, x, weight in cls._shortcuts(adjacency, cell, neighbors):
+                if weight < adjacency[u].get(x, (INFINITY,))[0]:
+                    adjacency[u][x] = adjacency[x][u] = (weight, cell)
+        
+        offsets = array('I', [0])
+        targets, weights, middles = array('I'), array('I'), array('i')
+        for cell in range(size):
+            for neighbor, (weight, middle) in sorted(upward.get(cell, {}).items()):
+                targets.append(neighbor)
+                weights.append(weight)
+                middles.append(middle)
+            offsets.append(len(targets))
+        return cls(game_map.rows, cols, map_checksum(game_map), rank, offsets, targets, weights, middles)
+    
+    @staticmethod
+    def _shortcuts(adjacency: Dict[int, Dict[int, Tuple[int, int]]], cell: int,
+                   neighbors: Dict[int, Tuple[int, int]]) -> List[Tuple[int, int, int]]:
+        """Shortcuts (u, x, weight) needed to keep distances once cell is gone"""
+        shortcuts = []
+        items = list(neighbors.items())
+        for i, (u, (weight_u, _)) in enumerate(items):
+            rest = items[i + 1:]
+            if not rest:
+                break
+            limit = weight_u + max(weight for _, (weight, _) in rest)
+            witness = ContractionHierarchy._witness_search(adjacency, u, cell, limit)
+            for x, (weight_x, _) in rest:
+                if witness.get(x, INFINITY) > weight_u + weight_x:
+                    shortcuts.append((u, x, weight_u + weight_x))
+        return shortcuts
+    
+    @staticmethod
+    def _witness_search(adjacency: Dict[int, Dict[int, Tuple[int, int]]], source: int,
+                        avoid: int, limit: int) -> Dict[int, int]:
+        """Bounded Dijkstra from source that never passes through avoid"""
+        distances = {source: 0}
+        queue = [(0, source)]
+        settled = 0
+        while queue and settled < WITNESS_LIMIT:
+            d, u = heapq.heappop(queue)
+            if d > distances[u] or d > limit:
+                continue
+            settled += 1
+            for v, (weight, _) in adjacency.get(u, {}).items():
+                if v != avoid and d + weight < distances.get(v, INFINITY):
+                    distances[v] = d + weight
+                    heapq.heappush(queue, (d + weight, v))
+        return distances
+    
+    @classmethod
+    def _priority(cls, adjacency: Dict[int, Dict[int, Tuple[int, int]]], cell: int,
+                  contracted_neighbors: Dict[int, int]) -> int:
+        """Edge difference plus contracted neighbours, which keeps contraction spread out"""
+        neighbors = adjacency[cell]
+        shortcuts = len(cls._shortcuts(adjacency, cell, neighbors))
+        return shortcuts - len(neighbors) + contracted_neighbors[cell]
+    
+    def upward_edges(self, cell: int):
+        """(target, weight) pairs of the edges climbing out of cell"""
+        for i in range(self.offsets[cell], self.offsets[cell + 1]):
+            yield self.targets[i], self.weights[i]
+    
+    def _middle(self, a: int, b: int) -> int:
+        """Cell bypassed by the edge between a and b, or -1 for a grid edge"""
+        lower, upper = (a, b) if self.rank[a] < self.rank[b] else (b, a)
+        best = None
+        for i in range(self.offsets[lower], self.offsets[lower + 1]):
+            if self.targets[i] == upper and (best is None or self.weights[i] < self.weights[best]):
+                best = i
+        return self.middles[best]
+    
+    def query(self, source: int, target: int) -> Tuple[List[int], int]:
+        """Cells of a shortest path between two flat indices, and the number of settled nodes"""
+        if self.rank[source] == -1 or self.rank[target] == -1:
+            return [], 0
+        if source == target:
+            return [source], 0
+        
+        distances = ({source: 0}, {target: 0})
+        parents: Tuple[Dict[int, Optional[int]], Dict[int, Optional[int]]] = ({source: None}, {target: None})
+        queues = ([(0, source)], [(0, target)])
+        best, meeting = INFINITY, None
+        settled = 0
+        while queues[0] or queues[1]:
+            # Advance whichever side has the closer frontier; stop once neither can improve best
+            side = 0 if queues[0] and (not queues[1] or queues[0][0][0] <= queues[1][0][0]) else 1
+            d, u = heapq.heappop(queues[side])
+            if d >= best:
+                queues[side].clear()
+                continue
+            if d > distances[side][u]:
+                continue
+            settled += 1
+            other = distances[1 - side].get(u)
+            if other is not None and d + other < best:
+                best, meeting = d + other, u
+            for v, weight in self.upward_edges(u):
+                if d + weight < distances[side].get(v, INFINITY):
+                    distances[side][v] = d + weight
+                    parents[side][v] = u
+                    heapq.heappush(queues[side], (d + weight, v))
+        
+        if meeting is None:
+            return [], settled
+        route = []
+        node = meeting
+        while node is not None:
+            route.append(node)
+            node = parents[0][node]
+        route.reverse()
+        node = parents[1][meeting]
+        while node is not None:
+            route.append(node)
+            node = parents[1][node]
+        return self._unpack(route), settled
+    
+    def _unpack(self, route: List[int]) -> List[int]:
+        """Replace every shortcut on a route with the cells it bypasses"""
+        cells = [route[0]]
+        for a, b in zip(route, route[1:]):
+            stack = [(a, b)]
+            while stack:
+                u, v = stack.pop()
+                middle = self._middle(u, v)
+                if middle == -1:
+                    cells.append(v)
+                else:
+                    # Push the second half first so the first half is unpacked first
+                    stack.append((middle, v))
+                    stack.append((u, middle))
+        return cells
+    
+    @property
+    def shortcut_count(self) -> int:
+        """Upward edges that are shortcuts rather than grid edges"""
+        return sum(1 for middle in self.middles if middle != -1)
+    
+    def matches(self, game_map: Union[GameMap, MapSnapshot]) -> bool:
+        """Check whether the hierarchy was built for exactly this map"""
+        return (self.rows, self.cols) == (game_map.rows, game_map.cols) and self.checksum == map_checksum(game_map)
+    
+    def save(self, filename: str) -> None:
+        """Write the hierarchy in a compact binary form"""
+        with open(filename, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.rows, self.cols, self.checksum, len(self.targets)))
+            for values in (self.rank, self.offsets, self.targets, self.weights, self.middles):
+                f.write(values.tobytes())
+    
+    @classmethod
+    def load(cls, filename: str, game_map: Union[GameMap, MapSnapshot]) -> Optional["ContractionHierarchy"]:
+        """Read a saved hierarchy, or None if it is missing, corrupt or built for another map"""
+        try:
+            with open(filename, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < HEADER.size:
+            return None
+        magic, version, rows, cols, checksum, edge_count = HEADER.unpack_from(data)
+        if (magic, version) != (MAGIC, FORMAT_VERSION) or (rows, cols) != (game_map.rows, game_map.cols):
+            return None
+        if checksum != map_checksum(game_map):
+            return None
+        
+        size = rows * cols
+        arrays = [array('i'), array('I'), array('I'), array('I'), array('i')]
+        lengths = [size, size + 1, edge_count, edge_count, edge_count]
+        offset = HEADER.size
+        if len(data) != offset + sum(a.itemsize * n for a, n in zip(arrays, lengths)):
+            return None
+        for values, length in zip(arrays, lengths):
+            end = offset + values.itemsize * length
+            values.frombytes(data[offset:end])
+            offset = end
+        return cls(rows, cols, checksum, *arrays)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the contraction hierarchy for a map file")
+    parser.add_argument("map", help="map text file, e.g. map.txt")
+    parser.add_argument("--output", help="hierarchy file (default: next to the map)")
+    args = parser.parse_args()
+    
+    game_map = GameMap(args.map)
+    start = time.perf_counter()
+    hierarchy = ContractionHierarchy.build(game_map)
+    elapsed = time.perf_counter() - start
+    output = args.output or hierarchy_path(args.map)
+    hierarchy.save(output)
+    
+    nodes = sum(1 for r in hierarchy.rank if r != -1)
+    print(f"{game_map.rows}x{game_map.cols} map, {nodes} open cells")
+    print(f"contracted in {elapsed:.2f} s: {len(hierarchy.targets)} upward edges, "
+          f"{hierarchy.shortcut_count} shortcuts, file {os.path.getsize(output) / 1024:.1f} KiB -> {output}")
+
+
+if __name__ == "__main__":
+    main()
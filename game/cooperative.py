@@ -0,0 +1,233 @@
+# ==========================================
+# COOPERATIVE MULTI-AGENT PLANNING (WHCA*)
+# ==========================================
+import heapq
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from game.map import GameMap
+
+INFINITY = float('inf')
+
+
+class ReservationTable:
+    """Space-time reservations keyed by flat integers, evicted as time moves on.
+    
+    A vertex reservation blocks a cell at a tick; an edge reservation blocks the
+    opposite move on the same tick so two agents can never swap places.
+    """
+    def __init__(self, size: int):
+        self.size = size
+        self.vertices: Dict[int, int] = {}
+        self.edges: Dict[int, int] = {}
+        self.by_agent: Dict[int, List[Tuple[bool, int]]] = {}
+        self.by_time: Dict[int, List[Tuple[bool, int]]] = {}
+        self.oldest = 0
+    
+    def vertex_key(self, cell: int, t: int) -> int:
+        return t * self.size + cell
+    
+    def edge_key(self, origin: int, target: int, t: int) -> int:
+        return (t * self.size + origin) * self.size + target
+    
+    def is_free(self, origin: int, target: int, t: int, agent: int) -> bool:
+        """Check whether agent may move from origin at tick t to target at tick t + 1"""
+        holder = self.vertices.get(self.vertex_key(target, t + 1), agent)
+        if holder != agent:
+            return False
+        return self.edges.get(self.edge_key(target, origin, t), agent) == agent
+    
+    def reserve(self, agent: int, cells: Sequence[int], start_tick: int) -> None:
+        """Reserve a path that occupies cells[i] at start_tick + i"""
+        keys = self.by_agent.setdefault(agent, [])
+        for i, cell in enumerate(cells):
+            t = start_tick + i
+            self._add(agent, keys, False, self.vertex_key(cell, t), t)
+            if i + 1 < len(cells):
+                self._add(agent, keys, True, self.edge_key(cell, cells[i + 1], t), t)
+    
+    def _add(self, agent: int, keys: List[Tuple[bool, int]], is_edge: bool, key: int, t: int) -> None:
+        (self.edges if is_edge else self.vertices)[key] = agent
+        keys.append((is_edge, key))
+        self.by_time.setdefault(t, []).append((is_edge, key))
+    
+    def release(self, agent: int) -> None:
+        """Drop every reservation an agent still holds"""
+        for is_edge, key in self.by_agent.pop(agent, []):
+            table = self.edges if is_edge else self.vertices
+            if table.get(key) == agent:
+                del table[key]
+    
+    def evict_before(self, t: int) -> None:
+        """Forget reservations for ticks that have already passed"""
+        for past in range(self.oldest, t):
+            for is_edge, key in self.by_time.pop(past, []):
+                (self.edges if is_edge else self.vertices).pop(key, None)
+        self.oldest = max(self.oldest, t)
+    
+    def __len__(self) -> int:
+        return len(self.vertices) + len(self.edges)
+
+
+class ReverseResumableSearch:
+    """True distances to a goal from a backward A* that resumes on demand (RRA*)"""
+    def __init__(self, game_map: GameMap, goal: int, origin: int):
+        self.game_map = game_map
+        self.cols = game_map.cols
+        self.origin = origin
+        self.closed: Dict[int, int] = {}
+        self.best = {goal: 0}
+        self.open = [(self._estimate(goal), 0, goal)]
+    
+    def _estimate(self, cell: int) -> int:
+        """Manhattan distance to the first agent that asked, which steers the backward search"""
+        return abs(cell % self.cols - self.origin % self.cols) + abs(cell // self.cols - self.origin // self.cols)
+    
+    def distance(self, cell: int) -> float:
+        """Exact distance from cell to the goal, expanding the backward search only as far as needed"""
+        known = self.closed.get(cell)
+        if known is not None:
+            return known
+        
+        cols, size, cells = self.cols, len(self.game_map.cells), self.game_map.cells
+        while self.open:
+            _, g, current = heapq.heappop(self.open)
+            if current in self.closed:
+                continue
+            self.closed[current] = g
+            x = current % cols
+            for neighbor in (current - 1 if x > 0 else -1, current + 1 if x < cols - 1 else -1,
+                             current - cols, current + cols):
+                if 0 <= neighbor < size and cells[neighbor] == 0 and g + 1 < self.best.get(neighbor, INFINITY):
+                    self.best[neighbor] = g + 1
+                    heapq.heappush(self.open, (g + 1 + self._estimate(neighbor), g + 1, neighbor))
+            if current == cell:
+                return g
+        return INFINITY
+
+
+class CooperativePlanner:
+    """Windowed Hierarchical Cooperative A* over a shared reservation table.
+    
+    Agents plan one after another in space-time (cell, tick), waiting or moving
+    around cells reserved by earlier agents, and search only `window` ticks deep;
+    beyond the window the cached RRA* distance stands in for the rest of the route.
+    Stepping onto weighted terrain costing c is planned as c - 1 waits followed
+    by the move, with every one of those ticks reserved, so the plan matches the
+    ticks a ghost really spends there. Ticks an agent has already waited on its
+    start cell count toward the first such step, so replanning more often than
+    a costly step takes never starts the wait over.
+    """
+    def __init__(self, game_map: GameMap, window: int = 16, cache_size: int = 32):
+        self.game_map = game_map
+        self.window = window
+        self.cache_size = cache_size
+        self.table = ReservationTable(game_map.rows * game_map.cols)
+        self.table_version = game_map.version
+        self.heuristics: "OrderedDict[Tuple[int, int], ReverseResumableSearch]" = OrderedDict()
+        self.nodes_expanded = 0
+        game_map.subscribe(self.invalidate)
+    
+    def invalidate(self, cells: Optional[List[Tuple[int, int]]] = None) -> None:
+        """Forget the RRA* distances of the map as it was before a change"""
+        self.heuristics.clear()
+    
+    def reset(self) -> None:
+        """Drop all reservations, e.g. when a new race starts back at tick 0"""
+        self.table = ReservationTable(self.game_map.rows * self.game_map.cols)
+        self.table_version = self.game_map.version
+    
+    def heuristic_for(self, goal: int, origin: int) -> ReverseResumableSearch:
+        """RRA* distances to goal, cached per goal and map version"""
+        key = (goal, self.game_map.version)
+        search = self.heuristics.get(key)
+        if search is None:
+            search = ReverseResumableSearch(self.game_map, goal, origin)
+            self.heuristics[key] = search
+            if len(self.heuristics) > self.cache_size:
+                self.heuristics.popitem(last=False)
+        else:
+            self.heuristics.move_to_end(key)
+        return search
+    
+    def plan(self, agents: Sequence[Tuple[int, Tuple[int, int], Tuple[int, int]]], now: int,
+             waited: Optional[Dict[int, int]] = None) -> Dict[int, List[Tuple[int, int]]]:
+        """Plan (agent id, start, goal) triples in priority order, return each agent's next cells.
+        
+        waited maps agent ids to the ticks they have already stood on their start cell.
+        """
+        if self.table_version != self.game_map.version:
+            self.reset()
+        self.table.evict_before(now)
+        for agent, _, _ in agents:
+            self.table.release(agent)
+        
+        cols = self.game_map.cols
+        plans = {}
+        for agent, start, goal in agents:
+            start_cell = start[1] * cols + start[0]
+            goal_cell = goal[1] * cols + goal[0]
+            cells = self._search(agent, start_cell, goal_cell, now, (waited or {}).get(agent, 0))
+            if cells is None:
+                # Boxed in for the whole window: hold position and try again next replan
+                cells = [start_cell] * (self.window + 1)
+            self.table.reserve(agent, cells, now)
+            plans[agent] = [(cell % cols, cell // cols) for cell in cells[1:]]
+        return plans
+    
+    def _search(self, agent: int, start: int, goal: int, now: int, waited: int = 0) -> Optional[List[int]]:
+        """Space-time A* from start at tick now, at most window ticks deep, after waited ticks on start"""
+        heuristic = self.heuristic_for(goal, start)
+        if heuristic.distance(start) == INFINITY:
+            return None
+        
+        cols, size, cells = self.game_map.cols, len(self.game_map.cells), self.game_map.cells
+        costs = self.game_map.costs if self.game_map.max_cost > 1 else None
+        table = self.table
+        parents: Dict[Tuple[int, int], Optional[Tuple[int, int]]] = {(start, 0): None}
+        resting = {(start, 0)}  # Nodes reached by only waiting on start, which keep its credit
+        open_set = [(heuristic.distance(start), 0, start)]
+        
+        while open_set:
+            _, depth, cell = heapq.heappop(open_set)
+            self.nodes_expanded += 1
+            if cell == goal or depth >= self.window:
+                path = []
+                node = (cell, depth)
+                while node is not None:
+                    path.append(node[0])
+                    parent = parents[node]
+                    if parent is not None:
+                        path.extend([parent[0]] * (node[1] - parent[1] - 1))  # Waits before a costly step
+                    node = parent
+                return path[::-1]
+            
+            x = cell % cols
+            t = now + depth
+            at_rest = (cell, depth) in resting
+            rested = waited + depth if at_rest else 0
+            # Waiting in place is an action too
+            for neighbor in (cell, cell - 1 if x > 0 else -1, cell + 1 if x < cols - 1 else -1,
+                             cell - cols, cell + cols):
+                if not (0 <= neighbor < size and cells[neighbor] == 0):
+                    continue
+                cost = max(1, costs[neighbor] - rested) if costs is not None and neighbor != cell else 1
+                node = (neighbor, depth + cost)
+                if node in parents or not self._is_free(cell, neighbor, t, cost, agent):
+                    continue
+                remaining = heuristic.distance(neighbor)
+                if remaining == INFINITY:
+                    continue
+                parents[node] = (cell, depth)
+                if at_rest and neighbor == cell:
+                    resting.add(node)
+                heapq.heappush(open_set, (depth + cost + remaining, depth + cost, neighbor))
+        return None
+    
+    def _is_free(self, cell: int, neighbor: int, t: int, cost: int, agent: int) -> bool:
+        """Check the cost - 1 waits on cell from tick t and the move onto neighbor after them"""
+        table = self.table
+        for wait in range(t, t + cost - 1):
+            if not table.is_free(cell, cell, wait, agent):
+                return False
+        return table.is_free(cell, neighbor, t + cost - 1, agent)
@@ -0,0 +1,266 @@
+# ==========================================
+# CORRIDOR CONTRACTION AND DEAD-END PRUNING
+# ==========================================
+import heapq
+from array import array
+from typing import Dict, List, Optional, Tuple, Union
+
+from game.content_cache import ContentCache
+from game.map import GameMap, MapSnapshot
+
+INFINITY = float('inf')
+
+
+class CorridorGraph:
+    """Compact graph of a maze: dead ends peeled off, corridors collapsed into weighted edges.
+    
+    Cells that can only lead into a dead end are peeled away and remember the
+    next cell toward the rest of the map. What is left is split into junction
+    nodes, where the way branches, and corridors, which become one weighted
+    edge between two junctions. Searches run on the junction graph and only
+    the final route is expanded back into cells.
+    """
+    _cache: "ContentCache[CorridorGraph]" = ContentCache()
+    
+    def __init__(self, game_map: Union[GameMap, MapSnapshot]):
+        self.cols = game_map.cols
+        cells = game_map.cells
+        size = len(cells)
+        self.open = bytes(1 if value == 0 else 0 for value in cells)
+        self.dead = bytearray(size)
+        self.exit = array('i', [-1]) * size      # Dead-end cells: next cell toward the core
+        self.node_of = array('i', [-1]) * size   # Junction cells: node index
+        self.corridor_of = array('i', [-1]) * size
+        self.corridor_pos = array('i', [0]) * size
+        self.nodes: List[int] = []
+        # Corridor k runs from node ends[k][0] through interiors[k] to node ends[k][1]
+        self.ends: List[Tuple[int, int]] = []
+        self.interiors: List[List[int]] = []
+        self.edges: List[List[Tuple[int, int, int]]] = []  # Per node: (other node, weight, corridor)
+        degree = self._prune_dead_ends(size)
+        self._collapse_corridors(size, degree)
+    
+    @classmethod
+    def for_map(cls, game_map: Union[GameMap, MapSnapshot]) -> "CorridorGraph":
+        """Cached graph for the map's current contents"""
+        return cls._cache.get(game_map, lambda: cls(game_map))
+    
+    def neighbors(self, cell: int) -> List[int]:
+        """Open cells next to a flat index"""
+        cols, size = self.cols, len(self.open)
+        x = cell % cols
+        return [n for n in (cell - 1 if x > 0 else -1, cell + 1 if x < cols - 1 else -1, cell - cols, cell + cols)
+                if 0 <= n < size and self.open[n]]
+    
+    def _prune_dead_ends(self, size: int) -> array:
+        """Peel cells with at most one live neighbour until none are left; return live degrees"""
+        degree = array('i', [0]) * size
+        stack = []
+        for cell in range(size):
+            if self.open[cell]:
+                degree[cell] = len(self.neighbors(cell))
+                if degree[cell] <= 1:
+                    stack.append(cell)
+        while stack:
+            cell = stack.pop()
+            if self.dead[cell]:
+                continue
+            self.dead[cell] = 1
+            for neighbor in self.neighbors(cell):
+                if not self.dead[neighbor]:
+                    self.exit[cell] = neighbor
+                    degree[neighbor] -= 1
+                    if degree[neighbor] <= 1:
+                        stack.append(neighbor)
+        return degree
+    
+    def _collapse_corridors(self, size: int, degree: array) -> None:
+        """Make every live cell that is not a plain corridor cell a node, then walk the corridors"""
+        for cell in range(size):
+            if self.open[cell] and not self.dead[cell] and degree[cell] != 2:
+                self._add_node(cell)
+        for node in range(len(self.nodes)):
+            self._walk_from(node)
+        # Loops with no junction at all still need one node to hang the corridor on
+        for cell in range(size):
+            if self.open[cell] and not self.dead[cell] and self.node_of[cell] == -1 and self.corridor_of[cell] == -1:
+                self._walk_from(self._add_node(cell))
+    
+    def _add_node(self, cell: int) -> int:
+        self.node_of[cell] = len(self.nodes)
+        self.nodes.append(cell)
+        self.edges.append([])
+        return self.node_of[cell]
+    
+    def _live_neighbors(self, cell: int) -> List[int]:
+        return [n for n in self.neighbors(cell) if not self.dead[n]]
+    
+    def _walk_from(self, node: int) -> None:
+        """Follow each corridor leaving a node to the node at its other end"""
+        origin = self.nodes[node]
+        for first in self._live_neighbors(origin):
+            if self.corridor_of[first] != -1:
+                continue  # Already walked from its other end
+            interior = []
+            previous, cell = origin, first
+            while self.node_of[cell] == -1:
+                interior.append(cell)
+                following = [n for n in self._live_neighbors(cell) if n != previous]
+                previous, cell = cell, following[0]
+            other = self.node_of[cell]
+            if not interior and other < node:
+                continue  # Adjacent junctions: record the edge once
+            corridor = len(self.ends)
+            self.ends.append((node, other))
+            self.interiors.append(interior)
+            for position, inner in enumerate(interior):
+                self.corridor_of[inner] = corridor
+                self.corridor_pos[inner] = position
+            if other == node:
+                continue  # A loop back to the same junction never shortens a route
+            weight = len(interior) + 1
+            self.edges[node].append((other, weight, corridor))
+            self.edges[other].append((node, weight, corridor))
+    
+    def _climb(self, cell: int) -> List[int]:
+        """Cells from a dead-end cell out to the first live cell (or the root of a dead tree)"""
+        chain = [cell]
+        while self.dead[cell] and self.exit[cell] != -1:
+            cell = self.exit[cell]
+            chain.append(cell)
+        return chain
+    
+    def _attachments(self, cell: int) -> List[Tuple[int, int, List[int]]]:
+        """Nodes a live cell can reach directly: (node, cost, cells leaving the cell toward it)"""
+        node = self.node_of[cell]
+        if node != -1:
+            return [(node, 0, [])]
+        corridor = self.corridor_of[cell]
+        position = self.corridor_pos[cell]
+        interior = self.interiors[corridor]
+        a, b = self.ends[corridor]
+        return [(a, position + 1, interior[:position][::-1] + [self.nodes[a]]),
+                (b, len(interior) - position, interior[position + 1:] + [self.nodes[b]])]
+    
+    def _corridor_cells(self, origin: int, corridor: int) -> List[int]:
+        """Cells after origin node along a corridor, ending with the node at the far end"""
+        a, b = self.ends[corridor]
+        if origin == a:
+            return self.interiors[corridor] + [self.nodes[b]]
+        return self.interiors[corridor][::-1] + [self.nodes[a]]
+    
+    def route(self, start: int, goal: int, strategy: str = "dijkstra") -> Tuple[List[int], int]:
+        """Shortest path of flat cells from start to goal and the number of expanded nodes.
+        
+        strategy picks the search run on the junction graph: "dijkstra", "astar"
+        (Manhattan heuristic) or "bfs", breadth-first over distance buckets,
+        which is what BFS becomes once edges have integer lengths.
+        """
+        if not (self.open[start] and self.open[goal]):
+            return [], 0
+        start_chain, goal_chain = self._climb(start), self._climb(goal)
+        shared = {cell: i for i, cell in enumerate(goal_chain)}
+        for i, cell in enumerate(start_chain):
+            if cell in shared:
+                # Both ends hang off the same dead-end tree, or the same live cell
+                return start_chain[:i + 1] + goal_chain[:shared[cell]][::-1], 0
+        a, b = start_chain[-1], goal_chain[-1]
+        if self.dead[a] or self.dead[b]:
+            return [], 0  # One end sits in a component that is nothing but a tree
+        
+        core, expanded = self._core_route(a, b, strategy)
+        if not core:
+            return [], expanded
+        return start_chain[:-1] + core + goal_chain[:-1][::-1], expanded
+    
+    def _core_route(self, a: int, b: int, strategy: str) -> Tuple[List[int], int]:
+        """Route between two live cells over the junction graph"""
+        best, best_node = INFINITY, None
+        if self.node_of[a] == -1 and self.corridor_of[a] == self.corridor_of[b] and self.node_of[b] == -1:
+            # Same corridor: walking straight along it is a candidate
+            corridor = self.interiors[self.corridor_of[a]]
+            pa, pb = self.corridor_pos[a], self.corridor_pos[b]
+            best = abs(pa - pb)
+            direct = corridor[pa:pb + 1] if pa <= pb else corridor[pb:pa + 1][::-1]
+        goal_costs: Dict[int, Tuple[int, List[int]]] = {}
+        for node, cost, cells in self._attachments(b):
+            # Both ends of a loop corridor are the same node; keep the shorter way round
+            if cost < goal_costs.get(node, (INFINITY,))[0]:
+                goal_costs[node] = (cost, cells)
+        
+        cols = self.cols
+        bx, by = b % cols, b // cols
+        def estimate(node: int) -> int:
+            if strategy != "astar":
+                return 0
+            cell = self.nodes[node]
+            return abs(cell % cols - bx) + abs(cell // cols - by)
+        
+        distances: Dict[int, int] = {}
+        parents: Dict[int, Tuple[Optional[int], object]] = {}
+        buckets: Dict[int, List[int]] = {}
+        queue: List[Tuple[int, int]] = []
+        def push(node: int, d: int) -> None:
+            if strategy == "bfs":
+                buckets.setdefault(d, []).append(node)
+            else:
+                heapq.heappush(queue, (d + estimate(node), node))
+        
+        for node, cost, cells in self._attachments(a):
+            if cost < distances.get(node, INFINITY):
+                distances[node] = cost
+                parents[node] = (None, cells)
+                push(node, cost)
+        
+        expanded = 0
+        level = 0
+        settled = set()
+        while True:
+            if strategy == "bfs":
+                while level not in buckets and level < best and buckets:
+                    level += 1
+                if level >= best or not buckets:
+                    break
+                node = buckets[level].pop()
+                if not buckets[level]:
+                    del buckets[level]
+                d = level
+            else:
+                if not queue or queue[0][0] >= best:
+                    break
+                _, node = heapq.heappop(queue)
+                d = distances[node]
+            if node in settled or d > distances[node]:
+                continue
+            settled.add(node)
+            expanded += 1
+            if node in goal_costs and d + goal_costs[node][0] < best:
+                best, best_node = d + goal_costs[node][0], node
+            for other, weight, corridor in self.edges[node]:
+                if d + weight < distances.get(other, INFINITY):
+                    distances[other] = d + weight
+                    parents[other] = (node, corridor)
+                    push(other, d + weight)
+        
+        if best_node is None:
+            return (direct, expanded) if best != INFINITY else ([], expanded)
+        
+        # Expand corridors only for the final route, walking back from the goal side
+        pieces = []
+        node = best_node
+        while True:
+            previous, via = parents[node]
+            if previous is None:
+                pieces.append(via)
+                break
+            pieces.append(self._corridor_cells(previous, via))
+            node = previous
+        route = [a]
+        for piece in reversed(pieces):
+            route.extend(piece)
+        # The goal attachment was built leaving b, so walk it backwards into b
+        leaving_b = goal_costs[best_node][1]
+        route.extend(leaving_b[:-1][::-1])
+        if route[-1] != b:
+            route.append(b)
+        return route, expanded
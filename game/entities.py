@@ -2,42 +2,129 @@
 import math
 import random
 import time
-from typing import List, Tuple
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
 import pygame
 
 from config import Config
+from game.connectivity import DynamicConnectivity
+from game.path_cache import PathCache
 from game.pathfinding import PathfindingAlgorithm
 from game.map import GameMap
 
 class Ghost:
     """Represents a ghost in the game"""
-    def __init__(self, name: str, color: str, start_pos: Tuple[int, int], algorithm: PathfindingAlgorithm):
+    def __init__(self, name: str, color: str, start_pos: Tuple[int, int], algorithm: PathfindingAlgorithm,
+                 path_cache: Optional[PathCache] = None):
         self.name = name
         self.color = color
         self.position = list(start_pos)
+        self.previous_position = list(start_pos)
         self.algorithm = algorithm
         self.path = []
+        self.targets: List[Tuple[int, int]] = []  # Cherries still to collect, in tour order
         self.finish_time = None
         self.algorithm_name = algorithm.name
+        self.pending: Optional[Future] = None
+        self.pending_generation = None
+        self.pending_query: Optional[Tuple[Tuple[int, int], Tuple[int, int]]] = None
+        self.path_cache = path_cache  # Paths already found for the same query on the same map
+        self.stalled = 0  # Ticks spent so far on this cell, waiting to step onto costly terrain
+        self.paced = False  # The path already spends terrain costs as waits (cooperative plans)
     
     def reset(self, start_pos: Tuple[int, int]) -> None:
         """Reset the ghost to its start position"""
         self.position = list(start_pos)
+        self.previous_position = list(start_pos)
         self.path = []
+        self.targets = []
         self.finish_time = None
+        self.stalled = 0
+        self.paced = False
+        self.cancel_pending()
     
-    def find_path_to(self, target: Tuple[int, int]) -> None:
-        """Find a path to the target position"""
-        self.path = self.algorithm.find_path(tuple(self.position), target)
-        if self.path:
-            self.path.pop(0)  # Remove current position
+    def find_path_to(self, target: Tuple[int, int], planner=None, generation: int = 0) -> None:
+        """Find a path to the target position, in the background if a planner is given"""
+        start = tuple(self.position)
+        cached = self.path_cache.lookup(self.algorithm, start, target) if self.path_cache is not None else None
+        if planner is None or cached is not None:
+            self.cancel_pending()
+            self.path = cached if cached is not None else self.algorithm.find_path(start, target)
+            if cached is None and self.path_cache is not None:
+                self.path_cache.store(self.algorithm, start, target, self.path)
+            if self.path:
+                self.path = self.path[1:]  # Remove current position
+            return
+        
+        self.cancel_pending()
+        snapshot = self.algorithm.game_map.snapshot()
+        self.pending = planner.submit(self.algorithm, snapshot, start, target)
+        self.pending_generation = generation
+        self.pending_query = (start, target)
+    
+    def poll_path(self, generation: int) -> bool:
+        """Adopt a finished background search, return True if a new path was taken"""
+        if self.pending is None or not self.pending.done():
+            return False
+        
+        future, self.pending = self.pending, None
+        # Discard results planned against an older map or cherry
+        if future.cancelled() or future.exception() is not None or self.pending_generation != generation:
+            return False
+        
+        path, self.algorithm.stats = future.result()
+        if self.path_cache is not None:
+            self.path_cache.store(self.algorithm, *self.pending_query, path)
+        if not path or list(path[0]) != self.position:
+            return False
+        self.path = path[1:]
+        return True
+    
+    def refine_path(self, deadline: float) -> bool:
+        """Take a better path from an anytime algorithm, searching until deadline; return True if taken"""
+        if not self.targets or self.pending is not None:
+            return False
+        path = self.algorithm.refine(tuple(self.position), self.targets[0], deadline)
+        if not path:
+            return False
+        self.path = path[1:]
+        return True
+    
+    def cancel_pending(self) -> None:
+        """Forget any in-flight background search"""
+        if self.pending is not None:
+            self.pending.cancel()
+            self.pending = None
     
     def move(self) -> bool:
-        """Move along the path if available, return True if moved"""
+        """Move along the path if available, else ask the algorithm for one step; return True if moved"""
+        if self.path:
+            step = self.path[0]
+        elif self.targets:
+            step = self.algorithm.next_step(tuple(self.position), self.targets[0])
+            if step is None:
+                return False
+        else:
+            return False
+        
+        # Stepping onto weighted terrain takes as many ticks as the cell costs; paced paths
+        # spell those ticks out as waits, which count toward the cost the same way
+        moving = list(step) != self.position
+        if moving and not (self.paced and self.path):
+            self.stalled += 1
+            if self.stalled < self.algorithm.game_map.terrain_cost(*step):
+                return False
+        self.stalled = 0 if moving else self.stalled + 1
         if self.path:
-            self.position = list(self.path.pop(0))
-            return True
-        return False
+            self.path.pop(0)
+        self.position = list(step)
+        return True
+    
+    def render_position(self, alpha: float) -> Tuple[float, float]:
+        """Position interpolated between the last two ticks, alpha in [0, 1]"""
+        px, py = self.previous_position
+        x, y = self.position
+        return px + (x - px) * alpha, py + (y - py) * alpha
     
     def reached_position(self, pos: Tuple[int, int]) -> bool:
         """Check if the ghost reached a specific position"""
@@ -55,6 +142,9 @@ class Cherry:
         if ghost_positions is None:
             ghost_positions = []
             
+        # Component labels kept current across wall edits, so each check is a lookup
+        connectivity = DynamicConnectivity.for_map(self.game_map)
+        
         max_attempts = 100
         for _ in range(max_attempts):
             x = random.randint(1, self.game_map.cols - 2)
@@ -62,12 +152,8 @@ class Cherry:
             
             if self.game_map.is_valid_position(x, y):
                 # Check if the position is reachable from all ghost positions
-                reachable = True
-                for ghost_pos in ghost_positions:
-                    # We'd need a proper pathfinding check here
-                    # But for simplicity, we'll assume it's reachable
-                    pass
-                    
+                reachable = connectivity.reachable_from_all((x, y), ghost_positions)
+                
                 if reachable:
                     self.position = [x, y]
                     return
@@ -75,8 +161,13 @@ class Cherry:
         # If we couldn't find a valid position, use a default
         self.position = [2, 1]
     
-    def draw(self, surface: pygame.Surface, x: int, y: int, tile_size: int, cherry_img: pygame.Surface) -> None:
+    def draw(self, surface: pygame.Surface, x: int, y: int, tile_size: int, cherry_img: pygame.Surface,
+             glow: bool = True) -> None:
         """Draw the cherry with a pulsating effect"""
+        if not glow:
+            surface.blit(cherry_img, (x + self.position[0]*tile_size, y + self.position[1]*tile_size))
+            return
+        
         cherry_pulse = math.sin(time.time() * 5) * 2 + 2
         cherry_glow = pygame.Surface((tile_size + cherry_pulse*2, tile_size + cherry_pulse*2), pygame.SRCALPHA)
         pygame.draw.circle(cherry_glow, (Config.CHERRY_RED[0], Config.CHERRY_RED[1], Config.CHERRY_RED[2], 100), 
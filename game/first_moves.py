@@ -0,0 +1,244 @@
+# ==========================================
+# COMPRESSED FIRST-MOVE PATH DATABASE
+# ==========================================
+"""Offline table of the first move of an optimal path for every (source, target) pair.
+
+For each source the first moves toward all targets are listed in depth-first
+order, where neighbouring targets usually share a first move, and stored as
+runs. A run keeps every move that is optimal for all of its targets, so runs
+grow as long as possible before one move is picked for it. A query is a single
+binary search over the runs of one source.
+
+Build the database next to a map file with:
+
+    python -m game.first_moves map.txt
+"""
+import argparse
+import os
+import struct
+import time
+import zlib
+from array import array
+from bisect import bisect_right
+from typing import List, Optional, Tuple, Union
+
+from game.flowfield import DIRECTION_STEPS
+from game.map import GameMap, MapSnapshot
+
+# magic, format version, rows, cols, CRC-32 of the cells, run count
+HEADER = struct.Struct("<4sHIIII")
+MAGIC = b"GCFM"
+FORMAT_VERSION = 1
+
+# Any move will do: the target is the source itself or cannot be reached
+WILDCARD = 0b1111
+
+
+def database_path(map_filename: str) -> str:
+    """Where the database for a map file lives"""
+    return os.path.splitext(map_filename)[0] + ".fmdb"
+
+
+def map_checksum(game_map: Union[GameMap, MapSnapshot]) -> int:
+    """CRC-32 of the map cells, to tell whether a database still matches"""
+    return zlib.crc32(bytes(game_map.cells))
+
+
+class FirstMoveDatabase:
+    """Run-length compressed first moves, queried in O(log runs) per step"""
+    def __init__(self, game_map: Union[GameMap, MapSnapshot], offsets: array, starts: array, moves: bytearray):
+        self.rows = game_map.rows
+        self.cols = game_map.cols
+        self.checksum = map_checksum(game_map)
+        self.order, self.rank, self.component = self._ordering(game_map)
+        self.offsets = offsets  # Runs of the source ranked i are offsets[i]:offsets[i + 1]
+        self.starts = starts    # Rank of the first target in each run
+        self.moves = moves      # Move of each run, 2 bits per run
+    
+    @staticmethod
+    def _ordering(game_map: Union[GameMap, MapSnapshot]) -> Tuple[List[int], array, array]:
+        """Depth-first preorder of the open cells, each cell's rank in it, and component labels"""
+        cols, cells = game_map.cols, game_map.cells
+        size = len(cells)
+        order: List[int] = []
+        rank = array('i', [-1]) * size
+        component = array('i', [-1]) * size
+        label = 0
+        for root in range(size):
+            if cells[root] != 0 or rank[root] != -1:
+                continue
+            stack = [root]
+            while stack:
+                cell = stack.pop()
+                if rank[cell] != -1:
+                    continue
+                rank[cell] = len(order)
+                component[cell] = label
+                order.append(cell)
+                x = cell % cols
+                # Pushed in reverse so the left neighbour is visited first
+                for neighbor in (cell + cols, cell - cols, cell + 1 if x < cols - 1 else -1, cell - 1 if x > 0 else -1):
+                    if 0 <= neighbor < size and cells[neighbor] == 0 and rank[neighbor] == -1:
+                        stack.append(neighbor)
+            label += 1
+        return order, rank, component
+    
+    @classmethod
+    def build(cls, game_map: Union[GameMap, MapSnapshot]) -> "FirstMoveDatabase":
+        """Run one BFS per open cell and compress its first moves"""
+        order, _, _ = cls._ordering(game_map)
+        typecode = 'H' if len(order) <= 0xFFFF else 'I'
+        offsets = array('I', [0])
+        starts = array(typecode)
+        run_moves: List[int] = []
+        for source in order:
+            masks = cls._first_move_masks(game_map, source)
+            current = 0
+            for index, target in enumerate(order):
+                mask = masks[target] or WILDCARD
+                if current & mask:
+                    current &= mask
+                    continue
+                if current:
+                    run_moves.append((current & -current).bit_length() - 1)
+                starts.append(index)
+                current = mask
+            run_moves.append((current & -current).bit_length() - 1)
+            offsets.append(len(starts))
+        return cls(game_map, offsets, starts, cls._pack(run_moves))
+    
+    @staticmethod
+    def _first_move_masks(game_map: Union[GameMap, MapSnapshot], source: int) -> bytearray:
+        """BFS from source; each reached cell gets the set of optimal first moves toward it"""
+        cols, cells = game_map.cols, game_map.cells
+        size = len(cells)
+        distances = array('i', [-1]) * size
+        masks = bytearray(size)
+        distances[source] = 0
+        queue = []
+        x = source % cols
+        for move, neighbor in enumerate((source - 1 if x > 0 else -1, source + 1 if x < cols - 1 else -1,
+                                         source - cols, source + cols)):
+            if 0 <= neighbor < size and cells[neighbor] == 0:
+                distances[neighbor] = 1
+                masks[neighbor] = 1 << move
+                queue.append(neighbor)
+        for cell in queue:
+            d = distances[cell] + 1
+            mask = masks[cell]
+            x = cell % cols
+            for neighbor in (cell - 1 if x > 0 else -1, cell + 1 if x < cols - 1 else -1, cell - cols, cell + cols):
+                if not (0 <= neighbor < size and cells[neighbor] == 0):
+                    continue
+                if distances[neighbor] == -1:
+                    distances[neighbor] = d
+                    masks[neighbor] = mask
+                    queue.append(neighbor)
+                elif distances[neighbor] == d:
+                    masks[neighbor] |= mask  # Another shortest path arrives with other first moves
+        return masks
+    
+    @staticmethod
+    def _pack(moves: List[int]) -> bytearray:
+        """Pack 2-bit moves four to a byte"""
+        packed = bytearray((len(moves) + 3) // 4)
+        for i, move in enumerate(moves):
+            packed[i >> 2] |= move << ((i & 3) << 1)
+        return packed
+    
+    @property
+    def nbytes(self) -> int:
+        """Size of the compressed tables"""
+        return (self.offsets.itemsize * len(self.offsets) + self.starts.itemsize * len(self.starts)
+                + len(self.moves))
+    
+    def matches(self, game_map: Union[GameMap, MapSnapshot]) -> bool:
+        """Check whether the database was built for exactly this map"""
+        return (self.rows, self.cols) == (game_map.rows, game_map.cols) and self.checksum == map_checksum(game_map)
+    
+    def first_move(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[int]:
+        """Direction of the first step from start toward goal, None at the goal or when cut off"""
+        source = start[1] * self.cols + start[0]
+        target = goal[1] * self.cols + goal[0]
+        rank = self.rank
+        if source == target or rank[source] == -1 or rank[target] == -1:
+            return None
+        if self.component[source] != self.component[target]:
+            return None
+        i = rank[source]
+        run = bisect_right(self.starts, rank[target], self.offsets[i], self.offsets[i + 1]) - 1
+        return (self.moves[run >> 2] >> ((run & 3) << 1)) & 3
+    
+    def next_step(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        """Cell one optimal step from start toward goal"""
+        move = self.first_move(start, goal)
+        if move is None:
+            return None
+        dx, dy = DIRECTION_STEPS[move]
+        return (start[0] + dx, start[1] + dy)
+    
+    def save(self, filename: str) -> None:
+        """Write the database in a compact binary form"""
+        with open(filename, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.rows, self.cols, self.checksum, len(self.starts)))
+            f.write(self.starts.typecode.encode())
+            f.write(self.offsets.tobytes())
+            f.write(self.starts.tobytes())
+            f.write(bytes(self.moves))
+    
+    @classmethod
+    def load(cls, filename: str, game_map: Union[GameMap, MapSnapshot]) -> Optional["FirstMoveDatabase"]:
+        """Read a saved database, or None if it is missing, corrupt or built for another map"""
+        try:
+            with open(filename, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < HEADER.size + 1:
+            return None
+        magic, version, rows, cols, checksum, run_count = HEADER.unpack_from(data)
+        if (magic, version) != (MAGIC, FORMAT_VERSION) or (rows, cols) != (game_map.rows, game_map.cols):
+            return None
+        if checksum != map_checksum(game_map):
+            return None
+        
+        order, _, _ = cls._ordering(game_map)
+        offset = HEADER.size + 1
+        offsets = array('I')
+        starts = array(chr(data[HEADER.size]))
+        offsets_end = offset + offsets.itemsize * (len(order) + 1)
+        starts_end = offsets_end + starts.itemsize * run_count
+        if len(data) != starts_end + (run_count + 3) // 4:
+            return None
+        offsets.frombytes(data[offset:offsets_end])
+        starts.frombytes(data[offsets_end:starts_end])
+        return cls(game_map, offsets, starts, bytearray(data[starts_end:]))
+    
+    @classmethod
+    def for_map_file(cls, game_map: GameMap) -> Optional["FirstMoveDatabase"]:
+        """Database stored next to the map's file, if one matches the current cells"""
+        return cls.load(database_path(game_map.filename), game_map)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the first-move database for a map file")
+    parser.add_argument("map", help="map text file, e.g. map.txt")
+    parser.add_argument("--output", help="database file (default: next to the map)")
+    args = parser.parse_args()
+    
+    game_map = GameMap(args.map)
+    start = time.perf_counter()
+    database = FirstMoveDatabase.build(game_map)
+    elapsed = time.perf_counter() - start
+    output = args.output or database_path(args.map)
+    database.save(output)
+    
+    pairs = len(database.order) ** 2
+    print(f"{game_map.rows}x{game_map.cols} map, {len(database.order)} open cells, {pairs} pairs")
+    print(f"built in {elapsed:.2f} s: {len(database.starts)} runs, {database.nbytes / 1024:.1f} KiB "
+          f"({database.nbytes * 8 / max(1, pairs):.3f} bits per pair), "
+          f"file {os.path.getsize(output) / 1024:.1f} KiB -> {output}")
+
+
+if __name__ == "__main__":
+    main()
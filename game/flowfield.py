@@ -0,0 +1,148 @@
+# ==========================================
+# FLOW FIELD NAVIGATION
+# ==========================================
+from array import array
+from typing import Optional, Tuple
+import pygame
+
+from game.map import GameMap
+
+UNREACHED = -1
+
+# Directions packed 2 bits per cell, four cells per byte
+LEFT, RIGHT, UP, DOWN = range(4)
+DIRECTION_STEPS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+class FlowField:
+    """Per-cell direction toward a single goal, built from one BFS integration pass.
+    
+    The field is double-buffered: retarget() starts a new pass that advance()
+    runs a slice at a time, while lookups keep serving the last finished field.
+    A moved goal or a map edit re-integrates the whole map, only spread over
+    several ticks; no part of the old field is repaired in place.
+    """
+    def __init__(self, game_map: GameMap):
+        self.game_map = game_map
+        self.goal: Optional[Tuple[int, int]] = None
+        self.version = None
+        self._allocate()
+        self._pass = None
+    
+    def _allocate(self) -> None:
+        """Size both buffers to the current map"""
+        size = self.game_map.rows * self.game_map.cols
+        self.size = size
+        self.distances = array('i', [UNREACHED]) * size
+        self.directions = bytearray((size + 3) // 4)
+        self._back_distances = array('i', [UNREACHED]) * size
+        self._back_directions = bytearray((size + 3) // 4)
+    
+    @property
+    def computing(self) -> bool:
+        """True while an integration pass is still in progress"""
+        return self._pass is not None
+    
+    def is_current(self, goal: Tuple[int, int]) -> bool:
+        """Check whether the finished field already targets goal on the current map"""
+        return self.goal == tuple(goal) and self.version == self.game_map.version and not self.computing
+    
+    def retarget(self, goal: Tuple[int, int]) -> None:
+        """Start an integration pass toward a new goal"""
+        if self.game_map.rows * self.game_map.cols != self.size:
+            self._allocate()
+        
+        self._back_distances = distances = array('i', [UNREACHED]) * self.size
+        self._back_directions = bytearray(len(self.directions))
+        
+        queue = []
+        if self.game_map.is_valid_position(*goal):
+            start = goal[1] * self.game_map.cols + goal[0]
+            distances[start] = 0
+            queue.append(start)
+        self._pass = (tuple(goal), self.game_map.version, queue, 0)
+    
+    def advance(self, budget: Optional[int] = None) -> bool:
+        """Expand up to budget cells of the pending pass, return True once the field is current"""
+        if self._pass is None:
+            return True
+        goal, version, queue, head = self._pass
+        if version != self.game_map.version:
+            # The map changed under the pass; start it again
+            self.retarget(goal)
+            goal, version, queue, head = self._pass
+        
+        cols = self.game_map.cols
+        size = self.size
+        cells = self.game_map.cells
+        distances, directions = self._back_distances, self._back_directions
+        stop = head + budget if budget is not None else None
+        
+        while head < len(queue) and (stop is None or head < stop):
+            cell = queue[head]
+            head += 1
+            d = distances[cell] + 1
+            x = cell % cols
+            # The neighbour's direction points back at the cell it was reached from
+            for neighbor, toward in ((cell - 1 if x > 0 else -1, RIGHT), (cell + 1 if x < cols - 1 else -1, LEFT),
+                                     (cell - cols, DOWN), (cell + cols, UP)):
+                if 0 <= neighbor < size and cells[neighbor] == 0 and distances[neighbor] == UNREACHED:
+                    distances[neighbor] = d
+                    directions[neighbor >> 2] |= toward << ((neighbor & 3) << 1)
+                    queue.append(neighbor)
+        
+        if head < len(queue):
+            self._pass = (goal, version, queue, head)
+            return False
+        
+        # Pass finished: swap buffers so lookups see the new field
+        self.distances, self._back_distances = self._back_distances, self.distances
+        self.directions, self._back_directions = self._back_directions, self.directions
+        self.goal, self.version = goal, version
+        self._pass = None
+        return True
+    
+    def track(self, goal: Tuple[int, int], budget: Optional[int] = None) -> bool:
+        """Keep the field heading for goal, integrating at most budget cells; True once current"""
+        if self.is_current(goal):
+            return True
+        if self._pass is None or self._pass[0] != tuple(goal):
+            self.retarget(goal)
+        return self.advance(budget)
+    
+    def compute(self, goal: Tuple[int, int]) -> None:
+        """Build the field for goal in one go"""
+        if not self.is_current(goal):
+            self.retarget(goal)
+            self.advance()
+    
+    def direction(self, cell: int) -> int:
+        """Packed direction of a flat cell index"""
+        return (self.directions[cell >> 2] >> ((cell & 3) << 1)) & 3
+    
+    def next_cell(self, cell: int) -> int:
+        """Flat index of the next cell toward the goal, or the cell itself at the goal or when cut off"""
+        if self.distances[cell] <= 0:
+            return cell
+        direction = self.direction(cell)
+        if direction == LEFT:
+            return cell - 1
+        if direction == RIGHT:
+            return cell + 1
+        if direction == UP:
+            return cell - self.game_map.cols
+        return cell + self.game_map.cols
+    
+    def draw_overlay(self, surface: pygame.Surface, x: int, y: int, tile_size: int,
+                     color: Tuple[int, int, int] = (120, 170, 120)) -> None:
+        """Draw a short tick from each reachable cell toward its next cell"""
+        cols = self.game_map.cols
+        half = tile_size // 2
+        reach = max(2, tile_size // 3)
+        for cell in range(self.size):
+            if self.distances[cell] <= 0:
+                continue
+            dx, dy = DIRECTION_STEPS[self.direction(cell)]
+            cx = x + (cell % cols) * tile_size + half
+            cy = y + (cell // cols) * tile_size + half
+            pygame.draw.line(surface, color, (cx, cy), (cx + dx * reach, cy + dy * reach), 1)
@@ -1,16 +1,26 @@
 # ==========================================
 # MAIN GAME CLASS
 # ==========================================
+import random
 import time
 import sys
-from typing import List
+from typing import Dict, List, Optional, Tuple
 import pygame
 
 from config import Config
+from game.background import BackgroundPlanner
+from game.connectivity import DynamicConnectivity
+from game.cooperative import CooperativePlanner
 from game.entities import Cherry, Ghost
+from game.flowfield import FlowField
 from game.map import GameMap
-from game.pathfinding import AStarAlgorithm, BFSAlgorithm, DFSAlgorithm, DijkstraAlgorithm, KruskalAlgorithm
+from game.path_cache import PathCache
+from game.pathfinding import (ALTAlgorithm, ARAStarAlgorithm, AStarAlgorithm, BFSAlgorithm, ContractionAlgorithm,
+                             CorridorAlgorithm, DFSAlgorithm, DijkstraAlgorithm, FirstMoveAlgorithm, IDAStarAlgorithm,
+                             KruskalAlgorithm, SMAStarAlgorithm, SymmetryReducedAlgorithm)
 from game.state import GameState
+from game.swarm import GhostSwarm
+from game.tour import TourPlanner
 from ui.components import Button, Panel, RankingPanel, ResultsPopup, ScrollableArea
 from utils.helpers import DrawingUtil, ImageLoader, ScalingUtil
 
@@ -26,19 +36,47 @@ class GhostCherryGame:
         
         # Initialize game objects and state
         self.map = GameMap(Config.ASSETS['map'])
+        self.connectivity = DynamicConnectivity.for_map(self.map)  # Reachability kept current across wall edits
+        self.walled_terrain: Dict[Tuple[int, int], int] = {}  # Weight of each weighted cell turned into a wall
         self.cherry = Cherry(self.map)
+        self.cherries = [self.cherry] + [Cherry(self.map) for _ in range(Config.CHERRY_COUNT - 1)]
+        self.tour_planner = TourPlanner(self.map)
         self.game_state = GameState()
         self.tile_size = Config.BASE_TILE_SIZE
         
         # Initialize pathfinding algorithms
         self.algorithms = {
-            'BFS': BFSAlgorithm(self.map),
-            'DFS': DFSAlgorithm(self.map),
-            'AStar': AStarAlgorithm(self.map),
-            'Dijkstra': DijkstraAlgorithm(self.map),
-            'Kruskal': KruskalAlgorithm(self.map),
+            'BFS': BFSAlgorithm(self.map, Config.MAP_LAYOUT),
+            'DFS': DFSAlgorithm(self.map, Config.MAP_LAYOUT),
+            'AStar': AStarAlgorithm(self.map, Config.MAP_LAYOUT),
+            'ALT': ALTAlgorithm(self.map, Config.ALT_LANDMARKS),
+            'IDAStar': IDAStarAlgorithm(self.map, Config.BOUNDED_SEARCH_EXPANSIONS),
+            'SMAStar': SMAStarAlgorithm(self.map, Config.SMA_NODE_BUDGET, Config.BOUNDED_SEARCH_EXPANSIONS),
+            'ARAStar': ARAStarAlgorithm(self.map, Config.ARA_INITIAL_EPSILON, Config.ARA_EPSILON_STEP),
+            'Dijkstra': DijkstraAlgorithm(self.map, Config.DIJKSTRA_BUCKET_LIMIT, Config.MAP_LAYOUT),
+            'FirstMove': FirstMoveAlgorithm(self.map),
+            'CH': ContractionAlgorithm(self.map),
+            'CorridorBFS': CorridorAlgorithm(self.map, "bfs"),
+            'CorridorUCS': CorridorAlgorithm(self.map, "dijkstra"),
+            'CorridorAStar': CorridorAlgorithm(self.map, "astar"),
+            'RSRAStar': SymmetryReducedAlgorithm(self.map),
+            'RSRUCS': SymmetryReducedAlgorithm(self.map, use_heuristic=False),
+            'Kruskal': KruskalAlgorithm(self.map, Config.RANDOM_WALK_GOAL_BIAS),
         }
         
+        # Background planner, and a generation counter bumped whenever the
+        # map or cherry changes so stale background results are discarded
+        self.planner = None
+        if Config.PATHFINDING_EXECUTOR:
+            self.planner = BackgroundPlanner(Config.PATHFINDING_EXECUTOR, Config.PATHFINDING_WORKERS)
+        self.path_generation = 0
+        
+        # Paths found so far, so restarting a race on the same map and cherry skips the searches
+        self.path_cache = PathCache(Config.PATH_CACHE_BYTES) if Config.PATH_CACHE_BYTES else None
+        
+        # Turbo: index into Config.TURBO_SPEEDS
+        self.speed_index = 0
+        
         # Initialize ghosts
         self.create_ghosts()
         
@@ -70,10 +108,38 @@ class GhostCherryGame:
     def create_ghosts(self) -> None:
         """Create ghost entities with their algorithms"""
         self.ghosts = [
-            Ghost("Cyan", "cyan", (15, 16), self.algorithms['BFS']),
-            Ghost("Pink", "pink", (16, 17), self.algorithms['DFS']),
-            Ghost("Orange", "orange", (17, 16), self.algorithms['Dijkstra']),
+            Ghost("Cyan", "cyan", (15, 16), self.algorithms['BFS'], self.path_cache),
+            Ghost("Pink", "pink", (16, 17), self.algorithms['DFS'], self.path_cache),
+            Ghost("Orange", "orange", (17, 16), self.algorithms['Dijkstra'], self.path_cache),
         ]
+        self.swarm = GhostSwarm(self.map)
+        self.flow_field = FlowField(self.map)
+        self.show_flow_field = Config.SHOW_FLOW_FIELD
+        self.cooperative_planner = None
+        if Config.COOPERATIVE_PLANNING:
+            self.cooperative_planner = CooperativePlanner(self.map, Config.COOPERATIVE_WINDOW)
+    
+    def spawn_swarm(self) -> None:
+        """Scatter Config.SWARM_SIZE swarm ghosts over cells that can reach the cherry"""
+        self.swarm.clear()
+        if not Config.SWARM_SIZE:
+            return
+        
+        cols = self.map.cols
+        if Config.SWARM_NAVIGATION == "flow":
+            self.flow_field.compute(tuple(self.cherry.position))
+            distances = self.flow_field.distances
+        else:
+            goal = self.cherry.position[1] * cols + self.cherry.position[0]
+            distances = self.swarm.field_for(goal).distances
+        reachable = [cell for cell, distance in enumerate(distances) if distance > 0]
+        if not reachable:
+            return
+        for _ in range(Config.SWARM_SIZE):
+            cell = random.choice(reachable)
+            self.swarm.add((cell % cols, cell // cols), tuple(self.cherry.position))
+        if Config.SWARM_NAVIGATION != "flow":
+            self.swarm.plan()
     
     def load_images(self) -> None:
         """Load and scale all game images"""
@@ -148,6 +214,7 @@ class GhostCherryGame:
             'restart_btn': pygame.Rect(sidebar_x, controls_y + btn_h + btn_margin, btn_w, btn_h),
             'gen_map_btn': pygame.Rect(sidebar_x, controls_y + (btn_h + btn_margin) * 2, btn_w, btn_h),
             'gen_cherry_btn': pygame.Rect(sidebar_x, controls_y + (btn_h + btn_margin) * 3, btn_w, btn_h),
+            'speed_btn': pygame.Rect(sidebar_x, controls_y + (btn_h + btn_margin) * 4, btn_w, btn_h),
             'main_x': main_x, 
             'main_width': main_width,
             'arena_x': arena_x,
@@ -161,7 +228,7 @@ class GhostCherryGame:
         }
         
         # Calculate total sidebar content height for scrolling
-        sidebar_content_height = self.layout['gen_cherry_btn'].bottom - time_rect.top + int(self.height * 0.03)
+        sidebar_content_height = self.layout['speed_btn'].bottom - time_rect.top + int(self.height * 0.03)
         sidebar_visible_height = self.height - int(self.height * 0.03)
         
         # Update scrollable area
@@ -178,8 +245,23 @@ class GhostCherryGame:
             'restart_btn': Button(self.layout['restart_btn'], "Restart Game"),
             'gen_map_btn': Button(self.layout['gen_map_btn'], "Generate New Map"),
             'gen_cherry_btn': Button(self.layout['gen_cherry_btn'], "Generate New Cherry"),
+            'speed_btn': Button(self.layout['speed_btn'], self.speed_label()),
         }
     
+    @property
+    def speed(self):
+        """Current simulation speed multiplier, None when unbounded"""
+        return Config.TURBO_SPEEDS[self.speed_index]
+    
+    def speed_label(self) -> str:
+        """Button text for the current speed"""
+        return f"Speed: {self.speed}x" if self.speed else "Speed: Max"
+    
+    def set_speed(self, index: int) -> None:
+        """Switch to one of the configured turbo speeds"""
+        self.speed_index = index % len(Config.TURBO_SPEEDS)
+        self.ui_components['speed_btn'].text = self.speed_label()
+    
     def handle_resize(self, width: int, height: int) -> None:
         """Update all size-dependent variables when window is resized"""
         self.width = width
@@ -223,6 +305,7 @@ class GhostCherryGame:
         # Generate new map if requested
         if new_map:
             self.map.generate_random_map()
+            self.walled_terrain.clear()
         
         # Reset ghost positions
         for ghost in self.ghosts:
@@ -233,49 +316,137 @@ class GhostCherryGame:
             elif ghost.name == "Orange":
                 ghost.reset((17, 16))
         
-        # Generate new cherry position if needed
+        # Generate new cherry positions if needed
         if new_cherry or new_map:
             ghost_positions = [tuple(ghost.position) for ghost in self.ghosts]
-            self.cherry.generate_position(ghost_positions)
-            
-            # Verify cherry is reachable by all ghosts
-            while not all(self.is_reachable(ghost.position, self.cherry.position) for ghost in self.ghosts):
-                self.cherry.generate_position(ghost_positions)
+            taken = []
+            for cherry in self.cherries:
+                cherry.generate_position(ghost_positions)
+                
+                # Verify cherry is reachable by all ghosts and not stacked on another one
+                while cherry.position in taken or not self.connectivity.reachable_from_all(tuple(cherry.position),
+                                                                                          ghost_positions):
+                    cherry.generate_position(ghost_positions)
+                taken.append(cherry.position)
+        
+        # Order the cherries each ghost collects
+        cherry_positions = [tuple(cherry.position) for cherry in self.cherries]
+        for ghost in self.ghosts:
+            ghost.targets = self.tour_planner.plan_tour(tuple(ghost.position), cherry_positions)
+        
+        # Respawn the swarm against the current map and cherry
+        self.spawn_swarm()
         
         # Initialize paths for all ghosts - ADD THIS SECTION
-        for ghost in self.ghosts:
-            ghost.find_path_to(tuple(self.cherry.position))
+        self.path_generation += 1
+        if self.cooperative_planner:
+            # Cooperative paths are planned together on the first tick
+            self.cooperative_planner.reset()
+        else:
+            for ghost in self.ghosts:
+                ghost.find_path_to(ghost.targets[0], self.planner, self.path_generation)
         
         # Close any open popup
         self.results_popup.hide()
     
+    def arena_cell(self, mouse_pos: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        """Map cell under a screen position, or None outside the arena"""
+        x = (mouse_pos[0] - self.layout['arena_x']) // self.tile_size
+        y = (mouse_pos[1] - self.layout['arena_y']) // self.tile_size
+        if mouse_pos[0] < self.layout['arena_x'] or mouse_pos[1] < self.layout['arena_y']:
+            return None
+        if x >= self.map.cols or y >= self.map.rows:
+            return None
+        return x, y
+    
+    def toggle_wall(self, x: int, y: int) -> bool:
+        """Flip a cell between wall and path without a reset, return True if the map changed.
+        
+        Only the edited tile is redrawn, connectivity is updated around the
+        cell alone, and only ghosts whose remaining path crosses the cell
+        replan. Cells holding a ghost, swarm ghost or cherry cannot be edited,
+        and a wall that would cut a racing ghost off from a cherry it still has
+        to collect is taken back, so every race can still finish. A wall placed
+        on weighted terrain gives the cell its weight back when removed.
+        """
+        occupied = [ghost.position for ghost in self.ghosts] + [cherry.position for cherry in self.cherries]
+        if [x, y] in occupied or y * self.map.cols + x in self.swarm.positions:
+            return False
+        old = self.map.cell_value(x, y)
+        self.map.set_cell(x, y, self.walled_terrain.pop((x, y), 0) if old == 1 else 1)
+        
+        # Opening a cell leaves every existing path valid; closing one breaks the paths through it
+        closed = not self.map.is_valid_position(x, y)
+        if closed and any(not self.connectivity.reachable_from_all(tuple(ghost.position), ghost.targets)
+                          for ghost in self.ghosts if not ghost.finish_time):
+            self.map.set_cell(x, y, old)
+            return False
+        if old > 1:
+            self.walled_terrain[(x, y)] = old
+        for ghost in self.ghosts:
+            if ghost.finish_time or not ghost.targets:
+                continue
+            if ghost.pending is not None:
+                ghost.cancel_pending()  # Planned on the old map; asked again next tick
+            elif closed and (x, y) in ghost.path:
+                ghost.path = []  # Cooperative paths are replanned together on the next tick
+                if not self.cooperative_planner:
+                    ghost.find_path_to(ghost.targets[0], self.planner, self.path_generation)
+        if closed and len(self.swarm) and Config.SWARM_NAVIGATION != "flow":
+            self.swarm.reroute(y * self.map.cols + x)
+        return True
+    
     def is_reachable(self, start: List[int], end: List[int]) -> bool:
         """Check if there's a path between two positions"""
-        bfs = BFSAlgorithm(self.map)
-        path = bfs.find_path(tuple(start), tuple(end))
-        return len(path) > 0
+        return self.connectivity.is_reachable(tuple(start), tuple(end))
     
     def update(self) -> None:
-        """Update game state for the current frame"""
+        """Advance the simulation by one fixed tick"""
+        # Remember where every ghost was so rendering can interpolate this tick
+        for ghost in self.ghosts:
+            ghost.previous_position = list(ghost.position)
+        
         if not self.game_state.started:
             return
         
+        self.game_state.advance_tick()
+        if self.cooperative_planner:
+            self.plan_cooperatively()
+        
         # Update ghost positions and check for winners
         all_finished = True
         for ghost in self.ghosts:
             if not ghost.finish_time:  # If ghost hasn't finished yet
                 all_finished = False
                 
-                # Find path if needed
-                if not ghost.path:
-                    ghost.find_path_to(tuple(self.cherry.position))
+                # Find path if needed, picking up finished background searches first;
+                # algorithms that answer single steps need no path at all
+                if not ghost.path and not self.cooperative_planner and not ghost.algorithm.answers_steps():
+                    ghost.poll_path(self.path_generation)
+                    if not ghost.path and ghost.pending is None:
+                        ghost.find_path_to(ghost.targets[0], self.planner, self.path_generation)
                 
                 # Move ghost
                 ghost.move()
                 
-                # Check if reached cherry
-                if ghost.reached_position(self.cherry.position) and not ghost.finish_time:
-                    ghost.finish_time = round(time.time() - self.game_state.start_time, 2)
+                # Check if reached the next cherry, finishing after the last one
+                if ghost.reached_position(ghost.targets[0]) and not ghost.finish_time:
+                    ghost.targets.pop(0)
+                    if ghost.targets:
+                        ghost.path = []
+                    else:
+                        ghost.finish_time = round(self.game_state.get_simulated_time(), 2)
+        
+        # Advance the swarm in bulk
+        if len(self.swarm):
+            if Config.SWARM_NAVIGATION == "flow":
+                # Rebuild the field a slice per tick if the cherry moved; the old one serves meanwhile
+                self.flow_field.track(tuple(self.cherry.position), Config.FLOW_FIELD_BUDGET)
+                running = self.swarm.follow(self.flow_field, self.game_state.ticks)
+            else:
+                running = self.swarm.step(self.game_state.ticks)
+            if running:
+                all_finished = False
         
         # Check if race is complete
         if all_finished and not self.results_popup.visible:
@@ -287,6 +458,42 @@ class GhostCherryGame:
             ]
             self.ui_components['ranking_panel'].update_data(self.previous_ranking)
     
+    def refine_paths(self, budget: float) -> None:
+        """Share budget seconds of this frame among racing ghosts whose algorithms can improve their paths"""
+        if not self.game_state.started or self.planner or self.cooperative_planner:
+            return
+        racing = [ghost for ghost in self.ghosts if not ghost.finish_time]
+        begin = time.perf_counter()
+        for index, ghost in enumerate(racing):
+            ghost.refine_path(begin + budget * (index + 1) / len(racing))
+    
+    def track_flow_overlay(self) -> None:
+        """Keep the overlay's flow field heading for the cherry when no racing swarm already does.
+        
+        The rebuild runs a budgeted slice per frame; until it finishes the overlay
+        shows the last completed field.
+        """
+        swarm_tracks = self.game_state.started and len(self.swarm) and Config.SWARM_NAVIGATION == "flow"
+        if self.show_flow_field and not swarm_tracks:
+            self.flow_field.track(tuple(self.cherry.position), Config.FLOW_FIELD_BUDGET)
+    
+    def plan_cooperatively(self) -> None:
+        """Replan racing ghosts through the reservation table every half window"""
+        racing = [(index, ghost) for index, ghost in enumerate(self.ghosts) if not ghost.finish_time]
+        replan_every = max(1, Config.COOPERATIVE_WINDOW // 2)
+        if not racing or (self.game_state.ticks % replan_every and all(ghost.path for _, ghost in racing)):
+            return
+        
+        # Ghosts move on this tick, so plans start from the tick before
+        plans = self.cooperative_planner.plan(
+            [(index, tuple(ghost.position), ghost.targets[0]) for index, ghost in racing],
+            self.game_state.ticks - 1,
+            {index: ghost.stalled for index, ghost in racing}
+        )
+        for index, ghost in racing:
+            ghost.path = plans[index]
+            ghost.paced = True
+    
     def handle_events(self) -> None:
         """Process user input events"""
         for event in pygame.event.get():
@@ -326,6 +533,14 @@ class GhostCherryGame:
                         # Generate new cherry button
                         elif self.ui_components['gen_cherry_btn'].is_clicked(mouse_pos) and not self.game_state.started:
                             self.reset_game(False, True)
+                        
+                        # Speed button cycles through the turbo speeds
+                        elif self.ui_components['speed_btn'].is_clicked(mouse_pos):
+                            self.set_speed(self.speed_index + 1)
+                        
+                        # Clicking the arena toggles a wall, even mid-race
+                        elif self.arena_cell(mouse_pos) is not None:
+                            self.toggle_wall(*self.arena_cell(mouse_pos))
                             
                         # Check for ranking panel scroll buttons
                         ranking_panel = self.ui_components['ranking_panel']
@@ -363,9 +578,13 @@ class GhostCherryGame:
                     self.sidebar_scroll.scroll(-Config.SCROLL_SPEED)
                 elif event.key == pygame.K_DOWN:
                     self.sidebar_scroll.scroll(Config.SCROLL_SPEED)
+                elif event.key == pygame.K_f:
+                    self.show_flow_field = not self.show_flow_field
+                elif pygame.K_1 <= event.key < pygame.K_1 + len(Config.TURBO_SPEEDS):
+                    self.set_speed(event.key - pygame.K_1)
     
-    def draw(self) -> None:
-        """Render the game to the screen"""
+    def draw(self, alpha: float = 1.0) -> None:
+        """Render the game to the screen, alpha being the fraction of a tick since the last update"""
         # Draw background
         self.screen.blit(self.background_texture, (0, 0))
         
@@ -409,7 +628,7 @@ class GhostCherryGame:
         
         # Update button hover states and draw buttons
         mouse_pos = pygame.mouse.get_pos()
-        for name in ['start_btn', 'restart_btn', 'gen_map_btn', 'gen_cherry_btn']:
+        for name in ['start_btn', 'restart_btn', 'gen_map_btn', 'gen_cherry_btn', 'speed_btn']:
             btn = self.ui_components[name]
             btn.hovered = btn.is_hovered(mouse_pos)
             if btn.adjusted_rect.bottom > self.layout['sidebar_top_y'] and btn.adjusted_rect.top < self.height:
@@ -465,22 +684,41 @@ class GhostCherryGame:
             'small'
         )
         
-        # Draw cherry
-        self.cherry.draw(
-            self.screen, 
-            self.layout['arena_x'], 
-            self.layout['arena_y'], 
-            self.tile_size, 
-            self.cherry_img
-        )
+        # Draw cherries
+        for cherry in self.cherries:
+            cherry.draw(
+                self.screen, 
+                self.layout['arena_x'], 
+                self.layout['arena_y'], 
+                self.tile_size, 
+                self.cherry_img,
+                glow=self.speed == 1
+            )
         
-        # Draw ghosts
+        # Draw the flow field toward the cherry for analysis
+        if self.show_flow_field:
+            self.flow_field.draw_overlay(self.screen, self.layout['arena_x'], self.layout['arena_y'], self.tile_size)
+        
+        # Draw swarm ghosts as small dots
+        if len(self.swarm):
+            dot = max(2, self.tile_size // 3)
+            offset = (self.tile_size - dot) // 2
+            cols = self.map.cols
+            for cell in self.swarm.positions:
+                pygame.draw.rect(self.screen, Config.SWARM_COLOR, (
+                    self.layout['arena_x'] + (cell % cols) * self.tile_size + offset,
+                    self.layout['arena_y'] + (cell // cols) * self.tile_size + offset,
+                    dot, dot
+                ))
+        
+        # Draw ghosts between their last two tiles
         for ghost in self.ghosts:
+            render_x, render_y = ghost.render_position(alpha)
             self.screen.blit(
                 self.ghost_images[ghost.color], 
                 (
-                    self.layout['arena_x'] + ghost.position[0] * self.tile_size, 
-                    self.layout['arena_y'] + ghost.position[1] * self.tile_size
+                    self.layout['arena_x'] + int(render_x * self.tile_size), 
+                    self.layout['arena_y'] + int(render_y * self.tile_size)
                 )
             )
         
@@ -488,14 +726,40 @@ class GhostCherryGame:
         self.results_popup.draw(self.screen, self.fonts, self.ghost_scaled_images)
     
     def run(self) -> None:
-        """Run the main game loop"""
+        """Run the main game loop: fixed simulation ticks, rendering at the frame rate"""
+        tick_length = 1.0 / Config.TICK_RATE
+        accumulator = 0.0
+        previous = time.perf_counter()
+        
         while self.running:
+            now = time.perf_counter()
+            accumulator += min(now - previous, Config.MAX_FRAME_TIME)
+            previous = now
+            
             self.handle_events()
-            self.update()
-            self.draw()
+            if self.speed is None:
+                # Unbounded turbo: simulate for one frame's worth of real time, then render
+                accumulator = 0.0
+                deadline = now + 1.0 / Config.FRAME_RATE
+                self.update()
+                while self.game_state.started and time.perf_counter() < deadline:
+                    self.update()
+                alpha = 1.0
+            else:
+                # Turbo speeds shorten the real time per tick; only the last state is rendered
+                step = tick_length / self.speed
+                while accumulator >= step:
+                    self.update()
+                    accumulator -= step
+                alpha = accumulator / step
+            self.refine_paths(Config.ANYTIME_FRAME_BUDGET)
+            self.track_flow_overlay()
+            self.draw(alpha)
             
             pygame.display.flip()
             self.clock.tick(Config.FRAME_RATE)
         
+        if self.planner:
+            self.planner.shutdown()
         pygame.quit()
         sys.exit()
@@ -0,0 +1,90 @@
+# ==========================================
+# LANDMARK (ALT) HEURISTIC TABLES
+# ==========================================
+from array import array
+from typing import List, Union
+
+from game.content_cache import ContentCache
+from game.map import GameMap, MapSnapshot
+
+
+class LandmarkTable:
+    """BFS distances from a few far-apart landmark cells, for triangle-inequality bounds.
+    
+    For any landmark L, |d(L, goal) - d(L, cell)| never overestimates d(cell, goal),
+    and the largest such bound over all landmarks is a much tighter A* heuristic
+    than Manhattan distance in mazes.
+    """
+    _cache: "ContentCache[LandmarkTable]" = ContentCache()
+    
+    def __init__(self, game_map: Union[GameMap, MapSnapshot], count: int = 8):
+        self.cols = game_map.cols
+        size = game_map.rows * game_map.cols
+        # Two bytes per cell while every distance fits, four otherwise
+        self.typecode = 'H' if size < 0xFFFF else 'I'
+        self.unreached = 0xFFFF if self.typecode == 'H' else 0xFFFFFFFF
+        self.landmarks: List[int] = []
+        self.distances: List[array] = []
+        self._select(game_map, count)
+    
+    @classmethod
+    def for_map(cls, game_map: Union[GameMap, MapSnapshot], count: int = 8) -> "LandmarkTable":
+        """Cached table for the map's current contents"""
+        return cls._cache.get(game_map, lambda: cls(game_map, count), count)
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the distance arrays"""
+        return sum(d.itemsize * len(d) for d in self.distances)
+    
+    def _select(self, game_map: Union[GameMap, MapSnapshot], count: int) -> None:
+        """Farthest-point selection: each landmark is the cell farthest from all earlier ones"""
+        free = next((i for i, value in enumerate(game_map.cells) if value == 0), None)
+        if free is None:
+            return
+        # The first BFS only finds a far corner to start from; it is not kept
+        nearest = self._bfs(game_map, free)
+        for _ in range(count):
+            candidate = max(range(len(nearest)),
+                            key=lambda i: nearest[i] if nearest[i] != self.unreached else -1)
+            if nearest[candidate] in (0, self.unreached):
+                break  # Every reachable cell already is a landmark
+            distances = self._bfs(game_map, candidate)
+            self.landmarks.append(candidate)
+            self.distances.append(distances)
+            if len(self.landmarks) == 1:
+                nearest = array(self.typecode, distances)
+            else:
+                for i, d in enumerate(distances):
+                    if d < nearest[i]:
+                        nearest[i] = d
+    
+    def _bfs(self, game_map: Union[GameMap, MapSnapshot], source: int) -> array:
+        """Unit-cost distances from source to every cell"""
+        cols, cells = self.cols, game_map.cells
+        size = len(cells)
+        distances = array(self.typecode, [self.unreached]) * size
+        distances[source] = 0
+        queue = [source]
+        for cell in queue:
+            d = distances[cell] + 1
+            x = cell % cols
+            for neighbor in (cell - 1 if x > 0 else -1, cell + 1 if x < cols - 1 else -1,
+                             cell - cols, cell + cols):
+                if 0 <= neighbor < size and cells[neighbor] == 0 and distances[neighbor] == self.unreached:
+                    distances[neighbor] = d
+                    queue.append(neighbor)
+        return distances
+    
+    def lower_bound(self, cell: int, goal: int) -> int:
+        """Largest landmark lower bound on the distance from cell to goal"""
+        best = 0
+        unreached = self.unreached
+        for distances in self.distances:
+            a, b = distances[cell], distances[goal]
+            if a == unreached or b == unreached:
+                continue
+            bound = a - b if a > b else b - a
+            if bound > best:
+                best = bound
+        return best
@@ -0,0 +1,215 @@
+# ==========================================
+# CELL LAYOUTS: ROW-MAJOR AND MORTON (Z-ORDER)
+# ==========================================
+from abc import ABC, abstractmethod
+from typing import Dict, Tuple, Type, Union
+
+from game.content_cache import ContentCache
+from game.map import GameMap, MapSnapshot
+
+# Bytes with a zero bit inserted above every bit, and the even bits of a byte packed together
+_SPREAD = [sum(((value >> bit) & 1) << (2 * bit) for bit in range(8)) for value in range(256)]
+_COMPACT = [sum(((value >> (2 * bit)) & 1) << bit for bit in range(4)) for value in range(256)]
+
+
+def spread(value: int) -> int:
+    """Bits of value moved to the even bit positions"""
+    result, shift = 0, 0
+    while value:
+        result |= _SPREAD[value & 0xFF] << shift
+        value >>= 8
+        shift += 16
+    return result
+
+
+def compact(value: int) -> int:
+    """Even bits of value packed together, the inverse of spread"""
+    result, shift = 0, 0
+    while value:
+        result |= _COMPACT[value & 0xFF] << shift
+        value >>= 8
+        shift += 4
+    return result
+
+
+class CellLayout(ABC):
+    """How a search numbers the cells of a map, with the map's walls and step costs in that order.
+    
+    Searches only touch cells through index, position and neighbors, so the
+    same code runs on any layout. Neighbour indices are -1 off the map.
+    """
+    kind = "row"
+    
+    def __init__(self, game_map: Union[GameMap, MapSnapshot]):
+        self.cols = game_map.cols
+        self.rows = game_map.rows
+        self.max_cost = game_map.max_cost
+    
+    @staticmethod
+    def for_map(game_map: Union[GameMap, MapSnapshot], kind: str = "row") -> "CellLayout":
+        """Layout of the given kind ("row" or "morton") for the map's current contents"""
+        return LAYOUTS[kind].for_contents(game_map)
+    
+    @classmethod
+    def for_contents(cls, game_map: Union[GameMap, MapSnapshot]) -> "CellLayout":
+        """Layout for the map's current contents"""
+        return cls(game_map)
+    
+    @abstractmethod
+    def index(self, x: int, y: int) -> int:
+        """Cell index of an (x, y) position on the map"""
+        pass
+    
+    @abstractmethod
+    def position(self, cell: int) -> Tuple[int, int]:
+        """(x, y) position of a cell index"""
+        pass
+    
+    def contains(self, position: Tuple[int, int]) -> bool:
+        """True if (x, y) lies on the map"""
+        return 0 <= position[0] < self.cols and 0 <= position[1] < self.rows
+    
+    @abstractmethod
+    def neighbors(self, cell: int) -> Tuple[int, int, int, int]:
+        """Left, right, up and down neighbours of a cell"""
+        pass
+    
+    def distance(self, a: int, b: int) -> int:
+        """Manhattan distance between two cells"""
+        ax, ay = self.position(a)
+        bx, by = self.position(b)
+        return abs(ax - bx) + abs(ay - by)
+
+
+class RowMajorLayout(CellLayout):
+    """Cell y * cols + x, reading the map's own buffers without copying them"""
+    kind = "row"
+    
+    def __init__(self, game_map: Union[GameMap, MapSnapshot]):
+        super().__init__(game_map)
+        self.size = self.rows * self.cols
+        self.cells = game_map.cells
+        self.costs = game_map.costs if game_map.max_cost > 1 else None
+    
+    def index(self, x: int, y: int) -> int:
+        return y * self.cols + x
+    
+    def position(self, cell: int) -> Tuple[int, int]:
+        return cell % self.cols, cell // self.cols
+    
+    def neighbors(self, cell: int) -> Tuple[int, int, int, int]:
+        cols = self.cols
+        x = cell % cols
+        up, down = cell - cols, cell + cols
+        return (cell - 1 if x > 0 else -1, cell + 1 if x < cols - 1 else -1, up if up >= 0 else -1,
+                down if down < self.size else -1)
+    
+    def distance(self, a: int, b: int) -> int:
+        cols = self.cols
+        return abs(a % cols - b % cols) + abs(a // cols - b // cols)
+
+
+class MortonLayout(CellLayout):
+    """Z-order inside square tiles, with the tiles themselves numbered row by row.
+    
+    Cells close on the map, vertically as well as horizontally, stay close in
+    the buffer: a tile of up to 32x32 cells is one contiguous block, with x in
+    the even bits of the in-tile index and y in the odd bits. Neighbours inside
+    a tile are found without decoding: adding 1 to the index with every y bit
+    set carries straight through to the next x, and the same trick with the x
+    bits set steps y. Only steps across a tile edge jump to another block.
+    Maps whose sides are not a multiple of the tile are padded with walls, and
+    the tile shrinks until that padding is at most an eighth of the cells, so
+    the buffer and the search workspaces stay close to the map's own size
+    whatever its shape.
+    """
+    kind = "morton"
+    X_MASK = 0x5555555555555555
+    Y_MASK = 0xAAAAAAAAAAAAAAAA
+    TILE_BITS = 5
+    
+    _cache: "ContentCache[MortonLayout]" = ContentCache()
+    
+    def __init__(self, game_map: Union[GameMap, MapSnapshot]):
+        super().__init__(game_map)
+        self.tile_bits = self._tile_bits(self.cols, self.rows)
+        self.tile_side = side = 1 << self.tile_bits
+        self.tile_size = side * side
+        self.tiles_x = -(-self.cols // side)
+        self.tiles_y = -(-self.rows // side)
+        self.row_stride = self.tiles_x * self.tile_size
+        self.size = self.tiles_y * self.row_stride
+        self.x_mask = self.X_MASK & (self.tile_size - 1)
+        self.y_mask = self.Y_MASK & (self.tile_size - 1)
+        self._spread_x = [spread(x) for x in range(side)]
+        self._spread_y = [spread(y) << 1 for y in range(side)]
+        self.cells = self._pack(game_map.cells, 1)
+        self.costs = self._pack(game_map.costs, 1) if game_map.max_cost > 1 else None
+    
+    @classmethod
+    def _tile_bits(cls, cols: int, rows: int) -> int:
+        """Largest tile, up to TILE_BITS, that pads the map by at most an eighth of its cells"""
+        for bits in range((min(cols, rows) - 1).bit_length(), 0, -1):
+            if bits <= cls.TILE_BITS:
+                side = 1 << bits
+                if 8 * (-(-cols // side) * side) * (-(-rows // side) * side) <= 9 * cols * rows:
+                    return bits
+        return 0
+    
+    @classmethod
+    def for_contents(cls, game_map: Union[GameMap, MapSnapshot]) -> "MortonLayout":
+        """Cached layout for the map's current contents"""
+        return cls._cache.get(game_map, lambda: cls(game_map))
+    
+    def _pack(self, row_major, fill: int) -> bytearray:
+        """Copy a row-major buffer into tiled Z-order, padding with fill.
+        
+        Cells at the same in-tile offset of one tile row sit a tile apart in
+        the packed buffer and `side` apart in the source row, so each of them
+        is one slice copy instead of a loop over cells.
+        """
+        packed = bytearray([fill]) * self.size
+        cols, side, tile_size = self.cols, self.tile_side, self.tile_size
+        for y in range(self.rows):
+            base = (y >> self.tile_bits) * self.row_stride + self._spread_y[y & (side - 1)]
+            row = row_major[y * cols:(y + 1) * cols]
+            for local_x in range(min(side, cols)):
+                values = row[local_x::side]
+                offset = base + self._spread_x[local_x]
+                packed[offset:offset + len(values) * tile_size:tile_size] = values
+        return packed
+    
+    def index(self, x: int, y: int) -> int:
+        bits, low = self.tile_bits, self.tile_side - 1
+        return (((y >> bits) * self.tiles_x + (x >> bits)) * self.tile_size
+                | self._spread_x[x & low] | self._spread_y[y & low])
+    
+    def position(self, cell: int) -> Tuple[int, int]:
+        tile_y, tile_x = divmod(cell // self.tile_size, self.tiles_x)
+        local = cell & (self.tile_size - 1)
+        return (tile_x << self.tile_bits) | compact(local), (tile_y << self.tile_bits) | compact(local >> 1)
+    
+    def neighbors(self, cell: int) -> Tuple[int, int, int, int]:
+        x_mask, y_mask, tile_size = self.x_mask, self.y_mask, self.tile_size
+        x_bits, y_bits = cell & x_mask, cell & y_mask
+        tile_start = cell - x_bits - y_bits
+        if x_bits:
+            left = ((x_bits - 1) & x_mask) | y_bits | tile_start
+        else:
+            left = (cell - tile_size) | x_mask if (cell // tile_size) % self.tiles_x else -1
+        if x_bits != x_mask:
+            right = ((cell | y_mask) + 1) & x_mask | y_bits | tile_start
+        else:
+            right = (cell + tile_size) & ~x_mask if (cell // tile_size + 1) % self.tiles_x else -1
+        if y_bits:
+            up = ((y_bits - 1) & y_mask) | x_bits | tile_start
+        else:
+            up = (cell - self.row_stride) | y_mask if cell >= self.row_stride else -1
+        if y_bits != y_mask:
+            down = ((cell | x_mask) + 1) & y_mask | x_bits | tile_start
+        else:
+            down = (cell + self.row_stride) & ~y_mask if cell + self.row_stride < self.size else -1
+        return left, right, up, down
+
+
+LAYOUTS: Dict[str, Type[CellLayout]] = {"row": RowMajorLayout, "morton": MortonLayout}
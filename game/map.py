@@ -1,32 +1,237 @@
 import random
-from typing import List
+import weakref
+from typing import Callable, List, Optional, Sequence, Tuple
 import pygame
 
 from config import Config
+from game.map_format import BINARY_SUFFIX, MapFile, is_binary_map, write_map
+
+MASK64 = (1 << 64) - 1
+
+
+def _mix64(value: int) -> int:
+    """SplitMix64 finaliser: a well-spread 64-bit value for each input"""
+    value = (value + 0x9E3779B97F4A7C15) & MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return value ^ (value >> 31)
+
+
+def zobrist_key(index: int, value: int) -> int:
+    """Zobrist key of a cell holding value (1 wall, 2-9 weighted path); plain paths add nothing.
+    
+    Keys come from a fixed mixing function rather than a random table, so the
+    same map hashes the same in every session and process, at any size.
+    """
+    return _mix64(index * 16 + value) if value else 0
+
+
+def zobrist_hash(rows: int, cols: int, cells, costs=None) -> int:
+    """Zobrist hash of a whole map: its dimensions XORed with the key of every wall and weighted cell"""
+    value = _mix64(-1 - ((rows << 32) | cols))
+    for index, cell in enumerate(cells):
+        if cell:
+            value ^= zobrist_key(index, 1)
+        elif costs is not None and costs[index] > 1:
+            value ^= zobrist_key(index, costs[index])
+    return value
+
+
+def content_key(game_map) -> Tuple[int, int, int]:
+    """Key identifying a map's contents, shared by identical maps, for caches of precomputed data"""
+    return game_map.rows, game_map.cols, game_map.zobrist
+
+
+class MapSnapshot:
+    """Read-only view of a GameMap used by background searches"""
+    def __init__(self, rows: int, cols: int, cells, version: int, costs=None, max_cost: int = 1,
+                 zobrist: Optional[int] = None):
+        self.rows = rows
+        self.cols = cols
+        self.cells = cells
+        self.version = version
+        self.costs = costs  # None when every open cell costs 1
+        self.max_cost = max_cost
+        self._zobrist = zobrist
+    
+    @property
+    def zobrist(self) -> int:
+        """Zobrist hash of the contents, computed on first use if the creator did not pass it"""
+        if self._zobrist is None:
+            self._zobrist = zobrist_hash(self.rows, self.cols, self.cells, self.costs)
+        return self._zobrist
+    
+    def is_valid_position(self, x: int, y: int) -> bool:
+        """Check if a position is valid (within bounds and not a wall)"""
+        return (0 <= x < self.cols and 0 <= y < self.rows and self.cells[y * self.cols + x] == 0)
+    
+    def terrain_cost(self, x: int, y: int) -> int:
+        """Cost of stepping onto an open cell"""
+        return self.costs[y * self.cols + x] if self.costs is not None else 1
 
 
 class GameMap:
-    """Represents the game map with walls and paths"""
-    def __init__(self, filename: str):
+    """Represents the game map with walls, paths and weighted terrain.
+    
+    In map files 0 is a path and 1 a wall; digits 2-9 are paths that cost that
+    much to step onto. Walls live in cells and step costs in a parallel costs
+    buffer (1 for plain paths), so searches that ignore terrain read cells alone.
+    
+    Maps load from text files or from binary files (game.map_format), which
+    are read straight into the buffers; save_map writes binary when the name
+    ends in .gcm, so loading one format and saving the other converts losslessly.
+    
+    Every change bumps version and keeps a Zobrist hash of the contents up to
+    date in O(1) per cell, then tells the subscribed listeners what changed.
+    """
+    def __init__(self, filename: str, grid: Optional[List[List[int]]] = None):
         self.filename = filename
-        self.grid = self.load_map(filename)
-        self.rows = len(self.grid)
-        self.cols = len(self.grid[0]) if self.grid else 0
+        self.version = 0
+        self.zobrist = 0
+        self.cells = bytearray()
+        self.costs = bytearray()
+        self.max_cost = 1
+        self._cells_shared = False
+        self._listeners: List[weakref.ref] = []
+        self._surface: Optional[pygame.Surface] = None  # Rendered tiles, redrawn only after changes
+        self._surface_tile = 0
+        if grid is None:
+            self.load(filename)
+        else:
+            self.grid = grid
+    
+    @property
+    def grid(self) -> Tuple[Tuple[int, ...], ...]:
+        """Read-only snapshot of the map row by row, built from the compact buffers.
+        
+        Edit cells with set_cell (or assign a whole new grid) so the hash, version
+        and listeners stay in step; the snapshot does not follow later edits.
+        """
+        cols, cells, costs = self.cols, self.cells, self.costs
+        return tuple(tuple(costs[i] if costs[i] > 1 else cells[i] for i in range(r*cols, (r+1)*cols))
+                     for r in range(self.rows))
+    
+    @grid.setter
+    def grid(self, grid: Sequence[Sequence[int]]) -> None:
+        """Replace the whole map, packing walls and step costs into one byte per cell each"""
+        self._replace(len(grid), len(grid[0]) if grid else 0,
+                      bytearray(1 if value == 1 else 0 for row in grid for value in row),
+                      bytearray(value if value > 1 else 1 for row in grid for value in row))
+    
+    def _replace(self, rows: int, cols: int, cells: bytearray, costs: bytearray, zobrist: Optional[int] = None) -> None:
+        """Install new wall and step cost buffers for the whole map, hashing them unless the hash is known"""
+        self.rows = rows
+        self.cols = cols
+        self.cells = cells
+        self.costs = costs
+        self.max_cost = max(costs, default=1)
+        self._cells_shared = False
+        self.zobrist = zobrist_hash(rows, cols, cells, costs) if zobrist is None else zobrist
+        self.version += 1
+        self._changed(None)
+    
+    @property
+    def weighted(self) -> bool:
+        """True when some open cell costs more than 1 to enter"""
+        return self.max_cost > 1
+    
+    def snapshot(self) -> MapSnapshot:
+        """Return a read-only snapshot sharing the current buffer (copy-on-write)"""
+        self._cells_shared = True
+        return MapSnapshot(self.rows, self.cols, self.cells, self.version,
+                           self.costs if self.weighted else None, self.max_cost, self.zobrist)
+    
+    def _prepare_write(self) -> None:
+        """Detach the buffers from outstanding snapshots before mutating them in place"""
+        if self._cells_shared:
+            self.cells = bytearray(self.cells)
+            self.costs = bytearray(self.costs)
+            self._cells_shared = False
+    
+    def cell_value(self, x: int, y: int) -> int:
+        """Map file value of a cell: 0 path, 1 wall, 2-9 weighted path"""
+        i = y * self.cols + x
+        return self.costs[i] if self.costs[i] > 1 else self.cells[i]
+    
+    def set_cell(self, x: int, y: int, value: int) -> None:
+        """Change one cell to a map file value, updating the hash in O(1)"""
+        old = self.cell_value(x, y)
+        if value == old:
+            return
+        self._prepare_write()
+        i = y * self.cols + x
+        self.cells[i] = 1 if value == 1 else 0
+        self.costs[i] = value if value > 1 else 1
+        self.max_cost = max(self.max_cost, value)  # An upper bound is enough for the queues sized by it
+        self.zobrist ^= zobrist_key(i, old) ^ zobrist_key(i, value)
+        self.version += 1
+        self._changed([(x, y)])
+    
+    def subscribe(self, listener: Callable[[Optional[List[Tuple[int, int]]]], None]) -> None:
+        """Call listener(cells) after every change with the (x, y) cells edited, or None when the whole map was replaced.
+        
+        Listeners are held weakly, so subscribing never keeps a cache alive.
+        """
+        if hasattr(listener, "__self__"):
+            self._listeners.append(weakref.WeakMethod(listener))
+        else:
+            self._listeners.append(weakref.ref(listener))
+    
+    def _changed(self, cells: Optional[List[Tuple[int, int]]]) -> None:
+        """Re-render the edited tiles (or drop the render for a new map) and notify live listeners"""
+        if cells is None:
+            self._surface = None
+        elif self._surface is not None:
+            # Tile edges spill one pixel right and down, so every tile touching the
+            # edited one is repainted, clipped to it, in the order draw() uses
+            tile_size = self._surface_tile
+            for x, y in cells:
+                self._surface.set_clip(pygame.Rect(x*tile_size, y*tile_size, tile_size + 1, tile_size + 1))
+                for r in range(max(y - 1, 0), min(y + 2, self.rows)):
+                    for c in range(max(x - 1, 0), min(x + 2, self.cols)):
+                        self._draw_tile(c, r)
+                self._draw_border()
+            self._surface.set_clip(None)
+        live = []
+        for ref in self._listeners:
+            listener = ref()
+            if listener is not None:
+                listener(cells)
+                live.append(ref)
+        self._listeners = live
+    
+    def load(self, filename: str) -> None:
+        """Replace the map with a file's contents; binary maps skip the nested lists and the rehash"""
+        if not is_binary_map(filename):
+            self.grid = self.load_map(filename)
+            return
+        try:
+            with MapFile(filename) as map_file:
+                self._replace(*map_file.buffers())
+        except (IOError, ValueError):
+            print(f"Error: Could not load map file {filename}")
+            self.grid = [[1 for _ in range(20)] for _ in range(20)]
     
     def load_map(self, filename: str) -> List[List[int]]:
-        """Load a map from a file"""
+        """Load a map from a text or binary file"""
         try:
+            if is_binary_map(filename):
+                with MapFile(filename) as map_file:
+                    return map_file.grid()
             with open(filename) as f:
                 lines = [line.strip() for line in f if line.strip()]
             return [[int(ch) for ch in line] for line in lines]
-        except (FileNotFoundError, IOError):
+        except (FileNotFoundError, IOError, ValueError):
             print(f"Error: Could not load map file {filename}")
             # Create a simple default map
             return [[1 for _ in range(20)] for _ in range(20)]
     
     def save_map(self, filename: str) -> None:
-        """Save the current map to a file"""
+        """Save the current map to a file, in the binary format if the name ends in .gcm"""
         try:
+            if filename.endswith(BINARY_SUFFIX):
+                write_map(filename, self.rows, self.cols, self.cells, self.costs, self.zobrist)
+                return
             with open(filename, 'w') as f:
                 for row in self.grid:
                     f.write(''.join(map(str, row)) + '\n')
@@ -35,7 +240,11 @@ class GameMap:
     
     def is_valid_position(self, x: int, y: int) -> bool:
         """Check if a position is valid (within bounds and not a wall)"""
-        return (0 <= x < self.cols and 0 <= y < self.rows and self.grid[y][x] == 0)
+        return (0 <= x < self.cols and 0 <= y < self.rows and self.cells[y * self.cols + x] == 0)
+    
+    def terrain_cost(self, x: int, y: int) -> int:
+        """Cost of stepping onto an open cell"""
+        return self.costs[y * self.cols + x]
     
     def generate_random_map(self) -> None:
         """Generate a random map with walls"""
@@ -53,33 +262,43 @@ class GameMap:
         self.grid = new_grid
     
     def draw(self, surface: pygame.Surface, x: int, y: int, tile_size: int) -> None:
-        """Draw the map on the given surface"""
-        map_surface = pygame.Surface((self.cols*tile_size, self.rows*tile_size), pygame.SRCALPHA)
-        
-        for r in range(self.rows):
-            for c in range(self.cols):
-                rect = pygame.Rect(c*tile_size, r*tile_size, tile_size, tile_size)
-                if self.grid[r][c] == 1:
-                    # Draw walls with a 3D effect
-                    pygame.draw.rect(map_surface, Config.WALL_COLOR, rect)
-                    pygame.draw.line(map_surface, (Config.WALL_COLOR[0]-30, Config.WALL_COLOR[1]-30, Config.WALL_COLOR[2]-30), 
-                                  (c*tile_size, r*tile_size), (c*tile_size, (r+1)*tile_size), 1)
-                    pygame.draw.line(map_surface, (Config.WALL_COLOR[0]-30, Config.WALL_COLOR[1]-30, Config.WALL_COLOR[2]-30), 
-                                  (c*tile_size, r*tile_size), ((c+1)*tile_size, r*tile_size), 1)
-                    pygame.draw.line(map_surface, (min(Config.WALL_COLOR[0]+30, 255), min(Config.WALL_COLOR[1]+30, 255), min(Config.WALL_COLOR[2]+30, 255)), 
-                                  ((c+1)*tile_size-1, r*tile_size), ((c+1)*tile_size-1, (r+1)*tile_size), 1)
-                    pygame.draw.line(map_surface, (min(Config.WALL_COLOR[0]+30, 255), min(Config.WALL_COLOR[1]+30, 255), min(Config.WALL_COLOR[2]+30, 255)), 
-                                  (c*tile_size, (r+1)*tile_size-1), ((c+1)*tile_size, (r+1)*tile_size-1), 1)
-                else:
-                    # Draw path tiles with a subtle grid
-                    pygame.draw.rect(map_surface, Config.WHITE, rect)
-                    pygame.draw.line(map_surface, (230, 230, 230), 
-                                  (c*tile_size, r*tile_size), (c*tile_size+tile_size, r*tile_size), 1)
-                    pygame.draw.line(map_surface, (230, 230, 230), 
-                                  (c*tile_size, r*tile_size), (c*tile_size, r*tile_size+tile_size), 1)
-        
-        # Draw a border around the map
-        pygame.draw.rect(map_surface, Config.BLACK, (0, 0, self.cols*tile_size, self.rows*tile_size), 2)
+        """Draw the map on the given surface, re-rendering the tiles only after the map or tile size changed"""
+        if self._surface is None or self._surface_tile != tile_size:
+            self._surface = pygame.Surface((self.cols*tile_size, self.rows*tile_size), pygame.SRCALPHA)
+            self._surface_tile = tile_size
+            for r in range(self.rows):
+                for c in range(self.cols):
+                    self._draw_tile(c, r)
+            self._draw_border()
         
-        surface.blit(map_surface, (x, y))
-
+        surface.blit(self._surface, (x, y))
+    
+    def _draw_border(self) -> None:
+        """Draw a border around the cached map surface"""
+        tile_size = self._surface_tile
+        pygame.draw.rect(self._surface, Config.BLACK, (0, 0, self.cols*tile_size, self.rows*tile_size), 2)
+    
+    def _draw_tile(self, c: int, r: int) -> None:
+        """Render one cell into the cached map surface"""
+        map_surface, tile_size = self._surface, self._surface_tile
+        rect = pygame.Rect(c*tile_size, r*tile_size, tile_size, tile_size)
+        if self.cells[r*self.cols + c] == 1:
+            # Draw walls with a 3D effect
+            pygame.draw.rect(map_surface, Config.WALL_COLOR, rect)
+            pygame.draw.line(map_surface, (Config.WALL_COLOR[0]-30, Config.WALL_COLOR[1]-30, Config.WALL_COLOR[2]-30), 
+                          (c*tile_size, r*tile_size), (c*tile_size, (r+1)*tile_size), 1)
+            pygame.draw.line(map_surface, (Config.WALL_COLOR[0]-30, Config.WALL_COLOR[1]-30, Config.WALL_COLOR[2]-30), 
+                          (c*tile_size, r*tile_size), ((c+1)*tile_size, r*tile_size), 1)
+            pygame.draw.line(map_surface, (min(Config.WALL_COLOR[0]+30, 255), min(Config.WALL_COLOR[1]+30, 255), min(Config.WALL_COLOR[2]+30, 255)), 
+                          ((c+1)*tile_size-1, r*tile_size), ((c+1)*tile_size-1, (r+1)*tile_size), 1)
+            pygame.draw.line(map_surface, (min(Config.WALL_COLOR[0]+30, 255), min(Config.WALL_COLOR[1]+30, 255), min(Config.WALL_COLOR[2]+30, 255)), 
+                          (c*tile_size, (r+1)*tile_size-1), ((c+1)*tile_size, (r+1)*tile_size-1), 1)
+        else:
+            # Draw path tiles with a subtle grid, tinted darker the more the terrain costs
+            shade = min(1.0, (self.costs[r*self.cols + c] - 1) / 8)
+            color = tuple(round(w + (t - w) * shade) for w, t in zip(Config.WHITE, Config.TERRAIN_COLOR))
+            pygame.draw.rect(map_surface, color, rect)
+            pygame.draw.line(map_surface, (230, 230, 230), 
+                          (c*tile_size, r*tile_size), (c*tile_size+tile_size, r*tile_size), 1)
+            pygame.draw.line(map_surface, (230, 230, 230), 
+                          (c*tile_size, r*tile_size), (c*tile_size, r*tile_size+tile_size), 1)
@@ -0,0 +1,144 @@
+# ==========================================
+# BINARY BIT-PACKED MAP FORMAT
+# ==========================================
+"""Binary map files: a fixed header, then one bit per cell per plane.
+
+    header     magic, format version, highest step cost, rows, cols, Zobrist hash
+    walls      bit i set if cell i (row-major) is a wall
+    costs      (highest cost - 1).bit_length() planes, plane j holding bit j
+               of every cell's step cost minus one; none for unweighted maps
+
+Cell i is bit i % 8 of byte i // 8 of its plane, and each plane is padded to
+a whole byte. A 1024x1024 plain map takes 128 KiB instead of the 1 MiB of
+its text form. Packing and unpacking go through Python's arbitrary-precision
+ints, so no Python code runs per cell. The header carries the Zobrist hash,
+so a loaded map is keyed for every content cache without being hashed again.
+"""
+import mmap
+import struct
+from typing import List, Tuple
+
+HEADER = struct.Struct("<4sHHIIQ")
+MAGIC = b"GCMB"
+FORMAT_VERSION = 1
+BINARY_SUFFIX = ".gcm"
+
+# Byte translations: non-zero bytes to the digit '1', digits back to 0/1 bytes, and 0-8 up to step costs 1-9
+_NONZERO_DIGITS = b"0" + b"1" * 255
+_DIGIT_BITS = bytes(value - ord("0") if value in b"01" else 0 for value in range(256))
+_PLUS_ONE = bytes((value + 1) & 0xFF for value in range(256))
+
+
+def _cost_digits(plane: int) -> bytes:
+    """Translation of step costs to the digit of bit plane of cost - 1"""
+    return bytes(ord("1") if value and ((value - 1) >> plane) & 1 else ord("0") for value in range(256))
+
+
+def pack_plane(values, digits: bytes = _NONZERO_DIGITS) -> bytes:
+    """One bit per byte of values, set where digits translates the byte to '1'"""
+    # Reversed so that cell 0 ends up as the lowest bit of the first byte
+    bits = bytes(values).translate(digits)[::-1]
+    return int(bits or b"0", 2).to_bytes((len(values) + 7) // 8, "little")
+
+
+def unpack_plane(data, count: int) -> bytearray:
+    """The first count bits of a packed plane as 0/1 bytes"""
+    if not count:
+        return bytearray()
+    bits = format(int.from_bytes(data, "little"), f"0{count}b")[-count:]
+    return bytearray(bits.encode()[::-1].translate(_DIGIT_BITS))
+
+
+def is_binary_map(filename: str) -> bool:
+    """True if the file starts like a binary map"""
+    try:
+        with open(filename, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except (FileNotFoundError, IOError):
+        return False
+
+
+def write_map(filename: str, rows: int, cols: int, cells, costs, zobrist: int) -> None:
+    """Write wall and step cost buffers as a binary map file"""
+    max_cost = max(costs, default=1)
+    with open(filename, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, max_cost, rows, cols, zobrist))
+        f.write(pack_plane(cells))
+        for plane in range((max_cost - 1).bit_length()):
+            f.write(pack_plane(costs, _cost_digits(plane)))
+
+
+class MapFile:
+    """A binary map file mapped into memory.
+    
+    Opening reads only the header; the planes are paged in by the OS as cells
+    are looked at, so point queries on a huge map never touch most of it.
+    cells and costs unpack whole planes into the byte buffers GameMap uses.
+    """
+    def __init__(self, filename: str):
+        with open(filename, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER.size:
+            self._mmap.close()
+            raise ValueError(f"{filename} is not a binary map")
+        magic, version, self.max_cost, self.rows, self.cols, self.zobrist = HEADER.unpack_from(self._mmap, 0)
+        self.size = self.rows * self.cols
+        self.plane_bytes = (self.size + 7) // 8
+        self.cost_planes = (self.max_cost - 1).bit_length()
+        if magic != MAGIC or version != FORMAT_VERSION or self.max_cost < 1:
+            self._mmap.close()
+            raise ValueError(f"{filename} is not a version {FORMAT_VERSION} binary map")
+        if len(self._mmap) != HEADER.size + self.plane_bytes * (1 + self.cost_planes):
+            self._mmap.close()
+            raise ValueError(f"{filename} is truncated or has trailing data")
+    
+    def __enter__(self) -> "MapFile":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Unmap the file"""
+        self._mmap.close()
+    
+    def _plane(self, plane: int) -> bytes:
+        """Packed bytes of a plane: 0 for walls, 1 and up for the cost bits"""
+        start = HEADER.size + plane * self.plane_bytes
+        return self._mmap[start:start + self.plane_bytes]
+    
+    def _bit(self, plane: int, cell: int) -> int:
+        """One cell's bit of a plane"""
+        return (self._mmap[HEADER.size + plane * self.plane_bytes + (cell >> 3)] >> (cell & 7)) & 1
+    
+    def is_valid_position(self, x: int, y: int) -> bool:
+        """Check if a position is valid (within bounds and not a wall)"""
+        return 0 <= x < self.cols and 0 <= y < self.rows and not self._bit(0, y * self.cols + x)
+    
+    def terrain_cost(self, x: int, y: int) -> int:
+        """Cost of stepping onto an open cell"""
+        cell = y * self.cols + x
+        return 1 + sum(self._bit(1 + plane, cell) << plane for plane in range(self.cost_planes))
+    
+    def cells(self) -> bytearray:
+        """Wall plane as one byte per cell, 1 for walls"""
+        return unpack_plane(self._plane(0), self.size)
+    
+    def costs(self) -> bytearray:
+        """Step cost of every cell as one byte each, 1 for walls and plain paths"""
+        if not self.cost_planes:
+            return bytearray(b"\x01") * self.size
+        # Each plane's 0/1 bytes shifted into place; a byte never carries into its neighbour
+        lanes = 0
+        for plane in range(self.cost_planes):
+            lanes |= int.from_bytes(unpack_plane(self._plane(1 + plane), self.size), "little") << plane
+        return bytearray(lanes.to_bytes(self.size, "little").translate(_PLUS_ONE))
+    
+    def grid(self) -> List[List[int]]:
+        """Map file values row by row: 0 path, 1 wall, 2-9 weighted path"""
+        cells, costs, cols = self.cells(), self.costs(), self.cols
+        return [[costs[i] if costs[i] > 1 else cells[i] for i in range(r*cols, (r+1)*cols)] for r in range(self.rows)]
+    
+    def buffers(self) -> Tuple[int, int, bytearray, bytearray, int]:
+        """rows, cols, cells, costs and Zobrist hash, ready for GameMap"""
+        return self.rows, self.cols, self.cells(), self.costs(), self.zobrist
@@ -0,0 +1,80 @@
+# ==========================================
+# MONOTONE PRIORITY QUEUES
+# ==========================================
+from typing import List, Tuple
+
+
+class BucketQueue:
+    """Dial's bucket queue: a ring of max_weight + 1 buckets indexed by distance.
+    
+    Dijkstra never pushes a key more than max_weight past the last one popped,
+    so the ring always has room and both push and pop are O(1) amortised.
+    """
+    def __init__(self, max_weight: int):
+        self.buckets: List[List[int]] = [[] for _ in range(max_weight + 1)]
+        self.current = 0  # Smallest key that can still be in the queue
+        self.size = 0
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def clear(self) -> None:
+        """Empty the queue for reuse, keeping its buckets"""
+        for bucket in self.buckets:
+            bucket.clear()
+        self.current = 0
+        self.size = 0
+    
+    def push(self, key: int, item: int) -> None:
+        self.buckets[key % len(self.buckets)].append(item)
+        self.size += 1
+    
+    def pop(self) -> Tuple[int, int]:
+        """Remove and return (key, item) with the smallest key"""
+        ring = len(self.buckets)
+        while not self.buckets[self.current % ring]:
+            self.current += 1
+        self.size -= 1
+        return self.current, self.buckets[self.current % ring].pop()
+
+
+class RadixHeap:
+    """Radix heap: items binned by the highest bit in which their key differs from the last pop.
+    
+    Each item moves to a lower bin at most once per bit of the key, so with
+    keys bounded by C a push is O(1) and a pop O(log C) amortised, no matter
+    how many items are queued.
+    """
+    def __init__(self):
+        self.bins: List[List[Tuple[int, int]]] = [[] for _ in range(65)]
+        self.last = 0
+        self.size = 0
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def clear(self) -> None:
+        """Empty the heap for reuse, keeping its bins"""
+        for bin_ in self.bins:
+            bin_.clear()
+        self.last = 0
+        self.size = 0
+    
+    def push(self, key: int, item: int) -> None:
+        self.bins[(key ^ self.last).bit_length()].append((key, item))
+        self.size += 1
+    
+    def pop(self) -> Tuple[int, int]:
+        """Remove and return (key, item) with the smallest key"""
+        if not self.bins[0]:
+            index = 1
+            while not self.bins[index]:
+                index += 1
+            # Redistribute the first non-empty bin around its smallest key
+            spill = self.bins[index]
+            self.bins[index] = []
+            self.last = min(key for key, _ in spill)
+            for key, item in spill:
+                self.bins[(key ^ self.last).bit_length()].append((key, item))
+        self.size -= 1
+        return self.bins[0].pop()
@@ -0,0 +1,106 @@
+# ==========================================
+# PATH RESULT CACHE
+# ==========================================
+import sys
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from game.map import content_key
+from game.pathfinding import PathfindingAlgorithm
+
+
+class PathCache:
+    """Bounded LRU cache of find_path results, shared by every algorithm in a game.
+    
+    Entries are keyed by the map's Zobrist hash, the algorithm's name and
+    settings, and the start and goal, so a repeated query on an unchanged map
+    skips the search, even after the map was edited and changed back or
+    loaded again in another session. Paths are stored as packed arrays of row-major cell
+    indices, and the least recently used entries are evicted once their
+    total size passes max_bytes. Algorithms whose results are not a function
+    of the query alone (see PathfindingAlgorithm.cacheable) are never cached,
+    nor is the [] of a bounded search that gave up (stats.gave_up), which
+    says nothing about whether the goal can be reached.
+    """
+    def __init__(self, max_bytes: int = 1 << 20):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[Hashable, array]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Counters for display or logging"""
+        return {"entries": len(self.entries), "bytes": self.bytes, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": self.hit_rate}
+    
+    def clear(self) -> None:
+        """Drop every entry, keeping the counters"""
+        self.entries.clear()
+        self.bytes = 0
+    
+    def key(self, algorithm: PathfindingAlgorithm, start: Tuple[int, int],
+            goal: Tuple[int, int]) -> Optional[Hashable]:
+        """Cache key for a query, or None if the algorithm's results must not be cached"""
+        if not algorithm.cacheable():
+            return None
+        settings = tuple(sorted(algorithm.settings().items()))
+        return (content_key(algorithm.game_map), algorithm.name, settings, tuple(start), tuple(goal))
+    
+    def lookup(self, algorithm: PathfindingAlgorithm, start: Tuple[int, int],
+               goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """The cached path for a query ([] if it had none), or None on a miss"""
+        key = self.key(algorithm, start, goal)
+        if key is None:
+            return None
+        packed = self.entries.get(key)
+        if packed is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        cols = algorithm.game_map.cols
+        return [(cell % cols, cell // cols) for cell in packed]
+    
+    def store(self, algorithm: PathfindingAlgorithm, start: Tuple[int, int], goal: Tuple[int, int],
+              path: List[Tuple[int, int]]) -> None:
+        """Remember the path algorithm just found for a query, evicting old entries to stay within max_bytes"""
+        key = self.key(algorithm, start, goal)
+        if key is None or algorithm.stats.gave_up:
+            return
+        game_map = algorithm.game_map
+        cols = game_map.cols
+        # Two bytes per step while every cell index fits, four beyond
+        packed = array('H' if game_map.rows * cols <= 0x10000 else 'I', [y * cols + x for x, y in path])
+        size = sys.getsizeof(packed)
+        if size > self.max_bytes:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.bytes -= sys.getsizeof(old)
+        self.entries[key] = packed
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= sys.getsizeof(evicted)
+            self.evictions += 1
+    
+    def find_path(self, algorithm: PathfindingAlgorithm, start: Tuple[int, int],
+                  goal: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """algorithm.find_path, answered from the cache when possible"""
+        path = self.lookup(algorithm, start, goal)
+        if path is None:
+            path = algorithm.find_path(start, goal)
+            self.store(algorithm, start, goal, path)
+        return path
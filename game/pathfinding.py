@@ -1,181 +1,842 @@
 from abc import ABC, abstractmethod
-from collections import deque
+import bisect
+from collections import OrderedDict
 import heapq
 import random
-from typing import List, Tuple
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from game.anytime import AnytimeSearch
+from game.contraction import ContractionHierarchy, hierarchy_path
+from game.corridors import CorridorGraph
+from game.first_moves import FirstMoveDatabase
+from game.landmarks import LandmarkTable
+from game.layout import CellLayout
+from game.symmetry import RectangleDecomposition
 from game.map import GameMap
+from game.workspace import WorkspacePool
+
+class SearchStats:
+    """Counters describing the most recent search"""
+    def __init__(self):
+        self.reset()
+    
+    def reset(self) -> None:
+        """Clear the counters before a new search"""
+        self.nodes_expanded = 0
+        self.peak_nodes = 0  # Most search nodes held in memory at once, where tracked
+        self.suboptimality = 1.0  # Proven bound on path cost over the optimum; above 1 only for anytime searches
+        self.improvements: List[Tuple[float, int]] = []  # Anytime searches: (bound, nodes expanded) per route found
+        self.gave_up = False  # Bounded searches: [] came from running out of budget, not from an unreachable goal
 
 class PathfindingAlgorithm(ABC):
     """Abstract base class for pathfinding algorithms"""
     def __init__(self, game_map: GameMap):
         self.game_map = game_map
         self.name = "Unknown"
+        self.stats = SearchStats()
+        self.workspaces = WorkspacePool()  # Scratch arrays reused across queries, one set per thread
+        self.layout = "row"  # Cell numbering the search runs on, see game.layout
+        self.cell_layout: Optional[CellLayout] = None
+        self.cell_layout_version = None
     
     @abstractmethod
     def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
         """Find a path from start to goal"""
         pass
+    
+    def settings(self) -> Dict[str, Any]:
+        """Constructor arguments besides the map, so a worker can build the same algorithm"""
+        return {}
+    
+    def answers_steps(self) -> bool:
+        """True when next_step can stand in for find_path on the current map"""
+        return False
+    
+    def cacheable(self) -> bool:
+        """True when find_path depends only on the map, settings, start and goal, so its results may be reused"""
+        return True
+    
+    def next_step(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        """Answer a single step without a search, or None if the algorithm needs a full path"""
+        return None
+    
+    def refine(self, position: Tuple[int, int], goal: Tuple[int, int], deadline: float) -> Optional[List[Tuple[int, int]]]:
+        """Improve an earlier path until deadline (perf_counter time); a better path from position, or None"""
+        return None
+    
+    def current_layout(self) -> CellLayout:
+        """The map in this algorithm's cell layout, rebuilt when the map changes"""
+        if self.cell_layout is None or self.cell_layout_version != self.game_map.version:
+            self.cell_layout = CellLayout.for_map(self.game_map, self.layout)
+            self.cell_layout_version = self.game_map.version
+        return self.cell_layout
 
 class BFSAlgorithm(PathfindingAlgorithm):
     """Breadth-first search implementation"""
-    def __init__(self, game_map: GameMap):
+    def __init__(self, game_map: GameMap, layout: str = "row"):
         super().__init__(game_map)
         self.name = "BFS"
+        self.layout = layout
+    
+    def settings(self) -> Dict[str, Any]:
+        return {"layout": self.layout}
     
     def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
         """Find path using breadth-first search"""
-        queue = deque([[start]])
-        visited = set([start])
+        self.stats.reset()
+        layout = self.current_layout()
+        if not (layout.contains(start) and layout.contains(goal)):
+            return []
+        cells, neighbors = layout.cells, layout.neighbors
+        source, target = layout.index(*start), layout.index(*goal)
+        workspace = self.workspaces.acquire(layout.size)
+        generation = workspace.begin()
+        seen, parent, queue = workspace.seen, workspace.parent, workspace.queue
+        seen[source] = generation
+        parent[source] = -1
+        queue.append(source)
+        expanded = 0
         
         while queue:
-            path = queue.popleft()
-            x, y = path[-1]
+            cell = queue.popleft()
+            expanded += 1
             
-            if (x, y) == goal:
-                return path
-                
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nx, ny = x + dx, y + dy
-                if self.game_map.is_valid_position(nx, ny) and (nx, ny) not in visited:
-                    queue.append(path + [(nx, ny)])
-                    visited.add((nx, ny))
+            if cell == target:
+                self.stats.nodes_expanded = expanded
+                return workspace.path_to(cell, layout)
+            
+            for neighbor in neighbors(cell):
+                if neighbor >= 0 and cells[neighbor] == 0 and seen[neighbor] != generation:
+                    seen[neighbor] = generation
+                    parent[neighbor] = cell
+                    queue.append(neighbor)
         
+        self.stats.nodes_expanded = expanded
         return []  # No path found
 
 class DFSAlgorithm(PathfindingAlgorithm):
     """Depth-first search implementation"""
-    def __init__(self, game_map: GameMap):
+    def __init__(self, game_map: GameMap, layout: str = "row"):
         super().__init__(game_map)
         self.name = "DFS"
+        self.layout = layout
+    
+    def settings(self) -> Dict[str, Any]:
+        return {"layout": self.layout}
     
     def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
         """Find path using depth-first search"""
-        stack = [[start]]
-        visited = set([start])
+        self.stats.reset()
+        layout = self.current_layout()
+        if not (layout.contains(start) and layout.contains(goal)):
+            return []
+        cells, neighbors = layout.cells, layout.neighbors
+        source, target = layout.index(*start), layout.index(*goal)
+        workspace = self.workspaces.acquire(layout.size)
+        generation = workspace.begin()
+        seen, parent, stack = workspace.seen, workspace.parent, workspace.stack
+        seen[source] = generation
+        parent[source] = -1
+        stack.append(source)
+        expanded = 0
         
         while stack:
-            path = stack.pop()
-            x, y = path[-1]
+            cell = stack.pop()
+            expanded += 1
             
-            if (x, y) == goal:
-                return path
-                
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nx, ny = x + dx, y + dy
-                if self.game_map.is_valid_position(nx, ny) and (nx, ny) not in visited:
-                    stack.append(path + [(nx, ny)])
-                    visited.add((nx, ny))
+            if cell == target:
+                self.stats.nodes_expanded = expanded
+                return workspace.path_to(cell, layout)
+            
+            for neighbor in neighbors(cell):
+                if neighbor >= 0 and cells[neighbor] == 0 and seen[neighbor] != generation:
+                    seen[neighbor] = generation
+                    parent[neighbor] = cell
+                    stack.append(neighbor)
         
+        self.stats.nodes_expanded = expanded
         return []  # No path found
 
 class AStarAlgorithm(PathfindingAlgorithm):
     """A* pathfinding implementation"""
-    def __init__(self, game_map: GameMap):
+    def __init__(self, game_map: GameMap, layout: str = "row"):
         super().__init__(game_map)
         self.name = "AStar"
+        self.layout = layout
+    
+    def settings(self) -> Dict[str, Any]:
+        return {"layout": self.layout}
     
     def heuristic(self, a: Tuple[int, int], b: Tuple[int, int]) -> int:
         """Calculate Manhattan distance heuristic"""
         return abs(a[0] - b[0]) + abs(a[1] - b[1])
     
+    def cell_heuristic(self, cell: int, goal: int) -> int:
+        """The heuristic between cell indices of the current layout"""
+        return self.cell_layout.distance(cell, goal)
+    
     def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
         """Find path using A* search"""
-        open_set = []
-        heapq.heappush(open_set, (0, [start]))
-        visited = set()
+        self.stats.reset()
+        layout = self.current_layout()
+        if not (layout.contains(start) and layout.contains(goal)):
+            return []
+        cells, neighbors = layout.cells, layout.neighbors
+        source, target = layout.index(*start), layout.index(*goal)
+        workspace = self.workspaces.acquire(layout.size)
+        generation = workspace.begin()
+        seen, closed, distance, parent = workspace.seen, workspace.closed, workspace.distance, workspace.parent
+        open_set = workspace.heap
+        seen[source] = generation
+        distance[source] = 0
+        parent[source] = -1
+        heapq.heappush(open_set, (self.cell_heuristic(source, target), source))
+        expanded = closed_count = peak = 0
+        found = False
         
         while open_set:
-            cost, path = heapq.heappop(open_set)
-            x, y = path[-1]
+            _, cell = heapq.heappop(open_set)
+            
+            if cell == target:
+                found = True
+                break
+            
+            if closed[cell] == generation:
+                continue
+            
+            closed[cell] = generation
+            closed_count += 1
+            expanded += 1
+            peak = max(peak, len(open_set) + closed_count)
             
-            if (x, y) == goal:
+            d = distance[cell] + 1
+            for neighbor in neighbors(cell):
+                if (neighbor >= 0 and cells[neighbor] == 0 and closed[neighbor] != generation
+                        and (seen[neighbor] != generation or d < distance[neighbor])):
+                    seen[neighbor] = generation
+                    distance[neighbor] = d
+                    parent[neighbor] = cell
+                    heapq.heappush(open_set, (d + self.cell_heuristic(neighbor, target), neighbor))
+        
+        self.stats.nodes_expanded = expanded
+        self.stats.peak_nodes = peak
+        if not found:
+            return []  # No path found
+        return workspace.path_to(target, layout)
+
+class ALTAlgorithm(AStarAlgorithm):
+    """A* guided by landmark triangle-inequality bounds (ALT)"""
+    def __init__(self, game_map: GameMap, landmarks: int = 8):
+        super().__init__(game_map)  # Row-major layout, the order the landmark table is stored in
+        self.name = "ALT"
+        self.landmarks = landmarks
+        self.table = None
+        self.table_version = None
+    
+    def settings(self) -> Dict[str, Any]:
+        return {"landmarks": self.landmarks}
+    
+    def heuristic(self, a: Tuple[int, int], b: Tuple[int, int]) -> int:
+        """Larger of the Manhattan distance and the best landmark bound"""
+        cols = self.game_map.cols
+        return self.cell_heuristic(a[1] * cols + a[0], b[1] * cols + b[0])
+    
+    def cell_heuristic(self, cell: int, goal: int) -> int:
+        """Larger of the Manhattan distance and the best landmark bound, between flat cell indices"""
+        return max(self.table.lower_bound(cell, goal), super().cell_heuristic(cell, goal))
+    
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Find path using A* with landmark distances, precomputed once per map version"""
+        if self.table_version != self.game_map.version:
+            self.table = LandmarkTable.for_map(self.game_map, self.landmarks)
+            self.table_version = self.game_map.version
+        return super().find_path(start, goal)
+
+class IDAStarAlgorithm(PathfindingAlgorithm):
+    """Iterative-deepening A*: repeated depth-first passes under a growing f bound.
+    
+    Only the current path is kept (no transposition table), so memory is linear
+    in the path length; the price is re-expanding cells on every pass. Moves
+    back onto the current path, the parent included, are pruned, but the many
+    equal-cost routes of a 4-connected grid are still each walked again: on
+    map.txt a route of 50-100 steps can exhaust the default 250k expansions.
+    Such a search returns [] with stats.gave_up set, which callers should not
+    read as "unreachable".
+    """
+    def __init__(self, game_map: GameMap, max_expansions: int = 250_000):
+        super().__init__(game_map)
+        self.name = "IDAStar"
+        self.max_expansions = max_expansions
+    
+    def settings(self) -> Dict[str, Any]:
+        return {"max_expansions": self.max_expansions}
+    
+    def heuristic(self, a: Tuple[int, int], b: Tuple[int, int]) -> int:
+        """Calculate Manhattan distance heuristic"""
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+    
+    def successors(self, cell: Tuple[int, int], goal: Tuple[int, int], on_path: set) -> List[Tuple[int, int]]:
+        """Open neighbours not already on the current path, the ones heading for the goal first"""
+        x, y = cell
+        options = [(x + dx, y + dy) for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]
+                   if self.game_map.is_valid_position(x + dx, y + dy) and (x + dx, y + dy) not in on_path]
+        options.sort(key=lambda option: self.heuristic(option, goal))
+        return options
+    
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Find path using IDA*, giving up after max_expansions"""
+        self.stats.reset()
+        if not (self.game_map.is_valid_position(*start) and self.game_map.is_valid_position(*goal)):
+            return []
+        if start == goal:
+            return [start]
+        
+        bound = self.heuristic(start, goal)
+        while bound != float('inf'):
+            if self.stats.nodes_expanded >= self.max_expansions:
+                self.stats.gave_up = True
+                return []
+            path, bound = self._bounded_pass(start, goal, bound)
+            if path or self.stats.gave_up:
                 return path
-                
-            if (x, y) in visited:
+        return []  # No path found
+    
+    def _bounded_pass(self, start: Tuple[int, int], goal: Tuple[int, int],
+                      bound: int) -> Tuple[List[Tuple[int, int]], float]:
+        """Depth-first pass pruning at f > bound; return a path or the next bound to try"""
+        path = [start]
+        on_path = {start}
+        pending = [iter(self.successors(start, goal, on_path))]
+        next_bound = float('inf')
+        
+        while pending:
+            cell = next(pending[-1], None)
+            if cell is None:
+                pending.pop()
+                on_path.discard(path.pop())
                 continue
-                
-            visited.add((x, y))
             
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nx, ny = x + dx, y + dy
-                if self.game_map.is_valid_position(nx, ny) and (nx, ny) not in visited:
-                    new_path = path + [(nx, ny)]
-                    new_cost = len(new_path) + self.heuristic((nx, ny), goal)
-                    heapq.heappush(open_set, (new_cost, new_path))
+            f = len(path) + self.heuristic(cell, goal)
+            if f > bound:
+                next_bound = min(next_bound, f)
+                continue
+            if cell == goal:
+                return path + [cell], bound
+            
+            self.stats.nodes_expanded += 1
+            if self.stats.nodes_expanded >= self.max_expansions:
+                self.stats.gave_up = True
+                break
+            path.append(cell)
+            on_path.add(cell)
+            pending.append(iter(self.successors(cell, goal, on_path)))
+            self.stats.peak_nodes = max(self.stats.peak_nodes, len(path))
+        
+        return [], next_bound
+
+
+class _SMANode:
+    """Search node of SMA*: children in memory, successors never generated, and forgotten ones"""
+    __slots__ = ("cell", "g", "f", "depth", "parent", "children", "pending", "forgotten", "key")
+    
+    def __init__(self, cell: Tuple[int, int], g: int, f: float, depth: int, parent: Optional["_SMANode"]):
+        self.cell = cell
+        self.g = g
+        self.f = f
+        self.depth = depth
+        self.parent = parent
+        self.children: List["_SMANode"] = []
+        self.pending: Optional[List[Tuple[int, int]]] = None
+        self.forgotten: Dict[Tuple[int, int], float] = {}
+        self.key = None
+
+class _SMAMemory:
+    """Every node SMA* holds: the open list sorted by (f, -depth, serial) and the cheapest node per cell"""
+    def __init__(self):
+        self.keys: List[tuple] = []
+        self.open: Dict[tuple, _SMANode] = {}
+        self.held: Dict[Tuple[int, int], _SMANode] = {}
+        self.used = 0
+        self.serial = 0
+    
+    def best(self) -> _SMANode:
+        """Lowest f, deepest first"""
+        return self.open[self.keys[0]]
+    
+    def push(self, node: _SMANode) -> None:
+        """Put a node on the open list"""
+        self.serial += 1
+        node.key = (node.f, -node.depth, self.serial)
+        bisect.insort(self.keys, node.key)
+        self.open[node.key] = node
+    
+    def pop(self, node: _SMANode) -> None:
+        """Take a node off the open list"""
+        del self.keys[bisect.bisect_left(self.keys, node.key)]
+        del self.open[node.key]
+        node.key = None
+    
+    def hold(self, node: _SMANode) -> None:
+        """Count a new node and remember it as the cheapest way to its cell if it is"""
+        self.used += 1
+        known = self.held.get(node.cell)
+        if known is None or node.g < known.g:
+            self.held[node.cell] = node
+    
+    def release(self, node: _SMANode) -> None:
+        """Detach a leaf from its parent and free it"""
+        if node.key is not None:
+            self.pop(node)
+        node.parent.children.remove(node)
+        if self.held.get(node.cell) is node:
+            del self.held[node.cell]
+        self.used -= 1
+    
+    def forget_worst(self, best: _SMANode) -> None:
+        """Drop the shallowest open leaf with the worst f, remembering its f in its parent"""
+        worst = next((self.open[key] for key in reversed(self.keys)
+                      if not self.open[key].children and self.open[key].parent is not None
+                      and self.open[key] is not best), None)
+        if worst is None:
+            return
+        self.release(worst)
+        parent = worst.parent
+        parent.forgotten[worst.cell] = worst.f
+        if parent.key is None:
+            self.push(parent)
+        self.back_up(parent)
+    
+    def back_up(self, node: _SMANode) -> None:
+        """Raise f of ancestors that generated every successor once to the best f below them.
+        
+        Forgotten successors count with the f they had; nodes with nothing left
+        below them are dead ends and are freed.
+        """
+        while node is not None and node.pending == []:
+            if not node.children and not node.forgotten and node.parent is not None:
+                parent = node.parent
+                self.release(node)
+                node = parent
+                continue
+            new_f = min([child.f for child in node.children] + list(node.forgotten.values()),
+                        default=float('inf'))
+            if new_f == node.f:
+                break
+            node.f = new_f
+            if node.key is not None:
+                self.pop(node)
+                self.push(node)
+            node = node.parent
+
+class SMAStarAlgorithm(PathfindingAlgorithm):
+    """Simplified memory-bounded A*: A* that never holds more than node_budget nodes.
+    
+    When memory is full the shallowest leaf with the worst f is forgotten and
+    its f backed up into its parent, which can regenerate it later. A cell
+    already held at no greater cost is not generated again. The path is optimal
+    whenever it fits in the budget; a budget barely above the path length can
+    thrash, so the search also gives up after max_expansions.
+    """
+    def __init__(self, game_map: GameMap, node_budget: int = 4096, max_expansions: int = 250_000):
+        super().__init__(game_map)
+        self.name = "SMAStar"
+        self.node_budget = node_budget
+        self.max_expansions = max_expansions
+    
+    def settings(self) -> Dict[str, Any]:
+        return {"node_budget": self.node_budget, "max_expansions": self.max_expansions}
+    
+    def heuristic(self, a: Tuple[int, int], b: Tuple[int, int]) -> int:
+        """Calculate Manhattan distance heuristic"""
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+    
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Find path using SMA* within the node budget"""
+        self.stats.reset()
+        if not (self.game_map.is_valid_position(*start) and self.game_map.is_valid_position(*goal)):
+            return []
+        
+        memory = _SMAMemory()
+        root = _SMANode(start, 0, self.heuristic(start, goal), 0, None)
+        memory.push(root)
+        memory.hold(root)
+        
+        while memory.keys:
+            best = memory.best()
+            if best.f == float('inf'):
+                self.stats.gave_up = True
+                return []  # Every route left needs more memory than the budget
+            if best.cell == goal:
+                path = []
+                node = best
+                while node is not None:
+                    path.append(node.cell)
+                    node = node.parent
+                return path[::-1]
+            
+            if best.pending is None:
+                self.stats.nodes_expanded += 1
+                if self.stats.nodes_expanded > self.max_expansions:
+                    self.stats.gave_up = True
+                    return []
+                x, y = best.cell
+                best.pending = [(x + dx, y + dy) for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]
+                                if self.game_map.is_valid_position(x + dx, y + dy)]
+            
+            if not best.pending and not best.forgotten:
+                # A dead end, or the root with nothing left: off the open list, and its f backs up
+                memory.pop(best)
+                memory.back_up(best)
+                continue
+            
+            # Generate one successor at a time: new ones first, then the most promising forgotten one
+            if best.pending:
+                cell, floor = best.pending.pop(), 0
+            else:
+                cell = min(best.forgotten, key=best.forgotten.get)
+                floor = best.forgotten.pop(cell)
+            known = memory.held.get(cell)
+            # Cells already held at no greater cost are covered by that node
+            if known is None or known.g > best.g + 1:
+                if memory.used >= self.node_budget:
+                    memory.forget_worst(best)
+                child = _SMANode(cell, best.g + 1, 0, best.depth + 1, best)
+                if cell != goal and child.depth >= self.node_budget - 1:
+                    child.f = float('inf')  # Its path could never fit in memory
+                else:
+                    child.f = max(best.f, child.g + self.heuristic(cell, goal), floor)
+                best.children.append(child)
+                memory.push(child)
+                memory.hold(child)
+                self.stats.peak_nodes = max(self.stats.peak_nodes, memory.used)
+            
+            if not best.pending and not best.forgotten and best.key is not None:
+                # Every successor is in memory: it leaves the open list
+                memory.pop(best)
+            memory.back_up(best)
         
         return []  # No path found
 
+class ARAStarAlgorithm(PathfindingAlgorithm):
+    """Anytime repairing A* (ARA*): an inflated first path, tightened while frame time is left over"""
+    search_limit = 8  # Recent searches kept for refining
+    
+    def __init__(self, game_map: GameMap, epsilon: float = 3.0, epsilon_step: float = 0.5):
+        super().__init__(game_map)
+        self.name = "ARAStar"
+        self.epsilon = epsilon
+        self.epsilon_step = epsilon_step
+        self.searches: "OrderedDict[Tuple[int, int, int], AnytimeSearch]" = OrderedDict()
+    
+    def settings(self) -> Dict[str, Any]:
+        return {"epsilon": self.epsilon, "epsilon_step": self.epsilon_step}
+    
+    def cacheable(self) -> bool:
+        return False  # find_path also starts the search that refine keeps improving
+    
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Find the first epsilon-suboptimal path, keeping the search to refine later"""
+        self.stats.reset()
+        if not (self.game_map.is_valid_position(*start) and self.game_map.is_valid_position(*goal)):
+            return []
+        cols = self.game_map.cols
+        search = AnytimeSearch(self.game_map, start[1] * cols + start[0], goal[1] * cols + goal[0],
+                               self.epsilon, self.epsilon_step)
+        while not search.finished and not search.improve():
+            pass
+        self._record(search)
+        if not search.solved:
+            return []
+        
+        key = (search.start, search.goal, search.version)
+        self.searches[key] = search
+        self.searches.move_to_end(key)
+        while len(self.searches) > self.search_limit:
+            self.searches.popitem(last=False)
+        return [(cell % cols, cell // cols) for cell in search.route_from(search.start)]
+    
+    def refine(self, position: Tuple[int, int], goal: Tuple[int, int], deadline: float) -> Optional[List[Tuple[int, int]]]:
+        """Resume the newest search toward goal that reached position, until it proves optimal or time runs out"""
+        cols = self.game_map.cols
+        cell, target = position[1] * cols + position[0], goal[1] * cols + goal[0]
+        search = next((s for s in reversed(self.searches.values())
+                       if s.goal == target and s.version == self.game_map.version and cell in s.parent), None)
+        if search is None or search.finished:
+            return None
+        
+        improved = False
+        while not search.finished and time.perf_counter() < deadline:
+            improved = search.improve(deadline) or improved
+        if not improved:
+            return None
+        self._record(search)
+        return [(c % cols, c // cols) for c in search.route_from(cell)]
+    
+    def _record(self, search: AnytimeSearch) -> None:
+        self.stats.nodes_expanded = search.expansions
+        self.stats.peak_nodes = max(self.stats.peak_nodes, len(search.g))
+        self.stats.suboptimality = search.bound
+        self.stats.improvements = list(search.improvements)
+
 class DijkstraAlgorithm(PathfindingAlgorithm):
-    """Dijkstra's algorithm implementation"""
-    def __init__(self, game_map: GameMap):
+    """Dijkstra's algorithm over terrain costs, on a monotone integer queue instead of a binary heap"""
+    def __init__(self, game_map: GameMap, bucket_limit: int = 16, layout: str = "row"):
         super().__init__(game_map)
         self.name = "Dijkstra"
+        self.bucket_limit = bucket_limit  # Largest step cost still served by Dial's buckets
+        self.layout = layout
+    
+    def settings(self) -> Dict[str, Any]:
+        return {"bucket_limit": self.bucket_limit, "layout": self.layout}
     
     def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
-        """Find path using Dijkstra's algorithm"""
-        open_set = []
-        heapq.heappush(open_set, (0, [start]))
-        visited = set()
+        """Find the cheapest path using Dijkstra's algorithm"""
+        self.stats.reset()
+        if not (self.game_map.is_valid_position(*start) and self.game_map.is_valid_position(*goal)):
+            return []
+        layout = self.current_layout()
+        cells, costs, neighbors = layout.cells, layout.costs, layout.neighbors
+        max_cost = layout.max_cost
+        source, target = layout.index(*start), layout.index(*goal)
         
-        while open_set:
-            cost, path = heapq.heappop(open_set)
-            x, y = path[-1]
-            
-            if (x, y) == goal:
-                return path
-                
-            if (x, y) in visited:
-                continue
-                
-            visited.add((x, y))
+        # A ring of max_cost + 1 buckets while that stays small, a radix heap for heavier terrain
+        workspace = self.workspaces.acquire(layout.size)
+        generation = workspace.begin()
+        queue = workspace.bucket_queue(max_cost) if max_cost <= self.bucket_limit else workspace.radix_heap()
+        seen, distance, parent = workspace.seen, workspace.distance, workspace.parent
+        seen[source] = generation
+        distance[source] = 0
+        parent[source] = -1
+        queue.push(0, source)
+        expanded = 0
+        while queue:
+            d, cell = queue.pop()
+            if d > distance[cell]:
+                continue  # Stale entry
+            if cell == target:
+                self.stats.nodes_expanded = expanded
+                return workspace.path_to(cell, layout)
+            expanded += 1
             
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nx, ny = x + dx, y + dy
-                if self.game_map.is_valid_position(nx, ny) and (nx, ny) not in visited:
-                    new_path = path + [(nx, ny)]
-                    new_cost = len(new_path) - 1  # Just the number of steps
-                    heapq.heappush(open_set, (new_cost, new_path))
+            for neighbor in neighbors(cell):
+                if neighbor < 0 or cells[neighbor] != 0:
+                    continue
+                new_cost = d + (costs[neighbor] if costs is not None else 1)
+                if seen[neighbor] != generation or new_cost < distance[neighbor]:
+                    seen[neighbor] = generation
+                    distance[neighbor] = new_cost
+                    parent[neighbor] = cell
+                    queue.push(new_cost, neighbor)
         
+        self.stats.nodes_expanded = expanded
         return []  # No path found
 
-class KruskalAlgorithm(PathfindingAlgorithm):
-    """Random walk algorithm (named Kruskal for consistency with original code)"""
+class FirstMoveAlgorithm(PathfindingAlgorithm):
+    """Table lookups in a precomputed first-move database, with BFS when none matches the map"""
+    def __init__(self, game_map: GameMap, database: Optional[FirstMoveDatabase] = None):
+        super().__init__(game_map)
+        self.name = "FirstMove"
+        self.database = database
+        self.fallback = BFSAlgorithm(game_map)
+        self.checked_version = None
+        self.usable = False
+    
+    def current_database(self) -> Optional[FirstMoveDatabase]:
+        """The database if it was built for the map as it is now"""
+        if self.checked_version != self.game_map.version:
+            if self.database is None and isinstance(self.game_map, GameMap):
+                self.database = FirstMoveDatabase.for_map_file(self.game_map)
+            self.usable = self.database is not None and self.database.matches(self.game_map)
+            self.checked_version = self.game_map.version
+        return self.database if self.usable else None
+    
+    def answers_steps(self) -> bool:
+        """True while a database matches the map"""
+        return self.current_database() is not None
+    
+    def next_step(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        """Look up the next cell toward goal"""
+        database = self.current_database()
+        return database.next_step(start, goal) if database else None
+    
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Find path by chaining first moves, falling back to BFS without a database"""
+        database = self.current_database()
+        if database is None:
+            path = self.fallback.find_path(start, goal)
+            self.stats.nodes_expanded = self.fallback.stats.nodes_expanded
+            return path
+        
+        self.stats.reset()
+        path = [start]
+        step = database.next_step(start, goal)
+        while step is not None:
+            path.append(step)
+            step = database.next_step(step, goal)
+        return path if path[-1] == goal else []
+
+class ContractionAlgorithm(PathfindingAlgorithm):
+    """Bidirectional upward Dijkstra over a contraction hierarchy, built once per map version"""
     def __init__(self, game_map: GameMap):
+        super().__init__(game_map)
+        self.name = "CH"
+        self.hierarchy = None
+        self.hierarchy_version = None
+    
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Find path with a contraction hierarchy query and unpack its shortcuts"""
+        if self.hierarchy_version != self.game_map.version:
+            # A hierarchy saved next to the map file is used when it still matches
+            filename = hierarchy_path(self.game_map.filename) if isinstance(self.game_map, GameMap) else None
+            self.hierarchy = ContractionHierarchy.for_map(self.game_map, filename)
+            self.hierarchy_version = self.game_map.version
+        
+        self.stats.reset()
+        if not (self.game_map.is_valid_position(*start) and self.game_map.is_valid_position(*goal)):
+            return []
+        cols = self.game_map.cols
+        cells, self.stats.nodes_expanded = self.hierarchy.query(start[1] * cols + start[0], goal[1] * cols + goal[0])
+        return [(cell % cols, cell // cols) for cell in cells]
+
+class CorridorAlgorithm(PathfindingAlgorithm):
+    """BFS, uniform-cost search or A* over junctions, with dead ends pruned and corridors collapsed.
+    
+    Edges are weighted by corridor length in steps; terrain costs are ignored.
+    """
+    NAMES = {"bfs": "CorridorBFS", "dijkstra": "CorridorUCS", "astar": "CorridorAStar"}
+    
+    def __init__(self, game_map: GameMap, strategy: str = "dijkstra"):
+        super().__init__(game_map)
+        self.name = self.NAMES[strategy]
+        self.strategy = strategy
+        self.graph = None
+        self.graph_version = None
+    
+    def settings(self) -> Dict[str, Any]:
+        return {"strategy": self.strategy}
+    
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Find path on the compact graph, expanding corridors only for the final route"""
+        if self.graph_version != self.game_map.version:
+            self.graph = CorridorGraph.for_map(self.game_map)
+            self.graph_version = self.game_map.version
+        
+        self.stats.reset()
+        if not (self.game_map.is_valid_position(*start) and self.game_map.is_valid_position(*goal)):
+            return []
+        cols = self.game_map.cols
+        cells, self.stats.nodes_expanded = self.graph.route(start[1] * cols + start[0], goal[1] * cols + goal[0],
+                                                            self.strategy)
+        return [(cell % cols, cell // cols) for cell in cells]
+
+class SymmetryReducedAlgorithm(PathfindingAlgorithm):
+    """A* or uniform-cost search over rectangle perimeters, skipping symmetric paths through open areas (RSR).
+    
+    Symmetry only holds when every step costs the same, so terrain costs are ignored.
+    """
+    def __init__(self, game_map: GameMap, use_heuristic: bool = True):
+        super().__init__(game_map)
+        self.name = "RSRAStar" if use_heuristic else "RSRUCS"
+        self.use_heuristic = use_heuristic
+        self.decomposition = None
+        self.decomposition_version = None
+    
+    def settings(self) -> Dict[str, Any]:
+        return {"use_heuristic": self.use_heuristic}
+    
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Find path with macro-edges across empty rectangles, decomposed once per map version"""
+        if self.decomposition_version != self.game_map.version:
+            self.decomposition = RectangleDecomposition.for_map(self.game_map)
+            self.decomposition_version = self.game_map.version
+        
+        self.stats.reset()
+        if not (self.game_map.is_valid_position(*start) and self.game_map.is_valid_position(*goal)):
+            return []
+        cols = self.game_map.cols
+        cells, self.stats.nodes_expanded = self.decomposition.search(start[1] * cols + start[0],
+                                                                     goal[1] * cols + goal[0], self.use_heuristic)
+        return [(cell % cols, cell // cols) for cell in cells]
+
+class KruskalAlgorithm(PathfindingAlgorithm):
+    """Loop-erased random walk (named Kruskal for consistency with original code).
+    
+    The walker wanders from the start until it lands on the goal, and every
+    time it steps back onto its own trail the loop it just closed is erased,
+    as in Wilson's algorithm, so what remains is a simple path. Each cell's
+    index on the trail is kept in the workspace, making loop erasure O(1)
+    per step. With probability goal_bias a step goes to a neighbour one step
+    closer to the goal by BFS distance, otherwise to a uniformly random one.
+    True distances, unlike Manhattan ones, never lure the walker into a dead
+    end it must then escape against the bias, so the goal is always reached
+    when it is reachable; unreachable goals are ruled out by the same BFS.
+    """
+    def __init__(self, game_map: GameMap, goal_bias: float = 0.5, seed: Optional[int] = None):
         super().__init__(game_map)
         self.name = "Kruskal"
+        self.goal_bias = goal_bias
+        self.seed = seed
+        self.random = random.Random(seed)
+    
+    def settings(self) -> Dict[str, Any]:
+        return {"goal_bias": self.goal_bias, "seed": self.seed}
+    
+    def cacheable(self) -> bool:
+        return self.seed is not None  # Seeded walks repeat exactly for the same query
     
     def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
-        """Find a path using a randomized approach (not actual Kruskal's)"""
-        path = [start]
-        current = start
-        
-        max_iterations = 1000  # Prevent infinite loops
-        iteration = 0
-        
-        while current != goal and iteration < max_iterations:
-            x, y = current
-            options = []
-            
-            # Find all valid adjacent cells
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nx, ny = x + dx, y + dy
-                if self.game_map.is_valid_position(nx, ny):
-                    options.append((nx, ny))
-            
-            # If we have options, choose a random one and continue
-            if options:
-                current = random.choice(options)
-                if current not in path:  # Avoid cycles
-                    path.append(current)
+        """Find a path by a loop-erased random walk from start to goal"""
+        self.stats.reset()
+        layout = self.current_layout()
+        if not (layout.contains(start) and layout.contains(goal)):
+            return []
+        cells, neighbors = layout.cells, layout.neighbors
+        source, target = layout.index(*start), layout.index(*goal)
+        if cells[source] != 0 or cells[target] != 0:
+            return []
+        
+        # Steps from every cell of the goal's component to the goal
+        workspace = self.workspaces.acquire(layout.size)
+        generation = workspace.begin()
+        seen, distance, queue = workspace.seen, workspace.distance, workspace.queue
+        seen[target] = generation
+        distance[target] = 0
+        queue.append(target)
+        while queue:
+            cell = queue.popleft()
+            d = distance[cell] + 1
+            for neighbor in neighbors(cell):
+                if neighbor >= 0 and cells[neighbor] == 0 and seen[neighbor] != generation:
+                    seen[neighbor] = generation
+                    distance[neighbor] = d
+                    queue.append(neighbor)
+        if seen[source] != generation:
+            return []  # No path found
+        
+        # slot[cell] is the cell's index on the trail, if trail[slot[cell]] is still that cell
+        slot = workspace.parent
+        # A seeded walk draws from a generator seeded per query, so asking again repeats it
+        rng = self.random if self.seed is None else random.Random(hash((self.seed, source, target)))
+        goal_bias = self.goal_bias
+        cell = source
+        trail = [cell]
+        slot[cell] = 0
+        steps = 0
+        while cell != target:
+            options = [n for n in neighbors(cell) if n >= 0 and cells[n] == 0]
+            if rng.random() < goal_bias:
+                closer = distance[cell] - 1
+                cell = rng.choice([n for n in options if distance[n] == closer])
             else:
-                # If we're stuck, try to backtrack
-                if len(path) > 1:
-                    path.pop()
-                    current = path[-1]
-                else:
-                    break  # Can't go anywhere
+                cell = rng.choice(options)
+            steps += 1
             
-            iteration += 1
+            index = slot[cell]
+            if 0 <= index < len(trail) and trail[index] == cell:
+                del trail[index + 1:]  # Erase the loop just closed
+            else:
+                slot[cell] = len(trail)
+                trail.append(cell)
         
-        return path
-
+        self.stats.nodes_expanded = steps
+        return [layout.position(cell) for cell in trail]
@@ -0,0 +1,161 @@
+# ==========================================
+# SHARED MEMORY MAP TRANSPORT
+# ==========================================
+import atexit
+import os
+import struct
+from itertools import count
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict
+
+from game.map import MapSnapshot
+
+# Every block this package creates is named <prefix><owner pid>_<n>, so blocks
+# left behind by a crashed process can be recognised and removed later
+BLOCK_PREFIX = "ghostcherry_"
+SHM_DIR = "/dev/shm"
+
+# Header: magic, layout version, highest step cost, rows, cols, map version, Zobrist hash.
+# The wall plane follows, then a cost plane of the same size if the cost exceeds 1
+HEADER = struct.Struct("<4sHHIIQQ")
+MAGIC = b"GCMP"
+LAYOUT_VERSION = 3
+
+_block_ids = count()
+
+
+class SharedMapBuffer:
+    """A map grid held in shared memory, readable by worker processes without copying"""
+    def __init__(self, block: shared_memory.SharedMemory, owner: bool):
+        self.block = block
+        self.owner = owner
+        self.owner_pid = os.getpid()
+        magic, layout, self.max_cost, self.rows, self.cols, self.version, self.zobrist = HEADER.unpack_from(block.buf, 0)
+        if magic != MAGIC or layout != LAYOUT_VERSION:
+            block.close()
+            raise ValueError(f"Shared memory block {block.name} does not hold a map")
+        self._cells = None
+        self._costs = None
+    
+    @property
+    def name(self) -> str:
+        """Name workers use to attach to this buffer"""
+        return self.block.name
+    
+    @classmethod
+    def create(cls, snapshot: MapSnapshot) -> "SharedMapBuffer":
+        """Copy a map snapshot into a new shared memory block owned by this process"""
+        name = f"{BLOCK_PREFIX}{os.getpid()}_{next(_block_ids)}"
+        plane = snapshot.rows * snapshot.cols
+        planes = 1 if snapshot.costs is None else 2
+        block = shared_memory.SharedMemory(name=name, create=True, size=HEADER.size + plane * planes)
+        HEADER.pack_into(block.buf, 0, MAGIC, LAYOUT_VERSION, snapshot.max_cost if planes == 2 else 1,
+                         snapshot.rows, snapshot.cols, snapshot.version, snapshot.zobrist)
+        block.buf[HEADER.size:HEADER.size + plane] = snapshot.cells
+        if planes == 2:
+            block.buf[HEADER.size + plane:HEADER.size + 2 * plane] = snapshot.costs
+        buffer = cls(block, owner=True)
+        _owned[name] = buffer
+        return buffer
+    
+    @classmethod
+    def attach(cls, name: str) -> "SharedMapBuffer":
+        """Attach to a block created by another process"""
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+    
+    def snapshot(self) -> MapSnapshot:
+        """Read-only snapshot whose cells point straight into shared memory"""
+        if self._cells is None:
+            end = HEADER.size + self.rows * self.cols
+            self._cells = self.block.buf[HEADER.size:end].toreadonly()
+            if self.max_cost > 1:
+                self._costs = self.block.buf[end:end + self.rows * self.cols].toreadonly()
+        return MapSnapshot(self.rows, self.cols, self._cells, self.version, self._costs, self.max_cost, self.zobrist)
+    
+    def close(self) -> None:
+        """Detach from the block; the owner also unlinks it"""
+        if self._cells is not None:
+            self._cells.release()
+            self._cells = None
+        if self._costs is not None:
+            self._costs.release()
+            self._costs = None
+        self.block.close()
+        # Forked children inherit the owner's object but must not unlink its block
+        if self.owner and self.owner_pid == os.getpid():
+            _owned.pop(self.block.name, None)
+            try:
+                self.block.unlink()
+            except FileNotFoundError:
+                pass
+
+
+# Blocks created by this process, unlinked at interpreter shutdown
+_owned: Dict[str, SharedMapBuffer] = {}
+
+# Blocks a worker process has attached to, keyed by name
+_attached: Dict[str, SharedMapBuffer] = {}
+
+
+def attach_cached(name: str, keep: int = 2) -> SharedMapBuffer:
+    """Attach to a block once per worker, keeping only the most recent few attachments"""
+    buffer = _attached.get(name)
+    if buffer is None:
+        buffer = SharedMapBuffer.attach(name)
+        while len(_attached) >= keep:
+            oldest = next(iter(_attached))
+            _attached.pop(oldest).close()
+        _attached[name] = buffer
+    return buffer
+
+
+def prepare_worker_pool() -> None:
+    """Start the resource tracker before a pool is created so its workers share it.
+    
+    Workers that start their own tracker would treat attached blocks as leaked
+    and unlink them when they exit, while the owner may still be using them.
+    """
+    resource_tracker.ensure_running()
+
+
+def release_all() -> None:
+    """Close every attachment and unlink every block this process owns"""
+    for buffer in list(_attached.values()):
+        buffer.close()
+    _attached.clear()
+    for buffer in list(_owned.values()):
+        buffer.close()
+
+
+def cleanup_stale_blocks() -> int:
+    """Unlink blocks whose creating process no longer exists, return how many were removed"""
+    if not os.path.isdir(SHM_DIR):
+        return 0
+    
+    removed = 0
+    for entry in os.listdir(SHM_DIR):
+        if not entry.startswith(BLOCK_PREFIX):
+            continue
+        pid_text = entry[len(BLOCK_PREFIX):].split("_", 1)[0]
+        if not pid_text.isdigit() or _pid_alive(int(pid_text)):
+            continue
+        try:
+            os.unlink(os.path.join(SHM_DIR, entry))
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def _pid_alive(pid: int) -> bool:
+    """Check whether a process with the given pid is still running"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+atexit.register(release_all)
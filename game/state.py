@@ -3,6 +3,8 @@
 # ==========================================
 import time
 
+from config import Config
+
 
 class GameState:
     """Manages the state of the game"""
@@ -13,6 +15,7 @@ class GameState:
         self.start_time = None
         self.end_time = None
         self.timer_reset = False
+        self.ticks = 0
     
     def start_game(self) -> None:
         """Start the game"""
@@ -22,6 +25,15 @@ class GameState:
         self.start_time = time.time()
         self.end_time = None
         self.timer_reset = False
+        self.ticks = 0
+    
+    def advance_tick(self) -> None:
+        """Count one fixed simulation step"""
+        self.ticks += 1
+    
+    def get_simulated_time(self) -> float:
+        """Get the simulated time in seconds, independent of the render frame rate"""
+        return self.ticks / Config.TICK_RATE
     
     def end_game(self) -> None:
         """End the game"""
@@ -37,12 +49,13 @@ class GameState:
         self.start_time = None
         self.end_time = None
         self.timer_reset = True
+        self.ticks = 0
     
     def get_elapsed_time(self) -> float:
-        """Get the elapsed time in seconds"""
+        """Get the elapsed simulated time in seconds, so turbo speeds report race time"""
         if self.timer_reset or (not self.started and not self.start_time):
             return 0
         elif self.start_time:
-            return round((self.end_time if self.end_time else time.time()) - self.start_time, 1)
+            return round(self.get_simulated_time(), 1)
         else:
             return 0
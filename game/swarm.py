@@ -0,0 +1,395 @@
+# ==========================================
+# GHOST SWARM (STRUCT OF ARRAYS)
+# ==========================================
+from array import array
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the swarm falls back to plain array loops
+    np = None
+
+from game.flowfield import FlowField
+from game.map import GameMap
+
+UNREACHED = -1
+
+
+class DistanceField:
+    """BFS distances from one goal cell to every open cell, shared by all ghosts chasing it.
+    
+    A single edited cell is repaired in place by close() and open(), touching
+    only the cells whose distance changes.
+    """
+    def __init__(self, game_map: GameMap, goal: Tuple[int, int]):
+        self.goal = goal
+        self.version = game_map.version
+        self.cols = cols = game_map.cols
+        self.size = size = game_map.rows * cols
+        cells = game_map.cells
+        
+        # distances[i] is the step count to the goal, next_hop[i] the neighbour one step closer
+        self.distances = array('i', [UNREACHED]) * size
+        self.next_hop = array('i', [UNREACHED]) * size
+        
+        start = goal[1] * cols + goal[0]
+        if not game_map.is_valid_position(*goal):
+            return
+        self.distances[start] = 0
+        self.next_hop[start] = start
+        queue = [start]
+        distances, next_hop = self.distances, self.next_hop
+        for cell in queue:
+            d = distances[cell] + 1
+            x = cell % cols
+            for neighbor in (cell - 1 if x > 0 else -1, cell + 1 if x < cols - 1 else -1,
+                             cell - cols, cell + cols):
+                if 0 <= neighbor < size and cells[neighbor] == 0 and distances[neighbor] == UNREACHED:
+                    distances[neighbor] = d
+                    next_hop[neighbor] = cell
+                    queue.append(neighbor)
+    
+    def _neighbors(self, cell: int) -> Tuple[int, int, int, int]:
+        """Left, right, up and down neighbours of a cell, -1 off the map"""
+        cols = self.cols
+        x = cell % cols
+        down = cell + cols
+        return (cell - 1 if x > 0 else -1, cell + 1 if x < cols - 1 else -1, cell - cols,
+                down if down < self.size else -1)
+    
+    def close(self, cells, cell: int) -> None:
+        """Repair the field after cell became a wall.
+        
+        Only the cells whose next hops led through the wall lose their
+        distance; they are refilled from their neighbours outside that subtree,
+        whose distances a new wall cannot change.
+        """
+        distances, next_hop = self.distances, self.next_hop
+        if distances[cell] == UNREACHED:
+            return
+        orphans = [cell]
+        distances[cell] = next_hop[cell] = UNREACHED
+        for orphan in orphans:
+            for neighbor in self._neighbors(orphan):
+                if neighbor >= 0 and next_hop[neighbor] == orphan:
+                    distances[neighbor] = next_hop[neighbor] = UNREACHED
+                    orphans.append(neighbor)
+        
+        heap = []
+        for orphan in orphans:
+            if cells[orphan] == 0:
+                for neighbor in self._neighbors(orphan):
+                    if neighbor >= 0 and distances[neighbor] != UNREACHED:
+                        heap.append((distances[neighbor] + 1, orphan, neighbor))
+        heapq.heapify(heap)
+        while heap:
+            d, cell, via = heapq.heappop(heap)
+            if distances[cell] != UNREACHED:
+                continue
+            distances[cell] = d
+            next_hop[cell] = via
+            for neighbor in self._neighbors(cell):
+                if neighbor >= 0 and cells[neighbor] == 0 and distances[neighbor] == UNREACHED:
+                    heapq.heappush(heap, (d + 1, neighbor, cell))
+    
+    def open(self, cells, cell: int) -> None:
+        """Repair the field after cell became a path, spreading only the distances it shortens"""
+        distances, next_hop = self.distances, self.next_hop
+        if cell == self.goal[1] * self.cols + self.goal[0]:
+            distances[cell] = 0
+            next_hop[cell] = cell
+        else:
+            reached = [(distances[n], n) for n in self._neighbors(cell) if n >= 0 and distances[n] != UNREACHED]
+            if not reached:
+                return
+            d, via = min(reached)
+            distances[cell] = d + 1
+            next_hop[cell] = via
+        queue = [cell]
+        for cell in queue:
+            d = distances[cell] + 1
+            for neighbor in self._neighbors(cell):
+                if neighbor >= 0 and cells[neighbor] == 0 and (distances[neighbor] == UNREACHED
+                                                                or distances[neighbor] > d):
+                    distances[neighbor] = d
+                    next_hop[neighbor] = cell
+                    queue.append(neighbor)
+    
+    def path_from(self, start: int) -> array:
+        """Cells from start to the goal inclusive, as flat indices"""
+        if self.distances[start] == UNREACHED:
+            return array('i')
+        path = array('i', [start])
+        cell = start
+        while self.distances[cell]:
+            cell = self.next_hop[cell]
+            path.append(cell)
+        return path
+
+
+class GhostSwarm:
+    """Thousands of ghosts stored as flat arrays and advanced in bulk.
+    
+    Ghost i lives at flat cell index positions[i] and either follows the packed
+    path path_cells[path_cursor[i]:path_end[i]] (step) or a shared flow field
+    (follow); finish_ticks[i] is -1 until it arrives.
+    """
+    # Rerouting compacts path_cells once this share of it holds abandoned path cells
+    COMPACT_RATIO = 0.5
+    
+    def __init__(self, game_map: GameMap):
+        self.game_map = game_map
+        self.clear()
+        game_map.subscribe(self._on_change)
+    
+    def __len__(self) -> int:
+        return len(self.positions)
+    
+    def clear(self) -> None:
+        """Remove every ghost and forget the shared fields"""
+        self.positions = array('i')
+        self.previous_positions = array('i')
+        self.goals = array('i')
+        self.finish_ticks = array('i')
+        self.path_cells = array('i')
+        self.path_cursor = array('i')
+        self.path_end = array('i')
+        self.fields: Dict[int, DistanceField] = {}
+        self.remaining = 0
+        self._visits: Optional[Dict[int, List[int]]] = None  # Cell -> ghosts whose path was written through it
+        self._abandoned = 0
+    
+    def _on_change(self, cells: Optional[List[Tuple[int, int]]]) -> None:
+        """Map listener: repair the distance fields around edited cells, or drop them for a new map"""
+        game_map = self.game_map
+        if cells is None:
+            self.fields.clear()
+            return
+        for field in self.fields.values():
+            if field.version + len(cells) != game_map.version:
+                continue  # Missed an edit; field_for() rebuilds it
+            for x, y in cells:
+                cell = y * field.cols + x
+                if game_map.cells[cell]:
+                    field.close(game_map.cells, cell)
+                elif field.distances[cell] == UNREACHED:
+                    field.open(game_map.cells, cell)
+            field.version = game_map.version
+    
+    def add(self, start: Tuple[int, int], goal: Tuple[int, int]) -> int:
+        """Add a ghost, returning its index; call plan() before stepping"""
+        cols = self.game_map.cols
+        self.positions.append(start[1] * cols + start[0])
+        self.previous_positions.append(self.positions[-1])
+        self.goals.append(goal[1] * cols + goal[0])
+        self.finish_ticks.append(-1)
+        self.path_cursor.append(0)
+        self.path_end.append(0)
+        self.remaining += 1
+        return len(self.positions) - 1
+    
+    def field_for(self, goal: int) -> DistanceField:
+        """Distance field for a goal cell, rebuilt when the map changes"""
+        field = self.fields.get(goal)
+        if field is None or field.version != self.game_map.version:
+            cols = self.game_map.cols
+            field = DistanceField(self.game_map, (goal % cols, goal // cols))
+            self.fields[goal] = field
+        return field
+    
+    def plan(self) -> None:
+        """Pack a path for every ghost, sharing one distance field per goal"""
+        self.path_cells = array('i')
+        self._visits = None
+        self._abandoned = 0
+        by_goal: Dict[int, List[int]] = {}
+        for ghost, goal in enumerate(self.goals):
+            by_goal.setdefault(goal, []).append(ghost)
+        
+        for goal, ghosts in by_goal.items():
+            field = self.field_for(goal)
+            if np is not None:
+                self._pack_vectorized(field, ghosts)
+            else:
+                for ghost in ghosts:
+                    path = field.path_from(self.positions[ghost])
+                    self.path_cursor[ghost] = len(self.path_cells)
+                    self.path_cells.extend(path)
+                    self.path_end[ghost] = len(self.path_cells)
+        
+        # Paths start at the ghost's own cell, so the first move is one past it
+        self.remaining = 0
+        for ghost in range(len(self.positions)):
+            if self.path_end[ghost] == self.path_cursor[ghost]:
+                continue  # Goal unreachable from here
+            self.path_cursor[ghost] += 1
+            if self.positions[ghost] == self.goals[ghost]:
+                self.finish_ticks[ghost] = 0
+            else:
+                self.finish_ticks[ghost] = -1
+                self.remaining += 1
+    
+    def reroute(self, cell: int) -> int:
+        """Give a fresh path to every running ghost whose remaining path crosses cell, return how many.
+        
+        Candidates come from an index of the ghosts each cell's paths were
+        written for, built on the first reroute after plan(), so an edit only
+        looks at the ghosts that went through the cell. A new path overwrites
+        the old slice when it fits and is appended otherwise, and path_cells
+        is compacted once abandoned cells make up COMPACT_RATIO of it.
+        """
+        if self._visits is None:
+            self._index_paths()
+        cells, cursor, end = self.path_cells, self.path_cursor, self.path_end
+        rerouted = 0
+        for ghost in set(self._visits.pop(cell, ())):
+            if self.finish_ticks[ghost] >= 0 or cell not in cells[cursor[ghost]:end[ghost]]:
+                continue
+            path = self.field_for(self.goals[ghost]).path_from(self.positions[ghost])[1:]  # Skip the ghost's own cell
+            self._abandoned += end[ghost] - cursor[ghost]
+            if len(path) > end[ghost] - cursor[ghost]:
+                cursor[ghost] = len(cells)
+                cells.extend(path)
+            else:
+                cells[cursor[ghost]:cursor[ghost] + len(path)] = path
+            end[ghost] = cursor[ghost] + len(path)
+            for step in path:
+                self._visits.setdefault(step, []).append(ghost)
+            if not path:
+                self.remaining -= 1  # Cut off from its goal, like an unreachable ghost in plan()
+            rerouted += 1
+        if self._abandoned > self.COMPACT_RATIO * len(cells):
+            self._compact()
+        return rerouted
+    
+    def _index_paths(self) -> None:
+        """Record which running ghosts' remaining paths go through each cell"""
+        visits: Dict[int, List[int]] = {}
+        cells, cursor, end = self.path_cells, self.path_cursor, self.path_end
+        for ghost in range(len(self.positions)):
+            if self.finish_ticks[ghost] < 0:
+                for cell in cells[cursor[ghost]:end[ghost]]:
+                    visits.setdefault(cell, []).append(ghost)
+        self._visits = visits
+    
+    def _compact(self) -> None:
+        """Copy the running ghosts' remaining paths into a fresh path_cells, dropping everything else"""
+        cells, cursor, end = self.path_cells, self.path_cursor, self.path_end
+        packed = array('i')
+        for ghost in range(len(self.positions)):
+            start = len(packed)
+            if self.finish_ticks[ghost] < 0:
+                packed.extend(cells[cursor[ghost]:end[ghost]])
+            cursor[ghost], end[ghost] = start, len(packed)
+        self.path_cells = packed
+        self._visits = None
+        self._abandoned = 0
+    
+    def _pack_vectorized(self, field: DistanceField, ghosts: List[int]) -> None:
+        """Walk every ghost down the field in lockstep, writing their paths side by side"""
+        ghost_ids = np.array(ghosts, dtype=np.int64)
+        current = np.frombuffer(self.positions, dtype=np.int32)[ghost_ids].astype(np.int64)
+        distances = np.frombuffer(field.distances, dtype=np.int32)
+        next_hop = np.frombuffer(field.next_hop, dtype=np.int32)
+        
+        # Unreachable ghosts get an empty path
+        lengths = np.where(distances[current] >= 0, distances[current] + 1, 0)
+        offsets = len(self.path_cells) + np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        packed = np.empty(int(lengths.sum()), dtype=np.int32)
+        base = len(self.path_cells)
+        for step in range(int(lengths.max(initial=0))):
+            active = lengths > step
+            packed[offsets[active] - base + step] = current[active]
+            current[active] = next_hop[current[active]]
+        
+        self.path_cells.frombytes(packed.tobytes())
+        for ghost, offset, length in zip(ghosts, offsets.tolist(), lengths.tolist()):
+            self.path_cursor[ghost] = offset
+            self.path_end[ghost] = offset + length
+    
+    def step(self, tick: int) -> int:
+        """Advance every unfinished ghost one cell, return how many are still running"""
+        self.previous_positions[:] = self.positions
+        if np is not None:
+            self._step_vectorized(tick)
+        else:
+            positions, cursor, end, finish = self.positions, self.path_cursor, self.path_end, self.finish_ticks
+            cells, goals = self.path_cells, self.goals
+            for ghost in range(len(positions)):
+                if finish[ghost] >= 0 or cursor[ghost] >= end[ghost]:
+                    continue
+                positions[ghost] = cells[cursor[ghost]]
+                cursor[ghost] += 1
+                if positions[ghost] == goals[ghost]:
+                    finish[ghost] = tick
+                    self.remaining -= 1
+        return self.remaining
+    
+    def _step_vectorized(self, tick: int) -> None:
+        """NumPy version of step(), operating on views of the same arrays"""
+        positions = np.frombuffer(self.positions, dtype=np.int32)
+        cursor = np.frombuffer(self.path_cursor, dtype=np.int32)
+        end = np.frombuffer(self.path_end, dtype=np.int32)
+        finish = np.frombuffer(self.finish_ticks, dtype=np.int32)
+        cells = np.frombuffer(self.path_cells, dtype=np.int32)
+        
+        moving = (finish < 0) & (cursor < end)
+        positions[moving] = cells[cursor[moving]]
+        cursor[moving] += 1
+        arrived = moving & (positions == np.frombuffer(self.goals, dtype=np.int32))
+        finish[arrived] = tick
+        self.remaining -= int(arrived.sum())
+    
+    def follow(self, field: FlowField, tick: int) -> int:
+        """Move every unfinished ghost one cell along a flow field, return how many are still running.
+        
+        The field may predate a wall edit while it is rebuilt in slices; ghosts
+        whose next cell has become a wall wait in place instead of entering it.
+        """
+        self.previous_positions[:] = self.positions
+        if np is not None:
+            positions = np.frombuffer(self.positions, dtype=np.int32)
+            finish = np.frombuffer(self.finish_ticks, dtype=np.int32)
+            distances = np.frombuffer(field.distances, dtype=np.int32)
+            packed = np.frombuffer(field.directions, dtype=np.uint8)
+            steps = np.array((-1, 1, -self.game_map.cols, self.game_map.cols), dtype=np.int32)
+            
+            walls = np.frombuffer(self.game_map.cells, dtype=np.uint8)
+            
+            moving = (finish < 0) & (distances[positions] > 0)
+            cells = positions[moving]
+            directions = (packed[cells >> 2] >> ((cells & 3) << 1)) & 3
+            targets = cells + steps[directions]
+            # A cell walled since the field was built holds its ghosts until the rebuilt field routes around it
+            positions[moving] = np.where(walls[targets] == 0, targets, cells)
+            arrived = moving & (distances[positions] == 0)
+            finish[arrived] = tick
+            self.remaining = int(((finish < 0) & (distances[positions] > 0)).sum())
+        else:
+            positions, finish, distances = self.positions, self.finish_ticks, field.distances
+            walls = self.game_map.cells
+            self.remaining = 0
+            for ghost in range(len(positions)):
+                if finish[ghost] >= 0 or distances[positions[ghost]] <= 0:
+                    continue
+                target = field.next_cell(positions[ghost])
+                if walls[target]:
+                    self.remaining += 1  # Stalled at a new wall until the rebuilt field arrives
+                    continue
+                positions[ghost] = target
+                if distances[positions[ghost]] == 0:
+                    finish[ghost] = tick
+                else:
+                    self.remaining += 1
+        return self.remaining
+    
+    def coordinates(self, ghost: int, previous: bool = False) -> Tuple[int, int]:
+        """(x, y) of one ghost, now or at the previous tick"""
+        cell = (self.previous_positions if previous else self.positions)[ghost]
+        return cell % self.game_map.cols, cell // self.game_map.cols
+    
+    def finish_tick(self, ghost: int) -> Optional[int]:
+        """Tick on which a ghost reached its goal, or None"""
+        tick = self.finish_ticks[ghost]
+        return tick if tick >= 0 else None
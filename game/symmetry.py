@@ -0,0 +1,183 @@
+# ==========================================
+# RECTANGULAR SYMMETRY REDUCTION
+# ==========================================
+import heapq
+from array import array
+from typing import Dict, List, Optional, Tuple, Union
+
+from game.content_cache import ContentCache
+from game.map import GameMap, MapSnapshot
+
+INFINITY = float('inf')
+
+
+class RectangleDecomposition:
+    """Open space split into empty rectangles whose interiors searches never expand (RSR).
+    
+    Inside an empty rectangle every monotone route between two cells costs the
+    same, so only perimeter cells are kept as nodes. Each keeps its grid
+    neighbours on a perimeter and one macro-edge straight across its rectangle;
+    that is enough to keep every shortest path while pruning the symmetric
+    interior ones.
+    """
+    _cache: "ContentCache[RectangleDecomposition]" = ContentCache()
+    
+    def __init__(self, game_map: Union[GameMap, MapSnapshot]):
+        self.rows = game_map.rows
+        self.cols = game_map.cols
+        size = self.rows * self.cols
+        self.rect_of = array('i', [-1]) * size
+        self.rects: List[Tuple[int, int, int, int]] = []  # (x0, y0, x1, y1), inclusive
+        self.perimeter = bytearray(size)
+        self.edges: Dict[int, List[Tuple[int, int]]] = {}
+        self._decompose(game_map.cells)
+        self._link()
+    
+    @classmethod
+    def for_map(cls, game_map: Union[GameMap, MapSnapshot]) -> "RectangleDecomposition":
+        """Cached decomposition for the map's current contents"""
+        return cls._cache.get(game_map, lambda: cls(game_map))
+    
+    def _decompose(self, cells) -> None:
+        """Greedily cover open cells with maximal empty rectangles in row-major order"""
+        cols, rows = self.cols, self.rows
+        rect_of = self.rect_of
+        
+        def free(x: int, y: int) -> bool:
+            cell = y * cols + x
+            return cells[cell] == 0 and rect_of[cell] == -1
+        
+        def grow(x0: int, y0: int, wide_first: bool) -> Tuple[int, int]:
+            """Far corner when growing along one axis first, then the other"""
+            if wide_first:
+                x1 = x0
+                while x1 + 1 < cols and free(x1 + 1, y0):
+                    x1 += 1
+                y1 = y0
+                while y1 + 1 < rows and all(free(x, y1 + 1) for x in range(x0, x1 + 1)):
+                    y1 += 1
+            else:
+                y1 = y0
+                while y1 + 1 < rows and free(x0, y1 + 1):
+                    y1 += 1
+                x1 = x0
+                while x1 + 1 < cols and all(free(x1 + 1, y) for y in range(y0, y1 + 1)):
+                    x1 += 1
+            return x1, y1
+        
+        for y0 in range(rows):
+            for x0 in range(cols):
+                if not free(x0, y0):
+                    continue
+                corners = [grow(x0, y0, True), grow(x0, y0, False)]
+                x1, y1 = max(corners, key=lambda c: (c[0] - x0 + 1) * (c[1] - y0 + 1))
+                index = len(self.rects)
+                self.rects.append((x0, y0, x1, y1))
+                for y in range(y0, y1 + 1):
+                    for x in range(x0, x1 + 1):
+                        cell = y * cols + x
+                        rect_of[cell] = index
+                        if x in (x0, x1) or y in (y0, y1):
+                            self.perimeter[cell] = 1
+    
+    def _link(self) -> None:
+        """Grid edges between perimeter cells, plus one macro-edge across each rectangle"""
+        cols = self.cols
+        for cell in range(len(self.perimeter)):
+            if not self.perimeter[cell]:
+                continue
+            x, y = cell % cols, cell // cols
+            x0, y0, x1, y1 = self.rects[self.rect_of[cell]]
+            edges = []
+            for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if 0 <= nx < cols and 0 <= ny < self.rows and self.perimeter[ny * cols + nx]:
+                    edges.append((ny * cols + nx, 1))
+            # Macro-edges from the middle of a side to the opposite side
+            if y0 < y < y1 and x1 - x0 >= 2:
+                if x == x0:
+                    edges.append((y * cols + x1, x1 - x0))
+                elif x == x1:
+                    edges.append((y * cols + x0, x1 - x0))
+            if x0 < x < x1 and y1 - y0 >= 2:
+                if y == y0:
+                    edges.append((y1 * cols + x, y1 - y0))
+                elif y == y1:
+                    edges.append((y0 * cols + x, y1 - y0))
+            self.edges[cell] = edges
+    
+    @property
+    def pruned(self) -> int:
+        """Open cells that searches never expand"""
+        return sum(1 for cell, rect in enumerate(self.rect_of) if rect != -1 and not self.perimeter[cell])
+    
+    def _manhattan(self, a: int, b: int) -> int:
+        cols = self.cols
+        return abs(a % cols - b % cols) + abs(a // cols - b // cols)
+    
+    def _rect_perimeter(self, rect: int) -> List[int]:
+        """Perimeter cells of one rectangle"""
+        x0, y0, x1, y1 = self.rects[rect]
+        cols = self.cols
+        return [y * cols + x for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)
+                if x in (x0, x1) or y in (y0, y1)]
+    
+    def search(self, start: int, goal: int, use_heuristic: bool = True) -> Tuple[List[int], int]:
+        """Shortest path of flat cells and the number of expanded nodes, by A* or Dijkstra"""
+        if self.rect_of[start] == -1 or self.rect_of[goal] == -1:
+            return [], 0
+        goal_rect = self.rect_of[goal]
+        if self.rect_of[start] == goal_rect:
+            return self._straighten([start, goal]), 0
+        
+        def estimate(cell: int) -> int:
+            return self._manhattan(cell, goal) if use_heuristic else 0
+        
+        distances: Dict[int, int] = {start: 0}
+        parents: Dict[int, Optional[int]] = {start: None}
+        # Ties go to the deeper node, which heads straight on instead of widening the frontier
+        queue = [(estimate(start), 0, start)]
+        closed = set()
+        expanded = 0
+        while queue:
+            _, depth, cell = heapq.heappop(queue)
+            d = -depth
+            if cell == goal:
+                waypoints = []
+                while cell is not None:
+                    waypoints.append(cell)
+                    cell = parents[cell]
+                return self._straighten(waypoints[::-1]), expanded
+            if cell in closed:
+                continue
+            closed.add(cell)
+            expanded += 1
+            
+            if cell == start and not self.perimeter[start]:
+                # An interior start reaches its own perimeter in a straight-ish line
+                successors = [(p, self._manhattan(start, p)) for p in self._rect_perimeter(self.rect_of[start])]
+            else:
+                successors = list(self.edges[cell])
+            if self.rect_of[cell] == goal_rect:
+                successors.append((goal, self._manhattan(cell, goal)))
+            for neighbor, cost in successors:
+                if neighbor in closed or d + cost >= distances.get(neighbor, INFINITY):
+                    continue
+                distances[neighbor] = d + cost
+                parents[neighbor] = cell
+                heapq.heappush(queue, (d + cost + estimate(neighbor), -(d + cost), neighbor))
+        return [], expanded
+    
+    def _straighten(self, waypoints: List[int]) -> List[int]:
+        """Expand waypoints inside shared rectangles into cells, horizontally then vertically"""
+        cols = self.cols
+        cells = [waypoints[0]]
+        for a, b in zip(waypoints, waypoints[1:]):
+            x, y = a % cols, a // cols
+            bx, by = b % cols, b // cols
+            while x != bx:
+                x += 1 if bx > x else -1
+                cells.append(y * cols + x)
+            while y != by:
+                y += 1 if by > y else -1
+                cells.append(y * cols + x)
+        return cells
@@ -0,0 +1,157 @@
+# ==========================================
+# MULTI-CHERRY TOUR PLANNING
+# ==========================================
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+from game.map import GameMap
+from game.swarm import UNREACHED, DistanceField
+
+INFINITY = float('inf')
+
+# Largest cherry count solved exactly; above it the 2-opt/Or-opt heuristic takes over
+HELD_KARP_LIMIT = 12
+
+
+class DistanceMatrix:
+    """Pairwise cherry distances plus a distance field per cherry, from K BFS passes"""
+    def __init__(self, game_map: GameMap, cherries: Sequence[Tuple[int, int]]):
+        self.cherries = [tuple(c) for c in cherries]
+        self.cols = game_map.cols
+        # One BFS per cherry also gives the distance from any ghost to that cherry
+        self.fields = [DistanceField(game_map, cherry) for cherry in self.cherries]
+        self.matrix = [[self._lookup(field, other) for other in self.cherries] for field in self.fields]
+    
+    def _lookup(self, field: DistanceField, position: Tuple[int, int]) -> float:
+        distance = field.distances[position[1] * self.cols + position[0]]
+        return INFINITY if distance == UNREACHED else distance
+    
+    def from_position(self, position: Tuple[int, int]) -> List[float]:
+        """Distance from an arbitrary cell (a ghost) to every cherry"""
+        return [self._lookup(field, position) for field in self.fields]
+
+
+class TourPlanner:
+    """Orders the cherries each ghost visits, caching matrices per map version and cherry set"""
+    def __init__(self, game_map: GameMap, cache_size: int = 8):
+        self.game_map = game_map
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[tuple, DistanceMatrix]" = OrderedDict()
+        game_map.subscribe(self.invalidate)
+    
+    def invalidate(self, cells: Optional[List[Tuple[int, int]]] = None) -> None:
+        """Forget the matrices of the map as it was before a change"""
+        self.cache.clear()
+    
+    def matrix_for(self, cherries: Sequence[Tuple[int, int]]) -> DistanceMatrix:
+        """Distance matrix for a cherry set, reused until the map or the set changes"""
+        key = (self.game_map.version, tuple(tuple(c) for c in cherries))
+        matrix = self.cache.get(key)
+        if matrix is None:
+            matrix = DistanceMatrix(self.game_map, cherries)
+            self.cache[key] = matrix
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+        return matrix
+    
+    def plan_tour(self, start: Tuple[int, int], cherries: Sequence[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Shortest order in which a ghost at start should collect every cherry"""
+        if len(cherries) <= 1:
+            return [tuple(c) for c in cherries]
+        matrix = self.matrix_for(cherries)
+        start_costs = matrix.from_position(tuple(start))
+        if len(cherries) <= HELD_KARP_LIMIT:
+            order = held_karp(matrix.matrix, start_costs)
+        else:
+            order = improve_tour(matrix.matrix, start_costs, nearest_neighbor_tour(matrix.matrix, start_costs))
+        return [matrix.cherries[i] for i in order]
+
+
+def tour_length(matrix: List[List[float]], start_costs: List[float], order: Sequence[int]) -> float:
+    """Cost of an open tour that starts at the ghost and visits cherries in order"""
+    if not order:
+        return 0
+    total = start_costs[order[0]]
+    for a, b in zip(order, order[1:]):
+        total += matrix[a][b]
+    return total
+
+
+def held_karp(matrix: List[List[float]], start_costs: List[float]) -> List[int]:
+    """Exact open-tour order by dynamic programming over subsets, O(2^K K^2)"""
+    count = len(start_costs)
+    full = (1 << count) - 1
+    # best[mask][last] = cost of visiting mask, ending at last
+    best = [[INFINITY] * count for _ in range(1 << count)]
+    parent = [[-1] * count for _ in range(1 << count)]
+    for i in range(count):
+        best[1 << i][i] = start_costs[i]
+    
+    for mask in range(1, full + 1):
+        row = best[mask]
+        for last in range(count):
+            cost = row[last]
+            if cost == INFINITY or not mask & (1 << last):
+                continue
+            for nxt in range(count):
+                if mask & (1 << nxt):
+                    continue
+                new_mask = mask | (1 << nxt)
+                new_cost = cost + matrix[last][nxt]
+                if new_cost < best[new_mask][nxt]:
+                    best[new_mask][nxt] = new_cost
+                    parent[new_mask][nxt] = last
+    
+    last = min(range(count), key=lambda i: best[full][i])
+    order = []
+    mask = full
+    while last != -1:
+        order.append(last)
+        last, mask = parent[mask][last], mask & ~(1 << last)
+    return order[::-1]
+
+
+def nearest_neighbor_tour(matrix: List[List[float]], start_costs: List[float]) -> List[int]:
+    """Greedy starting tour: always head for the closest unvisited cherry"""
+    remaining = set(range(len(start_costs)))
+    current = min(remaining, key=lambda i: start_costs[i])
+    order = [current]
+    remaining.remove(current)
+    while remaining:
+        current = min(remaining, key=lambda i: matrix[current][i])
+        order.append(current)
+        remaining.remove(current)
+    return order
+
+
+def improve_tour(matrix: List[List[float]], start_costs: List[float], order: List[int]) -> List[int]:
+    """Apply 2-opt segment reversals and Or-opt segment moves until neither helps"""
+    best = tour_length(matrix, start_costs, order)
+    improved = True
+    while improved:
+        improved = False
+        
+        # 2-opt: reverse order[i:j]
+        for i in range(len(order) - 1):
+            for j in range(i + 2, len(order) + 1):
+                candidate = order[:i] + order[i:j][::-1] + order[j:]
+                length = tour_length(matrix, start_costs, candidate)
+                if length < best:
+                    order, best, improved = candidate, length, True
+        
+        # Or-opt: move a run of 1-3 cherries elsewhere in the tour
+        for run in (1, 2, 3):
+            for i in range(len(order) - run + 1):
+                segment = order[i:i + run]
+                rest = order[:i] + order[i + run:]
+                for j in range(len(rest) + 1):
+                    if j == i:
+                        continue
+                    candidate = rest[:j] + segment + rest[j:]
+                    length = tour_length(matrix, start_costs, candidate)
+                    if length < best:
+                        order, best, improved = candidate, length, True
+                        break
+    return order
@@ -0,0 +1,87 @@
+# ==========================================
+# REUSABLE SEARCH WORKSPACES
+# ==========================================
+import threading
+from array import array
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from game.layout import CellLayout
+from game.monotone_queues import BucketQueue, RadixHeap
+
+
+class SearchWorkspace:
+    """Scratch arrays for searches on maps of one size, reset in O(1) by a generation stamp.
+    
+    A cell's distance and parent only count while seen[cell] equals the
+    current generation, so starting a new query bumps the generation instead
+    of clearing anything. The arrays are only wiped when the 32-bit counter
+    wraps around.
+    """
+    def __init__(self, size: int):
+        self.size = size
+        self.seen = array('I', [0]) * size      # Generation in which a cell was reached
+        self.closed = array('I', [0]) * size    # Generation in which a cell was expanded
+        self.distance = array('i', [0]) * size
+        self.parent = array('i', [-1]) * size
+        self.queue: deque = deque()
+        self.stack: List[int] = []
+        self.heap: List[Tuple[int, int]] = []
+        self._buckets: Optional[BucketQueue] = None
+        self._radix: Optional[RadixHeap] = None
+        self.generation = 0
+    
+    def begin(self) -> int:
+        """Start a new query and return its generation"""
+        self.generation += 1
+        if self.generation > 0xFFFFFFFF:
+            self.seen = array('I', [0]) * self.size
+            self.closed = array('I', [0]) * self.size
+            self.generation = 1
+        self.queue.clear()
+        self.stack.clear()
+        self.heap.clear()
+        return self.generation
+    
+    def bucket_queue(self, max_weight: int) -> BucketQueue:
+        """An empty bucket queue for step costs up to max_weight, reused while that stays the same"""
+        if self._buckets is None or len(self._buckets.buckets) != max_weight + 1:
+            self._buckets = BucketQueue(max_weight)
+        else:
+            self._buckets.clear()
+        return self._buckets
+    
+    def radix_heap(self) -> RadixHeap:
+        """An empty radix heap"""
+        if self._radix is None:
+            self._radix = RadixHeap()
+        else:
+            self._radix.clear()
+        return self._radix
+    
+    def path_to(self, cell: int, layout: CellLayout) -> List[Tuple[int, int]]:
+        """(x, y) cells from the query's source to cell, following parents"""
+        path = []
+        parent, position = self.parent, layout.position
+        while cell != -1:
+            path.append(position(cell))
+            cell = parent[cell]
+        path.reverse()
+        return path
+
+
+class WorkspacePool:
+    """One workspace per thread and map size, so concurrent searches never share scratch arrays"""
+    def __init__(self):
+        self._local = threading.local()
+    
+    def acquire(self, size: int) -> SearchWorkspace:
+        """This thread's workspace for maps of the given number of cells"""
+        spaces: Dict[int, SearchWorkspace] = getattr(self._local, "spaces", None)
+        if spaces is None:
+            spaces = self._local.spaces = {}
+        workspace = spaces.get(size)
+        if workspace is None:
+            spaces.clear()  # Maps only change size when a new one is loaded
+            workspace = spaces[size] = SearchWorkspace(size)
+        return workspace
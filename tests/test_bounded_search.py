@@ -0,0 +1,57 @@
+import unittest
+
+from benchmarks.maps import open_map
+from game.map import GameMap
+from game.pathfinding import BFSAlgorithm, IDAStarAlgorithm, SMAStarAlgorithm
+
+
+class SMAStarTest(unittest.TestCase):
+    def test_unreachable_goal_returns_empty_path(self):
+        # (6, 10) is walled in on all four sides
+        game_map = open_map(12, 0.3, seed=1)
+        self.assertEqual(SMAStarAlgorithm(game_map).find_path((6, 10), (4, 5)), [])
+    
+    def test_goal_in_another_component_returns_empty_path(self):
+        game_map = open_map(12, 0.3, seed=1)
+        for x in range(1, 11):
+            game_map.set_cell(x, 6, 1)
+        search = SMAStarAlgorithm(game_map)
+        self.assertEqual(search.find_path((2, 3), (2, 8)), [])
+        self.assertFalse(search.stats.gave_up)
+    
+    def test_matches_bfs_length(self):
+        game_map = open_map(20, 0.3, seed=2)
+        for start, goal in [((1, 2), (18, 2)), ((1, 9), (18, 15)), ((1, 18), (18, 9))]:
+            expected = BFSAlgorithm(game_map).find_path(start, goal)
+            self.assertEqual(len(SMAStarAlgorithm(game_map).find_path(start, goal)), len(expected))
+
+
+class IDAStarTest(unittest.TestCase):
+    def test_exhausted_budget_is_reported_as_giving_up(self):
+        game_map = GameMap("map.txt")
+        search = IDAStarAlgorithm(game_map, max_expansions=1000)
+        self.assertEqual(search.find_path((1, 1), (30, 30)), [])
+        self.assertTrue(search.stats.gave_up)
+    
+    def test_tiny_budget_on_short_route_is_reported_as_giving_up(self):
+        game_map = GameMap("map.txt")
+        for budget in (1, 2, 3, 5, 10):
+            search = IDAStarAlgorithm(game_map, max_expansions=budget)
+            self.assertEqual(search.find_path((15, 16), (1, 1)), [])
+            self.assertTrue(search.stats.gave_up)
+        self.assertTrue(IDAStarAlgorithm(game_map, max_expansions=100).find_path((15, 16), (1, 1)))
+    
+    def test_unreachable_goal_is_not_giving_up(self):
+        game_map = open_map(12, 0.3, seed=1)
+        search = IDAStarAlgorithm(game_map)
+        self.assertEqual(search.find_path((6, 10), (4, 5)), [])
+        self.assertFalse(search.stats.gave_up)
+    
+    def test_short_route_matches_bfs_length(self):
+        game_map = open_map(20, 0.3, seed=2)
+        expected = BFSAlgorithm(game_map).find_path((1, 2), (18, 2))
+        self.assertEqual(len(IDAStarAlgorithm(game_map).find_path((1, 2), (18, 2))), len(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import random
+import unittest
+
+from benchmarks.maps import maze_map, open_map
+from game.connectivity import DynamicConnectivity
+from game.map import GameMap
+
+
+def components(game_map):
+    """Component id of every open cell by plain BFS, None for walls"""
+    cols, size = game_map.cols, game_map.rows * game_map.cols
+    ids = [None] * size
+    for first in range(size):
+        if game_map.cells[first] or ids[first] is not None:
+            continue
+        ids[first] = first
+        queue = [first]
+        for cell in queue:
+            x = cell % cols
+            for neighbor in (cell - 1 if x > 0 else -1, cell + 1 if x < cols - 1 else -1, cell - cols, cell + cols):
+                if 0 <= neighbor < size and not game_map.cells[neighbor] and ids[neighbor] is None:
+                    ids[neighbor] = first
+                    queue.append(neighbor)
+    return ids
+
+
+class DynamicConnectivityTest(unittest.TestCase):
+    def assert_matches_bfs(self, game_map, index, rng):
+        cols = game_map.cols
+        ids = components(game_map)
+        open_cells = [cell for cell, value in enumerate(ids) if value is not None]
+        for cell in range(len(ids)):
+            position = (cell % cols, cell // cols)
+            sources = [(other % cols, other // cols) for other in rng.sample(open_cells, min(3, len(open_cells)))]
+            expected = ids[cell] is not None and all(ids[other[1] * cols + other[0]] == ids[cell] for other in sources)
+            self.assertEqual(index.reachable_from_all(position, sources), expected)
+            self.assertEqual(index.component_size(position), ids.count(ids[cell]) if ids[cell] is not None else 0)
+    
+    def test_random_toggles_match_bfs(self):
+        rng = random.Random(3)
+        for game_map in (open_map(14, 0.35, seed=1), maze_map(15, seed=2)):
+            index = DynamicConnectivity(game_map)
+            for _ in range(60):
+                x, y = rng.randrange(1, game_map.cols - 1), rng.randrange(1, game_map.rows - 1)
+                game_map.set_cell(x, y, 0 if game_map.cell_value(x, y) == 1 else 1)
+                self.assert_matches_bfs(game_map, index, rng)
+    
+    def test_split_and_merge_a_corridor(self):
+        game_map = GameMap("<corridor>", [[1] * 7, [1, 0, 0, 0, 0, 0, 1], [1] * 7])
+        index = DynamicConnectivity(game_map)
+        self.assertTrue(index.is_reachable((1, 1), (5, 1)))
+        game_map.set_cell(3, 1, 1)
+        self.assertFalse(index.is_reachable((1, 1), (5, 1)))
+        self.assertEqual(index.component_size((1, 1)), 2)
+        self.assertEqual(index.component_size((5, 1)), 2)
+        game_map.set_cell(3, 1, 0)
+        self.assertTrue(index.is_reachable((1, 1), (5, 1)))
+        self.assertEqual(index.component_size((3, 1)), 5)
+    
+    def test_toggling_a_cell_twice_restores_reachability(self):
+        rng = random.Random(4)
+        game_map = maze_map(15, seed=5)
+        index = DynamicConnectivity(game_map)
+        before = components(game_map)
+        for cell in rng.sample([cell for cell, value in enumerate(game_map.cells) if value == 0], 20):
+            x, y = cell % game_map.cols, cell // game_map.cols
+            game_map.set_cell(x, y, 1)
+            game_map.set_cell(x, y, 0)
+            self.assertEqual(components(game_map), before)
+            self.assert_matches_bfs(game_map, index, rng)
+
+
+if __name__ == "__main__":
+    unittest.main()
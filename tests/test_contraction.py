@@ -0,0 +1,30 @@
+import random
+import unittest
+
+from game.contraction import ContractionHierarchy, hierarchy_path
+from game.map import GameMap
+from game.pathfinding import BFSAlgorithm, ContractionAlgorithm
+
+
+class BundledHierarchyTest(unittest.TestCase):
+    def test_map_ch_still_matches_map_txt(self):
+        # Rebuild with `python -m game.contraction map.txt` after editing map.txt
+        game_map = GameMap("map.txt")
+        hierarchy = ContractionHierarchy.load(hierarchy_path(game_map.filename), game_map)
+        self.assertIsNotNone(hierarchy, "map.ch is stale or missing")
+        self.assertTrue(hierarchy.matches(game_map))
+    
+    def test_queries_match_bfs_path_lengths(self):
+        game_map = GameMap("map.txt")
+        query, bfs = ContractionAlgorithm(game_map), BFSAlgorithm(game_map)
+        free = [(x, y) for y in range(game_map.rows) for x in range(game_map.cols) if game_map.is_valid_position(x, y)]
+        rng = random.Random(4)
+        for _ in range(50):
+            start, goal = rng.sample(free, 2)
+            path = query.find_path(start, goal)
+            self.assertEqual(len(path), len(bfs.find_path(start, goal)))
+            self.assertTrue(all(abs(ax - bx) + abs(ay - by) == 1 for (ax, ay), (bx, by) in zip(path, path[1:])))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from game.cooperative import CooperativePlanner
+from game.entities import Ghost
+from game.map import GameMap
+from game.pathfinding import BFSAlgorithm
+
+
+def race(map_file, starts, goal, window=8, ticks=400):
+    """Race ghosts replanned the way the game does it, return each finish tick and the shared-cell count"""
+    game_map = GameMap(map_file)
+    planner = CooperativePlanner(game_map, window)
+    ghosts = [Ghost(str(i), "cyan", start, BFSAlgorithm(game_map)) for i, start in enumerate(starts)]
+    for ghost in ghosts:
+        ghost.targets = [goal]
+    finished, collisions = {}, 0
+    for tick in range(1, ticks + 1):
+        racing = [(index, ghost) for index, ghost in enumerate(ghosts) if index not in finished]
+        if not racing:
+            break
+        if tick % max(1, window // 2) == 0 or not all(ghost.path for _, ghost in racing):
+            plans = planner.plan([(index, tuple(ghost.position), goal) for index, ghost in racing], tick - 1,
+                                 {index: ghost.stalled for index, ghost in racing})
+            for index, ghost in racing:
+                ghost.path = plans[index]
+                ghost.paced = True
+        for index, ghost in racing:
+            ghost.move()
+            if ghost.reached_position(goal):
+                finished[index] = tick
+        # Finished ghosts all wait on the goal, so only the ones still racing count
+        occupied = [tuple(ghost.position) for index, ghost in enumerate(ghosts) if index not in finished]
+        collisions += len(occupied) - len(set(occupied))
+    return finished, collisions
+
+
+class CooperativeWeightedTest(unittest.TestCase):
+    STARTS = [(15, 16), (16, 17), (17, 16)]
+    
+    def test_no_shared_cells_on_weighted_terrain(self):
+        for goal in [(1, 1), (30, 30), (5, 25)]:
+            finished, collisions = race("weighted_map.txt", self.STARTS, goal)
+            self.assertEqual(len(finished), len(self.STARTS))
+            self.assertEqual(collisions, 0)
+    
+    def test_plans_spend_terrain_cost_as_reserved_waits(self):
+        game_map = GameMap("weighted_map.txt")
+        planner = CooperativePlanner(game_map, 64)
+        cols = game_map.cols
+        plan = planner.plan([(0, (15, 16), (1, 1))], 0)[0]
+        previous = (15, 16)
+        waits = 0
+        for step in plan:
+            if step == previous:
+                waits += 1
+            else:
+                self.assertGreaterEqual(waits, game_map.terrain_cost(*step) - 1)
+                waits = 0
+            previous = step
+        for tick, (x, y) in enumerate(plan, start=1):
+            self.assertEqual(planner.table.vertices[planner.table.vertex_key(y * cols + x, tick)], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import random
+import unittest
+
+from game.first_moves import FirstMoveDatabase
+from game.map import GameMap
+from game.pathfinding import BFSAlgorithm, FirstMoveAlgorithm
+
+
+class BundledDatabaseTest(unittest.TestCase):
+    def test_map_fmdb_still_matches_map_txt(self):
+        # Rebuild with `python -m game.first_moves map.txt` after editing map.txt
+        game_map = GameMap("map.txt")
+        self.assertIsNotNone(FirstMoveDatabase.for_map_file(game_map), "map.fmdb is stale or missing")
+        self.assertTrue(FirstMoveAlgorithm(game_map).answers_steps())
+    
+    def test_lookups_match_bfs_path_lengths(self):
+        game_map = GameMap("map.txt")
+        lookup, bfs = FirstMoveAlgorithm(game_map), BFSAlgorithm(game_map)
+        free = [(x, y) for y in range(game_map.rows) for x in range(game_map.cols) if game_map.is_valid_position(x, y)]
+        rng = random.Random(3)
+        for _ in range(50):
+            start, goal = rng.sample(free, 2)
+            self.assertEqual(len(lookup.find_path(start, goal)), len(bfs.find_path(start, goal)))
+    
+    def test_edited_map_falls_back_to_bfs(self):
+        game_map = GameMap("map.txt")
+        algorithm = FirstMoveAlgorithm(game_map)
+        path = algorithm.find_path((15, 16), (1, 1))
+        x, y = path[len(path) // 2]
+        game_map.set_cell(x, y, 1)
+        self.assertFalse(algorithm.answers_steps())
+        self.assertNotIn((x, y), algorithm.find_path((15, 16), (1, 1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
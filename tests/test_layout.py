@@ -0,0 +1,59 @@
+import random
+import unittest
+
+from game.layout import CellLayout, MortonLayout, RowMajorLayout
+from game.map import GameMap
+from game.pathfinding import AStarAlgorithm, BFSAlgorithm
+
+
+def random_map(cols, rows, seed):
+    rng = random.Random(seed)
+    return GameMap(f"<{cols}x{rows}>", [[1 if rng.random() < 0.3 else 0 for _ in range(cols)] for _ in range(rows)])
+
+
+class MortonLayoutTest(unittest.TestCase):
+    SHAPES = [(1, 1), (1, 37), (37, 1), (12, 12), (33, 70), (100, 7), (64, 64), (65, 33)]
+    
+    def test_matches_row_major_on_odd_sizes(self):
+        for cols, rows in self.SHAPES:
+            game_map = random_map(cols, rows, cols * rows)
+            morton, row = MortonLayout(game_map), RowMajorLayout(game_map)
+            indices = set()
+            for y in range(rows):
+                for x in range(cols):
+                    cell = morton.index(x, y)
+                    self.assertTrue(0 <= cell < morton.size)
+                    self.assertEqual(morton.position(cell), (x, y))
+                    self.assertEqual(morton.cells[cell], game_map.cells[y * cols + x])
+                    indices.add(cell)
+                    # Off the map is either -1 or a padding wall; on the map it is the same neighbour
+                    for expected, got in zip(row.neighbors(row.index(x, y)), morton.neighbors(cell)):
+                        if expected == -1:
+                            self.assertTrue(got == -1 or morton.cells[got] == 1)
+                            if got != -1:
+                                gx, gy = morton.position(got)
+                                self.assertTrue(gx >= cols or gy >= rows)
+                        else:
+                            self.assertEqual(morton.position(got), row.position(expected))
+            self.assertEqual(len(indices), cols * rows)
+            self.assertTrue(all(morton.cells[cell] == 1 for cell in range(morton.size) if cell not in indices))
+    
+    def test_padding_stays_within_an_eighth(self):
+        for cols, rows in self.SHAPES + [(1024, 1024), (4096, 16), (1000, 3)]:
+            layout = MortonLayout(GameMap(f"<{cols}x{rows}>", [[0] * cols for _ in range(rows)]))
+            self.assertLessEqual(8 * layout.size, 9 * cols * rows)
+    
+    def test_searches_agree_across_layouts(self):
+        game_map = random_map(33, 70, 1)
+        free = [(cell % 33, cell // 33) for cell, value in enumerate(game_map.cells) if value == 0]
+        rng = random.Random(2)
+        CellLayout.for_map(game_map, "morton")
+        for algorithm_class in (BFSAlgorithm, AStarAlgorithm):
+            for _ in range(10):
+                start, goal = rng.sample(free, 2)
+                self.assertEqual(len(algorithm_class(game_map, layout="morton").find_path(start, goal)),
+                                 len(algorithm_class(game_map).find_path(start, goal)))
+
+
+if __name__ == "__main__":
+    unittest.main()
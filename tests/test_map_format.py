@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+from game.map import GameMap, zobrist_hash
+from game.map_format import FORMAT_VERSION, HEADER, MAGIC, MapFile
+
+
+class BinaryMapRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.directory.cleanup()
+    
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+    
+    def test_bundled_maps_round_trip(self):
+        for source in ("map.txt", "weighted_map.txt"):
+            text = GameMap(source)
+            text.save_map(self.path("map.gcm"))
+            binary = GameMap(self.path("map.gcm"))
+            self.assertEqual((binary.rows, binary.cols), (text.rows, text.cols))
+            self.assertEqual(binary.cells, text.cells)
+            self.assertEqual(binary.costs, text.costs)
+            self.assertEqual(binary.zobrist, text.zobrist)
+            self.assertEqual(binary.zobrist, zobrist_hash(binary.rows, binary.cols, binary.cells, binary.costs))
+            self.assertEqual(binary.grid, text.grid)
+            with self.assertRaises(TypeError):
+                binary.grid[0][0] = 0  # Writes go through set_cell
+            
+            # Point queries read the mapped planes directly
+            with MapFile(self.path("map.gcm")) as map_file:
+                self.assertEqual(tuple(map(tuple, map_file.grid())), text.grid)
+                for y in range(text.rows):
+                    for x in range(text.cols):
+                        self.assertEqual(map_file.is_valid_position(x, y), text.is_valid_position(x, y))
+                        if text.is_valid_position(x, y):
+                            self.assertEqual(map_file.terrain_cost(x, y), text.terrain_cost(x, y))
+            
+            # And back to text without loss
+            binary.save_map(self.path("map.txt"))
+            self.assertEqual(GameMap(self.path("map.txt")).grid, text.grid)
+    
+    def write(self, data):
+        with open(self.path("broken.gcm"), "wb") as f:
+            f.write(data)
+        return self.path("broken.gcm")
+    
+    def test_truncated_file_is_rejected(self):
+        GameMap("weighted_map.txt").save_map(self.path("map.gcm"))
+        with open(self.path("map.gcm"), "rb") as f:
+            data = f.read()
+        for length in (HEADER.size - 1, HEADER.size, len(data) - 1):
+            with self.assertRaises(ValueError):
+                MapFile(self.write(data[:length]))
+        with self.assertRaises(ValueError):
+            MapFile(self.write(data + b"\0"))
+    
+    def test_wrong_magic_or_version_is_rejected(self):
+        GameMap("map.txt").save_map(self.path("map.gcm"))
+        with open(self.path("map.gcm"), "rb") as f:
+            data = f.read()
+        _, version, max_cost, rows, cols, zobrist = HEADER.unpack_from(data)
+        body = data[HEADER.size:]
+        with self.assertRaises(ValueError):
+            MapFile(self.write(HEADER.pack(b"XXXX", version, max_cost, rows, cols, zobrist) + body))
+        with self.assertRaises(ValueError):
+            MapFile(self.write(HEADER.pack(MAGIC, FORMAT_VERSION + 1, max_cost, rows, cols, zobrist) + body))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import sys
+import unittest
+
+from benchmarks.maps import open_map
+from game.entities import Ghost
+from game.map import GameMap
+from game.path_cache import PathCache
+from game.pathfinding import BFSAlgorithm, IDAStarAlgorithm
+
+
+class PathCacheTest(unittest.TestCase):
+    def test_repeated_query_is_a_hit(self):
+        game_map = GameMap("map.txt")
+        cache, bfs = PathCache(), BFSAlgorithm(game_map)
+        path = cache.find_path(bfs, (15, 16), (1, 1))
+        self.assertEqual(cache.find_path(bfs, (15, 16), (1, 1)), path)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+    
+    def test_lru_stays_within_byte_budget(self):
+        game_map = GameMap("map.txt")
+        bfs = BFSAlgorithm(game_map)
+        free = [(x, y) for y in range(game_map.rows) for x in range(game_map.cols) if game_map.is_valid_position(x, y)]
+        one_entry = sys.getsizeof(cache_entry(game_map, bfs, (15, 16), free[0]))
+        cache = PathCache(max_bytes=one_entry * 4)
+        for goal in free[:20]:
+            cache.find_path(bfs, (15, 16), goal)
+            self.assertLessEqual(cache.bytes, cache.max_bytes)
+            self.assertEqual(cache.bytes, sum(sys.getsizeof(packed) for packed in cache.entries.values()))
+        self.assertGreater(cache.evictions, 0)
+        
+        # A lookup refreshes an entry, so the next eviction takes the one after it
+        oldest, second = list(cache.entries)[:2]
+        self.assertIsNotNone(cache.lookup(bfs, (15, 16), oldest[4]))
+        cache.store(bfs, (15, 16), free[25], bfs.find_path((15, 16), free[25]))
+        self.assertIn(oldest, cache.entries)
+        self.assertNotIn(second, cache.entries)
+    
+    def test_map_edit_misses_and_undoing_it_hits_again(self):
+        game_map = GameMap("map.txt")
+        cache, bfs = PathCache(), BFSAlgorithm(game_map)
+        path = cache.find_path(bfs, (15, 16), (1, 1))
+        x, y = path[len(path) // 2]
+        game_map.set_cell(x, y, 1)
+        self.assertIsNone(cache.lookup(bfs, (15, 16), (1, 1)))
+        self.assertNotIn((x, y), cache.find_path(bfs, (15, 16), (1, 1)))
+        game_map.set_cell(x, y, 0)
+        self.assertEqual(cache.lookup(bfs, (15, 16), (1, 1)), path)
+    
+    def test_large_maps_pack_cell_indices_in_four_bytes(self):
+        small, large = open_map(256, 0.0), open_map(260, 0.0)
+        for game_map, typecode in ((small, 'H'), (large, 'I')):
+            cache, bfs = PathCache(), BFSAlgorithm(game_map)
+            goal = (game_map.cols - 2, game_map.rows - 2)
+            path = cache.find_path(bfs, (1, 1), goal)
+            (packed,) = cache.entries.values()
+            self.assertEqual(packed.typecode, typecode)
+            self.assertEqual(cache.lookup(bfs, (1, 1), goal), path)
+            self.assertEqual(path[-1], goal)
+    
+    def test_bounded_search_that_gave_up_is_not_cached(self):
+        game_map = GameMap("map.txt")
+        cache = PathCache()
+        search = IDAStarAlgorithm(game_map, max_expansions=3)
+        self.assertEqual(cache.find_path(search, (15, 16), (1, 1)), [])
+        self.assertTrue(search.stats.gave_up)
+        self.assertEqual(len(cache), 0)
+        
+        ghost = Ghost("Cyan", "cyan", (15, 16), search, cache)
+        ghost.find_path_to((1, 1))
+        self.assertEqual(len(cache), 0)
+        search.max_expansions = 250_000
+        ghost.find_path_to((1, 1))
+        self.assertTrue(ghost.path)
+        self.assertEqual(len(cache), 1)
+
+
+def cache_entry(game_map, algorithm, start, goal):
+    """The packed array a cache would hold for one query"""
+    cache = PathCache()
+    cache.find_path(algorithm, start, goal)
+    (packed,) = cache.entries.values()
+    return packed
+
+
+if __name__ == "__main__":
+    unittest.main()
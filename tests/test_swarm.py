@@ -0,0 +1,57 @@
+import random
+import unittest
+
+from benchmarks.maps import free_cells, maze_map, open_map
+from game.swarm import DistanceField, GhostSwarm
+
+
+class DistanceFieldRepairTest(unittest.TestCase):
+    def test_repair_matches_fresh_field_after_random_edits(self):
+        rng = random.Random(7)
+        for game_map in (open_map(24, 0.3, seed=3), maze_map(21, seed=4)):
+            cols = game_map.cols
+            goal = rng.choice(free_cells(game_map))
+            swarm = GhostSwarm(game_map)
+            field = swarm.field_for(goal)
+            for _ in range(150):
+                cell = rng.randrange(cols * game_map.rows)
+                x, y = cell % cols, cell // cols
+                game_map.set_cell(x, y, 0 if game_map.cell_value(x, y) == 1 else 1)
+                self.assertIs(swarm.field_for(goal), field)  # Repaired in place, not rebuilt
+                fresh = DistanceField(game_map, (goal % cols, goal // cols))
+                self.assertEqual(list(field.distances), list(fresh.distances))
+                for cell, distance in enumerate(field.distances):
+                    if distance > 0:
+                        self.assertEqual(field.distances[field.next_hop[cell]], distance - 1)
+    
+    def test_reroute_keeps_paths_open_and_compact(self):
+        rng = random.Random(8)
+        game_map = open_map(30, 0.3, seed=5)
+        cols = game_map.cols
+        free = free_cells(game_map)
+        goal = rng.choice(free)
+        swarm = GhostSwarm(game_map)
+        for cell in rng.sample(free, 200):
+            swarm.add((cell % cols, cell // cols), (goal % cols, goal // cols))
+        swarm.plan()
+        for tick in range(300):
+            cell = rng.choice(free)
+            if game_map.cells[cell] or cell == goal or cell in swarm.positions:
+                continue
+            game_map.set_cell(cell % cols, cell // cols, 1)
+            swarm.reroute(cell)
+            if tick % 10 == 0:
+                swarm.step(tick)
+            for ghost in range(len(swarm)):
+                if swarm.finish_tick(ghost) is not None:
+                    continue
+                path = swarm.path_cells[swarm.path_cursor[ghost]:swarm.path_end[ghost]]
+                self.assertTrue(all(game_map.cells[step] == 0 for step in path))
+                if path:
+                    self.assertEqual(path[-1], goal)
+            # Abandoned slices are reclaimed instead of piling up
+            self.assertLessEqual(swarm._abandoned, swarm.COMPACT_RATIO * len(swarm.path_cells))
+
+
+if __name__ == "__main__":
+    unittest.main()
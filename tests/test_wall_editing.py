@@ -0,0 +1,74 @@
+import os
+import random
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import pygame
+
+from config import Config
+from game.game import GhostCherryGame
+
+
+class ToggleWallTest(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        pygame.init()
+        self.map_file = Config.ASSETS['map']
+        Config.ASSETS['map'] = "weighted_map.txt"
+        self.game = GhostCherryGame()
+    
+    def tearDown(self):
+        if self.game.planner:
+            self.game.planner.shutdown()
+        Config.ASSETS['map'] = self.map_file
+    
+    def free_cells(self):
+        """Open cells holding no ghost or cherry, so toggle_wall may edit them"""
+        game_map = self.game.map
+        taken = [tuple(ghost.position) for ghost in self.game.ghosts] + \
+            [tuple(cherry.position) for cherry in self.game.cherries]
+        return [(x, y) for y in range(game_map.rows) for x in range(game_map.cols)
+                if game_map.is_valid_position(x, y) and (x, y) not in taken]
+    
+    def test_weighted_cell_keeps_its_cost_across_a_wall(self):
+        game_map = self.game.map
+        for x, y in [cell for cell in self.free_cells() if game_map.cell_value(*cell) > 1][:10]:
+            weight = game_map.cell_value(x, y)
+            self.assertTrue(self.game.toggle_wall(x, y))
+            self.assertEqual(game_map.cell_value(x, y), 1)
+            self.assertTrue(self.game.toggle_wall(x, y))
+            self.assertEqual(game_map.cell_value(x, y), weight)
+            self.assertEqual(game_map.terrain_cost(x, y), weight)
+    
+    def test_plain_wall_opens_to_a_path(self):
+        game_map = self.game.map
+        x, y = next(cell for cell in self.free_cells() if game_map.cell_value(*cell) == 0)
+        self.assertTrue(self.game.toggle_wall(x, y))
+        self.assertTrue(self.game.toggle_wall(x, y))
+        self.assertEqual(game_map.cell_value(x, y), 0)
+    
+    def test_wall_cutting_off_a_racing_ghost_is_refused(self):
+        game, game_map = self.game, self.game.map
+        game.reset_game(new_cherry=True)  # Cherries every ghost can reach
+        game.game_state.start_game()
+        for x, y in self.free_cells():
+            value, zobrist = game_map.cell_value(x, y), game_map.zobrist
+            # A wall is refused exactly when it leaves some racing ghost unable to reach its cherries
+            game_map.set_cell(x, y, 1)
+            cuts_off = any(not game.connectivity.reachable_from_all(tuple(ghost.position), ghost.targets)
+                           for ghost in game.ghosts)
+            game_map.set_cell(x, y, value)
+            if not cuts_off:
+                continue
+            self.assertFalse(game.toggle_wall(x, y))
+            self.assertEqual(game_map.cell_value(x, y), value)
+            self.assertEqual(game_map.zobrist, zobrist)
+            self.assertTrue(all(game.connectivity.reachable_from_all(tuple(ghost.position), ghost.targets)
+                                for ghost in game.ghosts))
+            return
+        self.skipTest("no single wall separates a ghost from its cherry on this map")
+
+
+if __name__ == "__main__":
+    unittest.main()